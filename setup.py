@@ -45,12 +45,12 @@ INSTALL_REQUIRES = [
     "click>=7",
     "click-default-group",
     "colorful",
-    "numpy",
+    "numpy>=1.20",
+    "scipy",
     "pandas",
     "gensim",
     "keras",
     "tensorflow",
-    "nltk",
     # somehow botocore which is a transitive dependency has some requirements not correctly pinned.
     "python-dateutil<2.8.1"
 ]
@@ -60,6 +60,8 @@ EXTRAS_REQUIRES = {
     "docs": ["sphinx"],
     "tests": ["coverage", "pytest", "pytest-mock", "pytest-benchmark"],
     "notebooks": ["jupyter", "matplotlib", "seaborn"],
+    # extras for reading zstd compressed Embeddings
+    "zstd": ["zstandard"],
 }
 EXTRAS_REQUIRES["dev"] = (
     EXTRAS_REQUIRES["tests"]
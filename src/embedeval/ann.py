@@ -0,0 +1,403 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+from embedeval.similarity import normalize_vectors
+from embedeval.vocabulary import Vocabulary
+
+logger = get_component_logger("ann-index")
+
+#: Holds the version of the persisted index format
+FORMAT_VERSION = 2
+
+#: Holds the suffix of the index file next to the source Embedding
+INDEX_SUFFIX = ".ann.npz"
+
+#: Holds the default amount of clusters probed per query
+DEFAULT_N_PROBE = 16
+
+#: Holds the amount of centroids per sub-vector of the product quantization
+PQ_CENTROIDS = 256
+
+#: Holds how many candidates per result are kept by the product quantization
+PQ_RERANK_FACTOR = 32
+
+
+class IVFIndex:
+    """Inverted file index for the approximate nearest neighbour search
+
+    The unit-normalized word vectors are clustered with spherical k-means.
+    A query only considers the words in the ``n_probe`` clusters whose
+    centroids are the most similar to it. The candidates are then scored
+    exactly by the ``SimilarityEngine``.
+
+    With product quantization each word vector is additionally
+    compressed to one byte per sub-vector. The compressed vectors are used
+    to keep only the most promising candidates before the exact scoring.
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        list_rows: np.ndarray,
+        list_offsets: np.ndarray,
+        n_probe: int = DEFAULT_N_PROBE,
+        codebooks: Optional[np.ndarray] = None,
+        codes: Optional[np.ndarray] = None,
+    ):
+        #: Holds the C x D matrix of the cluster centroids
+        self.centroids = centroids
+        #: Holds the rows of all words, ordered by their cluster
+        self.list_rows = list_rows
+        #: Holds the offset of each cluster in ``self.list_rows``
+        self.list_offsets = list_offsets
+        #: Holds the default amount of clusters probed per query
+        self.n_probe = n_probe
+        #: Holds the M x K x D/M product quantization codebooks, if any
+        self.codebooks = codebooks
+        #: Holds the N x M product quantization codes in the order of ``self.list_rows``
+        self.codes = codes
+
+    @property
+    def n_clusters(self) -> int:
+        return len(self.centroids)
+
+    def get_candidates(
+        self,
+        queries: np.ndarray,
+        topn: int,
+        n_probe: Optional[int] = None,
+        max_row: Optional[int] = None,
+    ) -> List[np.ndarray]:
+        """Get the candidate rows for each of the given normalized queries
+
+        Only rows below ``max_row`` are candidates, if it's given.
+        This restricts the search to the first words of the Word Embedding.
+        """
+        if n_probe is None:
+            n_probe = self.n_probe
+        n_probe = max(1, min(n_probe, self.n_clusters))
+
+        centroid_scores = queries @ self.centroids.T
+        probes = np.argpartition(
+            centroid_scores, self.n_clusters - n_probe, axis=1
+        )[:, -n_probe:]
+
+        candidates = []
+        for query, clusters in zip(queries, probes):
+            positions = np.concatenate(
+                [
+                    np.arange(self.list_offsets[c], self.list_offsets[c + 1])
+                    for c in clusters
+                ]
+            )
+            if max_row is not None:
+                positions = positions[self.list_rows[positions] < max_row]
+            max_candidates = topn * PQ_RERANK_FACTOR
+            if self.codes is not None and len(positions) > max_candidates:
+                scores = self._score_codes(query, self.codes[positions])
+                keep = np.argpartition(scores, len(scores) - max_candidates)
+                positions = positions[keep[-max_candidates:]]
+            candidates.append(self.list_rows[positions])
+        return candidates
+
+    def _score_codes(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate the dot products of the query with the compressed vectors"""
+        n_subvectors, _, subvector_size = self.codebooks.shape  # type: ignore
+        lookup_table = np.einsum(
+            "mkd,md->mk",
+            self.codebooks,
+            query.reshape(n_subvectors, subvector_size),
+        )
+        return lookup_table[np.arange(n_subvectors), codes].sum(axis=1)
+
+
+def build_index(
+    normalized_vectors: np.ndarray,
+    n_clusters: Optional[int] = None,
+    n_subvectors: int = 0,
+    n_probe: int = DEFAULT_N_PROBE,
+    n_iterations: int = 10,
+    seed: int = 0,
+) -> IVFIndex:
+    """Build an IVF index for the given unit-normalized word vectors
+
+    By default about ``4 * sqrt(N)`` clusters are used.
+    If ``n_subvectors`` is given the vectors are compressed
+    with a product quantization of that many sub-vectors.
+    """
+    n_words, vector_size = normalized_vectors.shape
+    if n_clusters is None:
+        n_clusters = int(4 * np.sqrt(n_words))
+    n_clusters = max(1, min(n_clusters, n_words))
+
+    rng = np.random.RandomState(seed)
+    started_at = time.monotonic()
+    centroids = kmeans(
+        normalized_vectors, n_clusters, n_iterations, rng, spherical=True
+    )
+    assignments = assign_clusters(normalized_vectors, centroids, spherical=True)
+    list_rows = np.argsort(assignments, kind="stable")
+    list_offsets = np.zeros(n_clusters + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignments, minlength=n_clusters), out=list_offsets[1:])
+    logger.debug(
+        "Clustered %d word vectors into %d clusters in %.2fs",
+        n_words,
+        n_clusters,
+        time.monotonic() - started_at,
+    )
+
+    codebooks = codes = None
+    if n_subvectors > 0:
+        if vector_size % n_subvectors != 0:
+            raise EmbedevalError(
+                f"The word vector size {vector_size} must be divisible "
+                f"by the amount of sub-vectors {n_subvectors}"
+            )
+
+        started_at = time.monotonic()
+        codebooks, codes = quantize(
+            normalized_vectors[list_rows], n_subvectors, n_iterations, rng
+        )
+        logger.debug(
+            "Quantized word vectors into %d sub-vectors in %.2fs",
+            n_subvectors,
+            time.monotonic() - started_at,
+        )
+
+    return IVFIndex(centroids, list_rows, list_offsets, n_probe, codebooks, codes)
+
+
+def kmeans(
+    vectors: np.ndarray,
+    n_clusters: int,
+    n_iterations: int,
+    rng: np.random.RandomState,
+    spherical: bool = False,
+    max_sample_size_per_cluster: int = 64,
+) -> np.ndarray:
+    """Cluster the given vectors with k-means
+
+    The centroids are trained on a random sample of the vectors.
+    With ``spherical`` the vectors are compared by their dot product
+    and the centroids are normalized to unit length.
+    """
+    sample_size = min(len(vectors), n_clusters * max_sample_size_per_cluster)
+    sample = np.asarray(
+        vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))],
+        dtype=np.float32,
+    )
+    centroids = sample[rng.choice(len(sample), n_clusters, replace=False)].copy()
+
+    for _ in range(n_iterations):
+        assignments = assign_clusters(sample, centroids, spherical)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        empty = counts == 0
+        starts = np.cumsum(counts) - counts
+        sums = np.empty_like(centroids)
+        sums[~empty] = np.add.reduceat(
+            sample[np.argsort(assignments, kind="stable")], starts[~empty], axis=0
+        )
+
+        # NOTE: empty clusters are moved to random vectors of the sample
+        sums[empty] = sample[rng.choice(len(sample), empty.sum())]
+        counts[empty] = 1
+
+        if spherical:
+            centroids = normalize_vectors(sums)
+        else:
+            centroids = sums / counts[:, np.newaxis].astype(np.float32)
+
+    return centroids
+
+
+def assign_clusters(
+    vectors: np.ndarray, centroids: np.ndarray, spherical: bool, block_size=16384
+) -> np.ndarray:
+    """Assign each vector to its closest centroid"""
+    if not spherical:
+        # NOTE: the closest centroid by euclidean distance has the
+        #       highest dot product minus half of its squared norm.
+        offsets = (centroids ** 2).sum(axis=1) / 2
+
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block_size):
+        scores = np.asarray(vectors[start : start + block_size]) @ centroids.T
+        if not spherical:
+            scores -= offsets
+        assignments[start : start + block_size] = scores.argmax(axis=1)
+    return assignments
+
+
+def quantize(
+    vectors: np.ndarray, n_subvectors: int, n_iterations: int, rng
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compress the given vectors with a product quantization
+
+    Every vector is split into ``n_subvectors`` sub-vectors,
+    which are replaced by the index of their closest centroid.
+    """
+    subvector_size = vectors.shape[1] // n_subvectors
+    n_centroids = min(PQ_CENTROIDS, len(vectors))
+    codebooks = np.empty((n_subvectors, n_centroids, subvector_size), dtype=np.float32)
+    codes = np.empty((len(vectors), n_subvectors), dtype=np.uint8)
+    for subvector in range(n_subvectors):
+        columns = slice(subvector * subvector_size, (subvector + 1) * subvector_size)
+        subvectors = np.ascontiguousarray(vectors[:, columns])
+        codebooks[subvector] = kmeans(subvectors, n_centroids, n_iterations, rng)
+        codes[:, subvector] = assign_clusters(
+            subvectors, codebooks[subvector], spherical=False
+        )
+    return codebooks, codes
+
+
+def measure_recall(
+    engine, n_queries: int = 1000, topn: int = 10, seed: int = 0
+) -> Tuple[float, float, float]:
+    """Measure the recall@k of the approximate search against the exact search
+
+    The nearest neighbours of randomly chosen words are searched
+    exactly and approximately with the index of the given Similarity Engine.
+
+    Returns the mean recall and the durations of both searches in seconds.
+    """
+    n_words = len(engine.normalized_vectors)
+    rng = np.random.RandomState(seed)
+    positive_rows = rng.choice(n_words, min(n_queries, n_words), replace=False)[
+        :, np.newaxis
+    ]
+    negative_rows = np.empty((len(positive_rows), 0), dtype=np.int64)
+
+    started_at = time.monotonic()
+    exact_rows, _ = engine.search_add(positive_rows, negative_rows, topn)
+    exact_duration = time.monotonic() - started_at
+
+    started_at = time.monotonic()
+    approximate_rows, _ = engine.search_add(
+        positive_rows, negative_rows, topn, approximate=True
+    )
+    approximate_duration = time.monotonic() - started_at
+
+    hits = [
+        len(np.intersect1d(exact, approximate))
+        for exact, approximate in zip(exact_rows, approximate_rows)
+    ]
+    recall = float(np.mean(hits) / exact_rows.shape[1]) if len(hits) > 0 else 0.0
+    return recall, exact_duration, approximate_duration
+
+
+def get_index_path(path: Path) -> Path:
+    """Get the path to the index file for the given Embedding file"""
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def get_vocabulary_header(vocabulary: Vocabulary) -> Dict[str, Any]:
+    """Get the header entry which identifies the rows an index was built for"""
+    return {"rows": len(vocabulary), "checksum": vocabulary.checksum()}
+
+
+def save_index(index: IVFIndex, source_path: Path, vocabulary: Vocabulary) -> Path:
+    """Save the given index next to the given Embedding file
+
+    The amount of rows and the checksum of the given vocabulary
+    of the indexed word vectors are saved with the index.
+
+    The index is written to a temporary file first and moved
+    into place at the end, so that readers never see a partial index.
+    """
+    index_path = get_index_path(source_path)
+    source_stat = source_path.stat()
+    header = {
+        "format_version": FORMAT_VERSION,
+        "n_probe": index.n_probe,
+        "source": {"size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns},
+        "vocabulary": get_vocabulary_header(vocabulary),
+    }
+    arrays = {
+        "centroids": index.centroids,
+        "list_rows": index.list_rows,
+        "list_offsets": index.list_offsets,
+    }
+    if index.codebooks is not None:
+        arrays.update(codebooks=index.codebooks, codes=index.codes)
+
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=index_path.name, dir=str(index_path.parent)
+    )
+    try:
+        with os.fdopen(fd, "wb") as index_file:
+            np.savez(index_file, header=np.array(json.dumps(header)), **arrays)
+        os.replace(tmp_path, str(index_path))
+    except Exception as exc:
+        os.unlink(tmp_path)
+        raise EmbedevalError(f"Failed to save index to {index_path}: {exc}")
+
+    logger.debug("Saved index for %s to %s", source_path, index_path)
+    return index_path
+
+
+def load_index(source_path: Path, vocabulary: Vocabulary) -> Optional[IVFIndex]:
+    """Load the index saved next to the given Embedding file
+
+    ``None`` is returned if there is no index or if it's outdated,
+    because the size or modification time of the Embedding file changed.
+    ``None`` is returned as well if the index was built for other rows
+    than the ones of the given vocabulary, for example if the Embedding file
+    was parsed with a restricted vocabulary.
+    """
+    index_path = get_index_path(source_path)
+    try:
+        index_file = np.load(str(index_path), allow_pickle=False)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.debug("Ignoring invalid index %s: %s", index_path, exc)
+        return None
+
+    with index_file:
+        header = json.loads(str(index_file["header"]))
+        source_stat = source_path.stat()
+        if header.get("format_version") != FORMAT_VERSION or header.get(
+            "source"
+        ) != {"size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns}:
+            logger.debug("Ignoring outdated index for %s", source_path)
+            return None
+
+        if header.get("vocabulary") != get_vocabulary_header(vocabulary) or len(
+            index_file["list_rows"]
+        ) != len(vocabulary):
+            logger.debug(
+                "Ignoring index for %s, because it was built for other words",
+                source_path,
+            )
+            return None
+
+        has_codes = "codes" in index_file.files
+        index = IVFIndex(
+            index_file["centroids"],
+            index_file["list_rows"],
+            index_file["list_offsets"],
+            header["n_probe"],
+            index_file["codebooks"] if has_codes else None,
+            index_file["codes"] if has_codes else None,
+        )
+
+    logger.debug("Loaded index for %s from %s", source_path, index_path)
+    return index
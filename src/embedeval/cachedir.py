@@ -0,0 +1,28 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import os
+from pathlib import Path
+
+#: Holds the name of the environment variable to change the cache directory
+CACHE_DIR_ENV_VAR = "EMBEDEVAL_CACHE_DIR"
+
+
+def get_cache_dir() -> Path:
+    """Get the directory where embedeval caches its data
+
+    It can be set with the ``EMBEDEVAL_CACHE_DIR`` environment variable
+    and defaults to ``embedeval`` in the user's cache directory.
+    """
+    if CACHE_DIR_ENV_VAR in os.environ:
+        return Path(os.environ[CACHE_DIR_ENV_VAR])
+
+    user_cache_dir = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+    return Path(user_cache_dir) / "embedeval"
@@ -0,0 +1,21 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import hashlib
+from pathlib import Path
+
+
+def calculate_checksum(path: Path, block_size=16 * 1024 * 1024) -> str:
+    """Calculate the SHA-256 checksum of the given file"""
+    checksum = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            checksum.update(block)
+    return checksum.hexdigest()
@@ -8,11 +8,13 @@ NLP Embedding Evaluation Tool
 :license: MIT, see LICENSE for more details.
 """
 
+import glob
 import inspect
 import logging
 import re
 import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import click
@@ -21,9 +23,9 @@ from click_default_group import DefaultGroup
 
 from embedeval.errors import EmbedevalError
 from embedeval.logger import logger
-from embedeval.parsers.word2vec_gensim import load_embedding
 from embedeval.taskregistry import load_tasks
 from embedeval.taskregistry import registry as task_registry
+from embedeval.taskreport import format_comparison_table, format_shift_table
 
 logging.basicConfig(
     level=logging.CRITICAL, format="%(asctime)s - %(name)s [%(levelname)s]: %(message)s"
@@ -32,6 +34,10 @@ logging.basicConfig(
 # suppress all warnings when running the application
 warnings.simplefilter("ignore")
 
+# NOTE: the parsers and the evaluator import heavy dependencies,
+#       like gensim and numpy. They are only imported by the commands
+#       which load an Embedding to keep the startup of the CLI fast.
+
 #: Holds the path to the tasks directory deployed with embedeval
 __TASKS_DIR__ = Path(__file__).parent / "tasks"
 
@@ -70,6 +76,36 @@ def create_tasks(ctx, param, task_names):
     return tasks
 
 
+def expand_embedding_paths(ctx, param, paths):
+    """Expand the given Embedding paths and glob patterns to Embedding files"""
+    expanded_paths = []
+    for path in paths:
+        if any(c in path for c in "*?["):
+            matched_paths = sorted(Path(p) for p in glob.glob(path) if Path(p).is_file())
+            if not matched_paths:
+                raise click.BadParameter(f"No Embedding file matches '{path}'")
+            expanded_paths.extend(matched_paths)
+        elif Path(path).is_file():
+            expanded_paths.append(Path(path))
+        else:
+            raise click.BadParameter(f"Embedding file '{path}' does not exist")
+    return expanded_paths
+
+
+def get_required_words(tasks):
+    """Get the words required by all given Tasks
+
+    ``None`` is returned if at least one Task requires the entire Embedding.
+    """
+    required_words = set()
+    for task in tasks:
+        task_required_words = task.required_words()
+        if task_required_words is None:
+            return None
+        required_words.update(task_required_words)
+    return required_words
+
+
 @click.group(
     cls=DefaultGroup, name="embedeval", default="eval", default_if_no_args=False
 )
@@ -114,24 +150,518 @@ def cli():
     callback=create_tasks,
     help="The Task to evaluate on the given Embedding (can be specified multiple times)",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="The amount of Tasks to evaluate concurrently",
+)
+@click.option(
+    "--processes",
+    "use_processes",
+    is_flag=True,
+    help="Evaluate the Tasks concurrently in processes instead of threads",
+)
+@click.option(
+    "--no-cache",
+    "is_cache_disabled",
+    is_flag=True,
+    help="Ignore the native embedeval format of the Embedding created with ``convert``",
+)
+@click.option(
+    "--embedding-jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="The amount of Embeddings to load and evaluate concurrently",
+)
+@click.option(
+    "--restrict-vocab",
+    type=click.IntRange(min=1),
+    help="Only use the first (most frequent) words of the Embeddings",
+)
+@click.option(
+    "--drop-raw-vectors",
+    "is_dropping_raw_vectors",
+    is_flag=True,
+    help="Only keep the normalized word vectors of the Embeddings in memory",
+)
+@click.option(
+    "--precision",
+    type=click.Choice(["float32", "float16", "int8"]),
+    default="float32",
+    show_default=True,
+    help="The precision in which the word vectors are kept in memory",
+)
+@click.option(
+    "--precision-shift",
+    "is_reporting_precision_shift",
+    is_flag=True,
+    help="Evaluate in float32, too, and report how much the Task metrics shift",
+)
+@click.argument(
+    "paths_to_embeddings",
+    nargs=-1,
+    required=True,
+    is_eager=True,
+    callback=expand_embedding_paths,
+)
+def eval_cli_command(
+    is_debug_mode,
+    paths_to_embeddings,
+    tasks_path,
+    tasks,
+    jobs,
+    use_processes,
+    is_cache_disabled,
+    embedding_jobs,
+    restrict_vocab,
+    is_dropping_raw_vectors,
+    precision,
+    is_reporting_precision_shift,
+):
+    """Evaluate and generate reports for NLP Word Embeddings (default command)
+
+    The Word Embeddings need to be provided as word2vec keyed vectors in a file.
+    The file can either be in the binary or in the plain text word2vec format
+    or in the GloVe text format without header line,
+    optionally compressed with gzip, bzip2, xz or zstd.
+    Both the format and the compression are detected from the file content.
+
+    If the Embedding was converted to the native embedeval format
+    using the ``convert`` command, that one is used instead.
+
+    With ``--jobs`` multiple Tasks are evaluated concurrently in threads
+    or with ``--processes`` in processes which memory-map the Embedding.
+    The reports are always printed in the order of the given Tasks.
+
+    Multiple Embeddings or glob patterns can be given to evaluate the
+    same Tasks on all of them, optionally concurrently with ``--embedding-jobs``.
+    The Task results are compared in a table at the end.
+
+    With ``--restrict-vocab`` only the first words of the Embeddings are
+    loaded and searched for similar words, like it's common for analogy
+    benchmarks. word2vec files are ordered by the frequency of the words.
+
+    With ``--drop-raw-vectors`` the raw word vectors are replaced by the
+    normalized word vectors once they are loaded, which halves the memory
+    for Tasks which only use the cosine similarity of words.
+
+    With ``--precision`` the word vectors are kept as float16 or as int8,
+    which takes a half or a quarter of the memory of float32.
+    The word vectors are quantized while they are parsed.
+    Add ``--precision-shift`` to evaluate the Tasks in float32, too,
+    and to report how much the Task metrics shift with that precision.
+    The Embeddings are then loaded in float32 and quantized afterwards.
+    """
+    if is_reporting_precision_shift and precision == "float32":
+        raise click.UsageError(
+            "--precision-shift requires a reduced --precision like float16 or int8"
+        )
+
+    from embedeval.evaluator import evaluate_tasks
+
+    task_names = [task.NAME for task in tasks]
+    all_results = {}
+    reference_results = {}
+    failed_paths = []
+
+    def evaluate_embedding(path_to_embedding):
+        embedding = load_word_embedding(
+            path_to_embedding,
+            tasks,
+            is_cache_disabled,
+            restrict_vocab,
+            is_dropping_raw_vectors,
+            # NOTE: the float32 reference needs the float32 word vectors
+            "float32" if is_reporting_precision_shift else precision,
+        )
+        if is_reporting_precision_shift:
+            from embedeval.quantization import quantize_embedding
+
+            reference_results[str(path_to_embedding)] = list(
+                evaluate_tasks(embedding, tasks, jobs=jobs, use_processes=use_processes)
+            )
+            embedding = quantize_embedding(embedding, precision)
+        return evaluate_tasks(embedding, tasks, jobs=jobs, use_processes=use_processes)
+
+    def evaluate_embedding_completely(path_to_embedding):
+        return list(evaluate_embedding(path_to_embedding))
+
+    if embedding_jobs > 1 and len(paths_to_embeddings) > 1:
+        with ThreadPoolExecutor(max_workers=embedding_jobs) as executor:
+            futures = [
+                executor.submit(evaluate_embedding_completely, path)
+                for path in paths_to_embeddings
+            ]
+            for path_to_embedding, future in zip(paths_to_embeddings, futures):
+                print(cf.italic(f"Evaluated embedding {path_to_embedding} ..."), end=" ")
+                try:
+                    results = future.result()
+                # NOTE: any error fails only this Embedding
+                except Exception as exc:
+                    print_embedding_error(exc)
+                    failed_paths.append(path_to_embedding)
+                    all_results[str(path_to_embedding)] = [exc] * len(tasks)
+                    continue
+
+                print(cf.bold("[OK]"), flush=True, end="\n\n")
+                for result in results:
+                    print_task_result(result)
+                all_results[str(path_to_embedding)] = results
+    else:
+        for path_to_embedding in paths_to_embeddings:
+            print(
+                cf.italic(f"Loading embedding {path_to_embedding} ..."),
+                flush=True,
+                end=" ",
+            )
+            try:
+                results = evaluate_embedding(path_to_embedding)
+                print(cf.bold("[OK]"), flush=True, end="\n\n")
+            # NOTE: any error fails only this Embedding
+            except Exception as exc:
+                print_embedding_error(exc)
+                if len(paths_to_embeddings) == 1:
+                    raise click.Abort()
+                failed_paths.append(path_to_embedding)
+                all_results[str(path_to_embedding)] = [exc] * len(tasks)
+                continue
+
+            # evaluate all tasks
+            logger.debug("Evaluating %d Tasks with %d jobs ...", len(tasks), jobs)
+            embedding_results = all_results[str(path_to_embedding)] = []
+            try:
+                for task_nbr, result in enumerate(results, start=1):
+                    print_task_result(result)
+                    embedding_results.append(result)
+                    logger.debug("Evaluated %d of %d Tasks", task_nbr, len(tasks))
+            # NOTE: Tasks are evaluated lazily, thus sharing the
+            #       Embedding with the worker processes may fail here.
+            except Exception as exc:
+                print(cf.italic(f"Evaluating embedding {path_to_embedding} ..."), end=" ")
+                print_embedding_error(exc)
+                failed_paths.append(path_to_embedding)
+                embedding_results.extend([exc] * (len(tasks) - len(embedding_results)))
+
+    if len(paths_to_embeddings) > 1:
+        print(cf.bold("Comparison of all Embeddings:"), end="\n\n")
+        print(format_comparison_table(task_names, all_results), end="\n\n")
+
+    for path_to_embedding, results in reference_results.items():
+        print(
+            cf.bold(
+                f"Shift of {precision} compared with float32 for {path_to_embedding}:"
+            ),
+            end="\n\n",
+        )
+        print(
+            format_shift_table(
+                task_names,
+                results,
+                all_results[path_to_embedding],
+                "float32",
+                precision,
+            ),
+            end="\n\n",
+        )
+
+    if failed_paths:
+        raise click.Abort()
+
+
+def load_word_embedding(
+    path_to_embedding,
+    tasks,
+    is_cache_disabled,
+    restrict_vocab=None,
+    is_dropping_raw_vectors=False,
+    precision="float32",
+):
+    """Load the given Word Embedding for the given Tasks
+
+    The native embedeval format is preferred if it exists.
+    Otherwise, if all Tasks declare the words they require, only
+    those are loaded from a text Embedding.
+
+    If ``restrict_vocab`` is given, only the first ``restrict_vocab``
+    words are parsed or, for the native format, viewed.
+
+    If ``is_dropping_raw_vectors`` is set, only the normalized
+    word vectors are kept, see ``WordEmbedding.drop_raw_vectors()``.
+
+    If a ``precision`` other than ``float32`` is given, the word vectors
+    are quantized while they are parsed or, for the native format and
+    gensim, once they are loaded, see ``embedeval.quantization``.
+    """
+    embedding = _parse_word_embedding(
+        path_to_embedding, tasks, is_cache_disabled, restrict_vocab, precision
+    )
+    if is_dropping_raw_vectors:
+        embedding.drop_raw_vectors()
+    return embedding
+
+
+def _parse_word_embedding(
+    path_to_embedding, tasks, is_cache_disabled, restrict_vocab, precision
+):
+    """Parse the given Word Embedding in the best available format
+
+    The format and the compression of the Embedding file are
+    detected from its content and not from its suffix.
+    """
+    from embedeval.compression import detect_compression, is_binary_embedding
+    from embedeval.parsers import native
+
+    if not is_cache_disabled:
+        embedding = native.load_embedding(path_to_embedding)
+        if embedding is not None:
+            logger.debug("Using native Embedding for %s", path_to_embedding)
+            if restrict_vocab is not None:
+                embedding = embedding.restrict_vocab(restrict_vocab)
+            # NOTE: the memory-mapped word vectors are quantized block by block
+            return _quantize_embedding(embedding, precision)
+
+    required_words = get_required_words(tasks)
+    if is_binary_embedding(path_to_embedding):
+        from embedeval.parsers.word2vec_binary import load_embedding as binary_load_embedding
+
+        return binary_load_embedding(
+            path_to_embedding,
+            required_words=required_words,
+            max_words=restrict_vocab,
+            precision=precision,
+        )
+
+    from embedeval.parsers import glove
+
+    if glove.is_glove_embedding(path_to_embedding):
+        logger.debug("Parsing %s as GloVe Embedding without header", path_to_embedding)
+        return glove.load_embedding(
+            path_to_embedding,
+            required_words=required_words,
+            max_words=restrict_vocab,
+            precision=precision,
+        )
+
+    # NOTE: gensim detects compressed files only by their suffix
+    #       and can't quantize the word vectors while parsing them.
+    if (
+        required_words is not None
+        or detect_compression(path_to_embedding)
+        or precision != "float32"
+    ):
+        if required_words is not None:
+            logger.debug(
+                "Loading only the %d words required by the Tasks", len(required_words),
+            )
+        from embedeval.parsers.word2vec_simple import load_embedding as simple_load_embedding
+
+        return simple_load_embedding(
+            path_to_embedding,
+            required_words=required_words,
+            max_words=restrict_vocab,
+            precision=precision,
+        )
+
+    from embedeval.parsers.word2vec_gensim import load_embedding
+
+    return load_embedding(path_to_embedding, max_words=restrict_vocab)
+
+
+def _quantize_embedding(embedding, precision):
+    """Quantize the given loaded Word Embedding to the given precision"""
+    if precision == "float32":
+        return embedding
+
+    from embedeval.quantization import quantize_embedding
+
+    return quantize_embedding(embedding, precision)
+
+
+def print_embedding_error(exc):
+    """Print the given error of loading an Embedding
+
+    Unexpected errors are printed with their type and logged with their traceback.
+    """
+    print(cf.bold_firebrick("[FAILED]"), flush=True, end="\n\n")
+    if not isinstance(exc, EmbedevalError):
+        logger.debug("Unexpected error of loading an Embedding", exc_info=exc)
+        exc = f"{type(exc).__name__}: {exc}"
+    print(f"{cf.bold_firebrick('Error:')} {cf.firebrick(exc)}", file=sys.stderr)
+
+
+def print_task_result(result):
+    """Print the given Task Report or the exception of a failed Task"""
+    if isinstance(result, Exception):
+        print(
+            cf.firebrick(f"Failed to evaluate task: {result}"), end="\n\n", flush=True,
+        )
+    else:
+        print(result, end="\n\n", flush=True)
+
+
+@cli.command("convert")
+@click.help_option("--help", "-h")
+@click.option(
+    "--debug",
+    "-d",
+    "is_debug_mode",
+    is_flag=True,
+    is_eager=True,
+    callback=enable_debug_mode,
+    help="Enable debug mode",
+)
 @click.argument(
     "path_to_embedding",
+    type=click.Path(exists=True, dir_okay=False),
+    callback=lambda _, __, p: Path(p),
+)
+def convert_cli_command(is_debug_mode, path_to_embedding):
+    """Convert a NLP Word Embedding to the native embedeval format
+
+    \b
+    The native format is saved in a directory next to the Embedding file
+    with the additional .embedeval suffix.
+    It's automatically used by the ``eval`` command and
+    memory-mapped instead of parsed, which makes loading instant.
+    The native format is ignored as soon as the Embedding file changes.
+    """
+    from embedeval.parsers import native
+
+    print(cf.italic(f"Loading embedding {path_to_embedding} ..."), flush=True, end=" ")
+    try:
+        embedding = parse_word_embedding(path_to_embedding)
+        print(cf.bold("[OK]"), flush=True)
+
+        print(cf.italic("Converting embedding ..."), flush=True, end=" ")
+        cache_path = native.save_embedding(embedding, path_to_embedding)
+    except EmbedevalError as exc:
+        print(cf.bold_firebrick("[FAILED]"), flush=True, end="\n\n")
+        print(f"{cf.bold_firebrick('Error:')} {cf.firebrick(exc)}", file=sys.stderr)
+        raise click.Abort()
+    else:
+        print(cf.bold("[OK]"), flush=True, end="\n\n")
+
+    print(f"Converted the embedding {path_to_embedding} to {cache_path}")
+
+
+def parse_word_embedding(path_to_embedding):
+    """Parse the entire given Word Embedding file"""
+    from embedeval.compression import is_binary_embedding
+
+    if is_binary_embedding(path_to_embedding):
+        from embedeval.parsers.word2vec_binary import load_embedding
+
+        return load_embedding(path_to_embedding)
+
+    from embedeval.parsers import glove
+
+    if glove.is_glove_embedding(path_to_embedding):
+        return glove.load_embedding(path_to_embedding)
+
+    from embedeval.parsers.word2vec_simple import load_embedding_parallel
+
+    return load_embedding_parallel(path_to_embedding)
+
+
+@cli.command("index")
+@click.help_option("--help", "-h")
+@click.option(
+    "--debug",
+    "-d",
+    "is_debug_mode",
+    is_flag=True,
     is_eager=True,
+    callback=enable_debug_mode,
+    help="Enable debug mode",
+)
+@click.option(
+    "--clusters",
+    "-c",
+    "n_clusters",
+    type=click.IntRange(min=1),
+    help="Amount of clusters, by default 4 * sqrt(words)",
+)
+@click.option(
+    "--subvectors",
+    "-m",
+    "n_subvectors",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Amount of sub-vectors to compress the word vectors, 0 to disable",
+)
+@click.option(
+    "--probes",
+    "n_probe",
+    type=click.IntRange(min=1),
+    default=16,
+    show_default=True,
+    help="Amount of clusters searched per query",
+)
+@click.option(
+    "--recall-queries",
+    "n_recall_queries",
+    type=click.IntRange(min=0),
+    default=1000,
+    show_default=True,
+    help="Amount of random words to measure the recall with",
+)
+@click.option(
+    "--topn",
+    "-k",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Amount of nearest neighbours to measure the recall with",
+)
+@click.argument(
+    "path_to_embedding",
     type=click.Path(exists=True, dir_okay=False),
     callback=lambda _, __, p: Path(p),
 )
-def eval_cli_command(is_debug_mode, path_to_embedding, tasks_path, tasks):
-    """Evaluate and generate reports for a NLP Word Embedding (default command)
+def index_cli_command(
+    is_debug_mode,
+    n_clusters,
+    n_subvectors,
+    n_probe,
+    n_recall_queries,
+    topn,
+    path_to_embedding,
+):
+    """Build an approximate nearest neighbour index for a NLP Word Embedding
 
-    The Word Embeddings need to be provided as word2vec keyed vectors in a file.
-    The file can either be in a binary format (if the file has the .bin) extension
-    or in plain text (if the file has the .vec) extension.
+    \b
+    The index is saved next to the Embedding file with the additional
+    .ann.npz suffix. It's used by the Tasks which search the nearest
+    neighbours approximately. The index is ignored as soon as
+    the Embedding file changes.
+
+    The recall@k of the approximate search against the exact search
+    for random words is reported to show the accuracy trade-off.
     """
-    # load the Word Embedding
+    from embedeval.ann import build_index, measure_recall, save_index
+    from embedeval.parsers import native
+    from embedeval.vocabulary import get_vocabulary
+
     print(cf.italic(f"Loading embedding {path_to_embedding} ..."), flush=True, end=" ")
-    is_binary_format = path_to_embedding.suffix == ".bin"
     try:
-        embedding = load_embedding(path_to_embedding, binary=is_binary_format)
+        embedding = native.load_embedding(path_to_embedding)
+        if embedding is None:
+            embedding = parse_word_embedding(path_to_embedding)
+        print(cf.bold("[OK]"), flush=True)
+
+        print(cf.italic("Building index ..."), flush=True, end=" ")
+        engine = embedding.similarity_engine
+        engine.index = build_index(
+            engine.normalized_vectors, n_clusters, n_subvectors, n_probe
+        )
+        index_path = save_index(
+            engine.index, path_to_embedding, get_vocabulary(embedding)
+        )
     except EmbedevalError as exc:
         print(cf.bold_firebrick("[FAILED]"), flush=True, end="\n\n")
         print(f"{cf.bold_firebrick('Error:')} {cf.firebrick(exc)}", file=sys.stderr)
@@ -139,18 +669,25 @@ def eval_cli_command(is_debug_mode, path_to_embedding, tasks_path, tasks):
     else:
         print(cf.bold("[OK]"), flush=True, end="\n\n")
 
-    # evaluate all tasks
-    logger.debug("Evaluating %d Tasks ...", len(tasks))
-    for task_nbr, task in enumerate(tasks, start=1):
-        logger.debug("Evaluating Task %s ...", task.NAME)
-        try:
-            report = task.evaluate(embedding)
-            print(report, end="\n\n", flush=True)
-        except Exception as exc:
-            print(
-                cf.firebrick(f"Failed to evaluate task: {exc}"), end="\n\n", flush=True
-            )
-        logger.debug("Evaluated %d of %d Tasks", task_nbr, len(tasks))
+    print(
+        f"Built an index with {engine.index.n_clusters} clusters "
+        f"for the embedding {path_to_embedding} at {index_path}"
+    )
+
+    n_recall_queries = min(n_recall_queries, embedding.shape[0])
+    if n_recall_queries > 0:
+        recall, exact_duration, approximate_duration = measure_recall(
+            engine, n_recall_queries, topn
+        )
+        print(
+            f"Recall@{topn} for {n_recall_queries} random words with "
+            f"{min(n_probe, engine.index.n_clusters)} probed clusters: "
+            f"{cf.bold(f'{recall:.2%}')}"
+        )
+        print(
+            f"Exact search: {exact_duration:.2f}s, "
+            f"approximate search: {approximate_duration:.2f}s"
+        )
 
 
 @cli.command("tasks")
@@ -172,7 +709,7 @@ def tasks_cli_command(additional_tasks_path):
 
     # nicely print all available loaded tasks
     print("The following tasks are available for evaluation:")
-    for task_name in sorted(task_registry.tasks):
+    for task_name in task_registry.get_task_names():
         print(f"    * {cf.bold(task_name)}")
 
 
@@ -255,11 +792,9 @@ def create_task_cli_command(
             tasks_paths.append(additional_tasks_path)
         load_tasks(tasks_paths)
 
-        base_task_cls = next(
-            (x for x in task_registry.tasks.values() if x.NAME == based_on), None
-        )
-
-        if base_task_cls is None:
+        try:
+            base_task_cls = task_registry.get_task_cls(based_on)
+        except EmbedevalError:
             print(f"Error: Task {based_on} is not known to embedeval", file=sys.stderr)
             raise click.Abort()
 
@@ -0,0 +1,193 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+
+logger = get_component_logger("compression")
+
+#: Holds the magic bytes at the start of a file for every supported compression
+MAGIC_BYTES = {
+    "gzip": b"\x1f\x8b",
+    "bzip2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+#: Holds the amount of decompressed bytes which are read ahead at once
+DEFAULT_READ_AHEAD_SIZE = 4 * 1024 * 1024
+
+#: Holds the amount of decompressed bytes which are sniffed to detect the format
+SNIFF_SIZE = 4096
+
+#: Holds the bytes of the word vector values in text Embeddings
+TEXT_VALUE_BYTES = frozenset(b"0123456789+-.eE \t\rnaNAinfINFtyTY")
+
+
+def detect_compression(path: Path) -> Optional[str]:
+    """Detect the compression of the given file by its magic bytes
+
+    ``None`` is returned for uncompressed files.
+    """
+    with open(path, "rb") as file:
+        head = file.read(max(len(magic) for magic in MAGIC_BYTES.values()))
+
+    for compression, magic in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_embedding(path: Path, read_ahead_size=DEFAULT_READ_AHEAD_SIZE) -> BinaryIO:
+    """Open the given Embedding file for reading its decompressed bytes
+
+    Compressed files are decompressed while they are read in a background
+    thread, which reads ahead up to two chunks of ``read_ahead_size`` bytes.
+    The compression libraries release the GIL while decompressing,
+    thus the decompression runs in parallel to the parsing
+    and the decompressed data is never entirely in memory or on disk.
+
+    zstd compressed files require the ``zstandard`` package.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return open(path, "rb")
+
+    logger.debug("Decompressing %s compressed Embedding %s", compression, path)
+    return io.BufferedReader(
+        _ReadAheadReader(_open_decompressed(path, compression), read_ahead_size),
+        buffer_size=read_ahead_size,
+    )
+
+
+def open_embedding_text(path: Path) -> io.TextIOWrapper:
+    """Open the given Embedding file for reading its decompressed UTF-8 text
+
+    Like gensim, invalid UTF-8 bytes are ignored.
+    """
+    return io.TextIOWrapper(open_embedding(path), encoding="utf-8", errors="ignore")
+
+
+def is_binary_embedding(path: Path) -> bool:
+    """Check if the given Embedding file is in a binary format
+
+    The first decompressed bytes are sniffed: in word2vec Embeddings the first
+    word after the N x M header line is followed by its vector either as text
+    values or as raw ``float32`` bytes, which are almost never all characters
+    of text values. Files without a header are binary only if they contain
+    NUL bytes, like fastText models.
+
+    The words themselves are not checked, because they
+    may not be valid UTF-8 in text Embeddings, too.
+    """
+    with open_embedding(path) as embedding_file:
+        head = embedding_file.read(SNIFF_SIZE)
+
+    header_line, newline, rest = head.partition(b"\n")
+    header_values = header_line.split()
+    if (
+        not newline
+        or len(header_values) != 2
+        or not all(value.isdigit() for value in header_values)
+    ):
+        return b"\x00" in head
+
+    word_end = rest.find(b" ")
+    if word_end < 0:
+        return False
+    first_values = rest[word_end + 1 :].partition(b"\n")[0]
+    return not set(first_values) <= TEXT_VALUE_BYTES
+
+
+def _open_decompressed(path: Path, compression: str) -> BinaryIO:
+    """Open a decompressing file object for the given compression"""
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "bzip2":
+        return bz2.open(path, "rb")
+    if compression == "xz":
+        return lzma.open(path, "rb")
+
+    try:
+        import zstandard
+    except ImportError:
+        raise EmbedevalError(
+            f"The Embedding {path} is zstd compressed, "
+            "install the zstandard package to read it"
+        )
+
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+
+
+class _ReadAheadReader(io.RawIOBase):
+    """Raw binary stream which reads chunks of another stream in a background thread"""
+
+    def __init__(self, file: BinaryIO, chunk_size: int):
+        self._file = file
+        self._chunks: "queue.Queue" = queue.Queue(maxsize=2)
+        self._chunk = memoryview(b"")
+        self._is_eof = False
+        self._is_closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._read_chunks, args=(chunk_size,), daemon=True
+        )
+        self._thread.start()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._chunk:
+            if self._is_eof:
+                return 0
+
+            chunk = self._chunks.get()
+            if isinstance(chunk, Exception):
+                self._is_eof = True
+                raise EmbedevalError(f"Failed to decompress the Embedding: {chunk}")
+            self._is_eof = not chunk
+            self._chunk = memoryview(chunk)
+
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._is_closed.set()
+            # NOTE: the reader thread may wait for a free slot in the queue
+            while self._thread.is_alive():
+                try:
+                    self._chunks.get(timeout=0.01)
+                except queue.Empty:
+                    pass
+            self._file.close()
+        super().close()
+
+    def _read_chunks(self, chunk_size):
+        """Read the chunks of the other stream until its end, this runs in the thread"""
+        try:
+            while not self._is_closed.is_set():
+                chunk = self._file.read(chunk_size)
+                self._chunks.put(chunk)
+                if not chunk:
+                    break
+        except Exception as exc:
+            self._chunks.put(exc)
@@ -8,12 +8,44 @@ NLP Embedding Evaluation Tool
 :license: MIT, see LICENSE for more details.
 """
 
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Sequence,
+    Tuple,
+)
 from pathlib import Path
 
 import numpy as np
 
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+from embedeval.vocabulary import Vocabulary
+
+if TYPE_CHECKING:  # pragma: no cover
+    from embedeval.similarity import SimilarityEngine
+
+logger = get_component_logger("embedding")
+
+#: Holds the attributes of the state which every Word Embedding has,
+#  see ``WordEmbedding._init_state()``
+STATE_ATTRIBUTES = frozenset(
+    [
+        "_similarity_engine_lock",
+        "_similarity_engine",
+        "_derived_views_lock",
+        "_derived_views",
+    ]
+)
+
+#: Holds the lock to initialize the state of a Word Embedding on first access
+_state_lock = threading.Lock()
+
 
 class WordEmbedding(ABC):
     """Representation of a loaded immutable Word Embedding
@@ -27,6 +59,40 @@ class WordEmbedding(ABC):
     the position in the vector space for each word.
     """
 
+    def __init__(self) -> None:
+        self._init_state()
+
+    def __getattr__(self, name: str):
+        """Initialize the state on first access
+
+        Subclasses which don't call ``WordEmbedding.__init__()``
+        get their locks and derived views when they are first used.
+        """
+        if name not in STATE_ATTRIBUTES:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+
+        with _state_lock:
+            self._init_state()
+        return vars(self)[name]
+
+    def _init_state(self) -> None:
+        """Initialize the locks and the derived views which aren't set yet"""
+        state = vars(self)
+        # NOTE: the locks are per Word Embedding, so that the derived views
+        #       and the Similarity Engines of different Word Embeddings
+        #       can be created concurrently.
+        #: Holds the lock to create the Similarity Engine only once
+        state.setdefault("_similarity_engine_lock", threading.Lock())
+        state.setdefault("_similarity_engine", None)
+
+        #: Holds the lock to compute the derived views only once.
+        #  It's reentrant, because the views may be derived from each other.
+        state.setdefault("_derived_views_lock", threading.RLock())
+        #: Holds the views derived from the word vectors by their name
+        state.setdefault("_derived_views", {})
+
     @property
     @abstractmethod
     def path(self) -> Path:
@@ -43,12 +109,344 @@ class WordEmbedding(ABC):
         """
         ...  # pragma: no cover
 
+    @property
+    def vectors(self) -> np.ndarray:
+        """Get the N x M matrix with the vectors of all words
+
+        The rows are in the same order as the words returned
+        by ``get_words()``.
+
+        By default the matrix is created from the word vector of every word,
+        each time it's accessed. Subclasses should return their matrix instead.
+        """
+        words = self.get_words()
+        vectors = np.zeros((len(words), self.shape[1]), dtype=np.float32)
+        for row, word in enumerate(words):
+            vectors[row] = self.get_word_vector(word)
+        return vectors
+
     @abstractmethod
     def get_words(self) -> List[str]:
         """Get a list of all words in the Word Embedding"""
         ...  # pragma: no cover
 
+    def get_words_at(self, indices: Iterable[int]) -> List[str]:
+        """Get the words at the given rows of the word vector matrix"""
+        words = self.get_words()
+        return [words[index] for index in indices]
+
     @abstractmethod
     def get_word_vector(self, word: str) -> np.array:
         """Get the word vector for the given word from Word Embedding"""
         ...  # pragma: no cover
+
+    def get_word_indices(self, words: Iterable[str]) -> np.ndarray:
+        """Get the rows of the given words in the word vector matrix
+
+        The row of a word which is not in the Word Embedding is -1.
+
+        By default the rows are looked up in a mapping of all words,
+        which is created for every call. Subclasses should look them up directly.
+        """
+        # NOTE: like in a ``dict``, the last row of a duplicate word is found.
+        rows = {word: row for row, word in enumerate(self.get_words())}
+        return np.fromiter((rows.get(word, -1) for word in words), dtype=np.int64)
+
+    def get_word_vectors(self, words: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the word vectors for all the given words from Word Embedding
+
+        A tuple of a len(words) x M matrix and a boolean mask is returned.
+        The mask tells which of the words were found in the Word Embedding.
+        The rows of the words which were not found are zero.
+
+        By default the word vectors are looked up one by one
+        with ``get_word_vector()``.
+        """
+        words = list(words)
+        vectors = np.zeros((len(words), self.shape[1]), dtype=np.float32)
+        found_mask = np.zeros(len(words), dtype=bool)
+        for row, word in enumerate(words):
+            try:
+                vectors[row] = self.get_word_vector(word)
+            except KeyError:
+                continue
+            found_mask[row] = True
+        return vectors, found_mask
+
+    @property
+    def normalized_vectors(self) -> np.ndarray:
+        """Get the word vectors normalized to unit length in ``float32``
+
+        The normalized word vectors are computed on first access and shared
+        by all Tasks, for example for the cosine similarity of words.
+        Word vectors with a length of zero stay zero.
+        """
+        return self._get_derived_view(
+            "normalized_vectors", self._create_normalized_vectors
+        )
+
+    @property
+    def vector_norms(self) -> np.ndarray:
+        """Get the length of every word vector
+
+        The lengths are computed on first access.
+        """
+        return self._get_derived_view("vector_norms", self._create_vector_norms)
+
+    @property
+    def centered_vectors(self) -> np.ndarray:
+        """Get the word vectors minus their mean in ``float32``
+
+        The centered word vectors are computed on first access.
+        """
+        return self._get_derived_view("centered_vectors", self._create_centered_vectors)
+
+    def get_memory_usage(self) -> Dict[str, int]:
+        """Get the bytes used by the word vectors and each derived view computed so far
+
+        Memory-mapped word vectors are not counted, because they are
+        only paged in from their file when accessed.
+        Arrays which share their memory with another array are only counted once.
+        """
+        arrays = {"vectors": self.vectors}
+        arrays.update(self._derived_views)
+
+        memory_usage = {}
+        counted_arrays: List[np.ndarray] = []
+        for name, array in arrays.items():
+            if isinstance(array, np.memmap) or any(
+                np.may_share_memory(array, counted) for counted in counted_arrays
+            ):
+                memory_usage[name] = 0
+            else:
+                memory_usage[name] = array.nbytes
+                counted_arrays.append(array)
+        return memory_usage
+
+    def drop_raw_vectors(self) -> None:
+        """Replace the raw word vectors by the normalized word vectors
+
+        This halves the memory if only the normalized word vectors
+        are needed, like for the similarity Tasks.
+        The lengths of the raw word vectors are computed before,
+        but all derived views which haven't been computed yet
+        are derived from the normalized word vectors afterwards.
+
+        Memory-mapped word vectors are kept, because they don't use memory.
+        """
+        if isinstance(self.vectors, np.memmap):
+            logger.debug("Keeping the memory-mapped word vectors of %s", self.path)
+            return
+
+        with self._derived_views_lock:
+            self.vector_norms  # noqa
+            self._replace_vectors(self.normalized_vectors)
+        logger.debug("Dropped the raw word vectors of %s", self.path)
+
+    def _replace_vectors(self, vectors: np.ndarray) -> None:
+        """Replace the word vectors of this Word Embedding"""
+        raise EmbedevalError(
+            f"The word vectors of a {type(self).__name__} cannot be replaced"
+        )
+
+    def _get_derived_view(
+        self, name: str, create: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        """Get the derived view with the given name and create it if necessary"""
+        with self._derived_views_lock:
+            derived_views = self._derived_views
+            if name not in derived_views:
+                derived_views[name] = create()
+                logger.debug(
+                    "Created %s of %s using %.1f MiB",
+                    name,
+                    self.path,
+                    derived_views[name].nbytes / 2 ** 20,
+                )
+            return derived_views[name]
+
+    def _create_normalized_vectors(self) -> np.ndarray:
+        from embedeval.similarity import normalize_vectors
+
+        return normalize_vectors(self.vectors)
+
+    def _create_vector_norms(self) -> np.ndarray:
+        from embedeval.similarity import calculate_norms
+
+        return calculate_norms(self.vectors)
+
+    def _create_centered_vectors(self) -> np.ndarray:
+        vectors = self.vectors
+        centered_vectors = np.asarray(vectors, dtype=np.float32).copy()
+        centered_vectors -= vectors.mean(axis=0, dtype=np.float64).astype(np.float32)
+        return centered_vectors
+
+    @property
+    def similarity_engine(self) -> "SimilarityEngine":
+        """Get the Similarity Engine for the nearest neighbours of words
+
+        It's created on first access, because it holds
+        a normalized copy of all word vectors.
+        """
+        with self._similarity_engine_lock:
+            if self._similarity_engine is None:
+                self._similarity_engine = self._create_similarity_engine()
+            return self._similarity_engine
+
+    def _create_similarity_engine(self) -> "SimilarityEngine":
+        """Create the Similarity Engine for this Word Embedding"""
+        from embedeval.similarity import SimilarityEngine
+
+        return SimilarityEngine(self)
+
+    def restrict_vocab(self, size: int) -> "WordEmbedding":
+        """Get a view on the first ``size`` words of the Word Embedding
+
+        word2vec files are ordered by the frequency of the words,
+        thus the view contains the ``size`` most frequent words.
+        Searches for similar words only consider the words in the view.
+
+        The view doesn't copy the word vectors.
+        """
+        return PrefixWordEmbedding(self, size)
+
+    def most_similar(
+        self,
+        positive: Sequence[str] = (),
+        negative: Sequence[str] = (),
+        topn=10,
+        approximate=False,
+    ) -> List[Tuple[str, float]]:
+        """Get the most similar words using the 3CosAdd method
+
+        See ``SimilarityEngine.most_similar()``.
+        """
+        return self.similarity_engine.most_similar(
+            positive, negative, topn, approximate
+        )
+
+    def most_similar_cosmul(
+        self,
+        positive: Sequence[str] = (),
+        negative: Sequence[str] = (),
+        topn=10,
+        approximate=False,
+    ) -> List[Tuple[str, float]]:
+        """Get the most similar words using the 3CosMul method
+
+        See ``SimilarityEngine.most_similar_cosmul()``.
+        """
+        return self.similarity_engine.most_similar_cosmul(
+            positive, negative, topn, approximate
+        )
+
+    def doesnt_match(self, words: Sequence[str]) -> str:
+        """Get the word which doesn't match the others
+
+        See ``SimilarityEngine.doesnt_match()``.
+        """
+        return self.similarity_engine.doesnt_match(words)
+
+
+class PrefixWordEmbedding(WordEmbedding):
+    """Represents a view on the first words of another Word Embedding
+
+    The word vectors of the view are a slice of the word vector matrix
+    of the other Word Embedding and are therefore not copied.
+    If the other Word Embedding already has a Similarity Engine,
+    its normalized word vectors and its index are shared as well.
+    """
+
+    def __init__(self, embedding: WordEmbedding, size: int):
+        super().__init__()
+        #: Holds the Word Embedding this is a view on
+        self.embedding = embedding
+        #: Holds the amount of words in the view
+        self.size = min(size, embedding.shape[0])
+        # NOTE: words which occur multiple times are looked up in the
+        #       vocabulary of the view, which finds their last row within it.
+        vocabulary = getattr(embedding, "vocabulary", None)
+        #: Holds the vocabulary of the view if the other Word Embedding has one
+        self.vocabulary = (
+            vocabulary.prefix(self.size) if isinstance(vocabulary, Vocabulary) else None
+        )
+
+    @property
+    def path(self) -> Path:
+        return self.embedding.path
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.size, self.embedding.shape[1])
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self.embedding.vectors[: self.size]
+
+    def get_words(self) -> List[str]:
+        return self.embedding.get_words_at(range(self.size))
+
+    def get_words_at(self, indices: Iterable[int]) -> List[str]:
+        return self.embedding.get_words_at(indices)
+
+    def get_word_vector(self, word: str) -> np.array:
+        row = self.get_word_indices([word])[0]
+        if row < 0:
+            raise KeyError(word)
+        return self.vectors[row]
+
+    def get_word_indices(self, words: Iterable[str]) -> np.ndarray:
+        if self.vocabulary is not None:
+            return self.vocabulary.get_rows(words)
+
+        rows = self.embedding.get_word_indices(words)
+        rows[rows >= self.size] = -1
+        return rows
+
+    def get_word_vectors(self, words: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        return gather_word_vectors(self.vectors, self.get_word_indices(words))
+
+    def restrict_vocab(self, size: int) -> WordEmbedding:
+        return PrefixWordEmbedding(self.embedding, min(size, self.size))
+
+    def drop_raw_vectors(self) -> None:
+        """Drop the raw word vectors of the other Word Embedding
+
+        See ``WordEmbedding.drop_raw_vectors()``.
+        """
+        self.embedding.drop_raw_vectors()
+
+    def _create_normalized_vectors(self) -> np.ndarray:
+        derived_views = self.embedding._derived_views
+        if "normalized_vectors" in derived_views:
+            return derived_views["normalized_vectors"][: self.size]
+        return super()._create_normalized_vectors()
+
+    def _create_vector_norms(self) -> np.ndarray:
+        derived_views = self.embedding._derived_views
+        if "vector_norms" in derived_views:
+            return derived_views["vector_norms"][: self.size]
+        return super()._create_vector_norms()
+
+    def _create_similarity_engine(self) -> "SimilarityEngine":
+        from embedeval.similarity import SimilarityEngine
+
+        # NOTE: the lock is already held, thus the Similarity Engine
+        #       of the other Word Embedding is not created here.
+        engine = self.embedding._similarity_engine
+        return SimilarityEngine(self, index=None if engine is None else engine.index)
+
+
+def gather_word_vectors(
+    vectors: np.ndarray, rows: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Gather the given rows from the word vector matrix
+
+    Rows with a negative index are treated as not found
+    and filled with zeros.
+    This is a helper for the ``get_word_vectors()`` implementations.
+    """
+    found_mask = rows >= 0
+    word_vectors = np.zeros((len(rows), vectors.shape[1]), dtype=vectors.dtype)
+    word_vectors[found_mask] = vectors[rows[found_mask]]
+    return word_vectors, found_mask
@@ -0,0 +1,154 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse
+
+if TYPE_CHECKING:  # pragma: no cover
+    from embedeval.embedding import WordEmbedding
+
+#: Holds the index of the padding in the token matrices, which is never a word
+PADDING_INDEX = 0
+
+
+def encode_sequences(
+    sequences: Iterable[Sequence[int]], vocab_size: int
+) -> scipy.sparse.csr_matrix:
+    """Encode the given sequences of word indices in a sparse token matrix
+
+    Every row of the ``len(sequences) x vocab_size`` matrix holds the word
+    indices of a sequence in their original order with a value of one,
+    a word which occurs multiple times is stored multiple times.
+    Thus, the matrix is a bag of words in matrix products and
+    at the same time still holds the sequences without any padding.
+    """
+    lengths = []
+    indices = []
+    for sequence in sequences:
+        lengths.append(len(sequence))
+        indices.extend(sequence)
+
+    indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    # NOTE: the indices are neither sorted nor summed up, to keep the order of the words
+    return scipy.sparse.csr_matrix(
+        (
+            np.ones(len(indices), dtype=np.float32),
+            np.asarray(indices, dtype=np.int64),
+            indptr,
+        ),
+        shape=(len(lengths), vocab_size),
+    )
+
+
+def encode_corpus(
+    tokenized_corpus: Iterable[Sequence[str]], word_index: Mapping[str, int]
+) -> scipy.sparse.csr_matrix:
+    """Encode the given tokenized sentences in a sparse token matrix
+
+    Words which are not in the ``word_index`` are left out.
+    See ``encode_sequences()``.
+    """
+    return encode_sequences(
+        (
+            [word_index[token] for token in tokens if token in word_index]
+            for tokens in tokenized_corpus
+        ),
+        max(word_index.values(), default=PADDING_INDEX) + 1,
+    )
+
+
+def get_sequence_lengths(token_matrix: scipy.sparse.csr_matrix) -> np.ndarray:
+    """Get the amount of words of every sequence of the token matrix"""
+    return np.diff(token_matrix.indptr)
+
+
+def to_padded_sequences(
+    token_matrix: scipy.sparse.csr_matrix, length: Optional[int] = None
+) -> np.ndarray:
+    """Convert the token matrix to a dense matrix of padded sequences
+
+    Like the ``keras`` ``pad_sequences()`` with ``padding="post"``,
+    longer sequences are truncated at the beginning.
+    The ``length`` defaults to the longest sequence.
+    """
+    lengths = get_sequence_lengths(token_matrix)
+    if length is None:
+        length = int(lengths.max(initial=0))
+
+    kept_lengths = np.minimum(lengths, length)
+    rows = np.repeat(np.arange(len(lengths)), kept_lengths)
+    columns = np.arange(len(rows)) - np.repeat(
+        np.cumsum(kept_lengths) - kept_lengths, kept_lengths
+    )
+    starts = token_matrix.indptr[1:] - kept_lengths
+
+    padded_sequences = np.full((len(lengths), length), PADDING_INDEX, dtype=np.int32)
+    padded_sequences[rows, columns] = token_matrix.indices[
+        np.repeat(starts, kept_lengths) + columns
+    ]
+    return padded_sequences
+
+
+def calculate_inverse_document_frequencies(
+    token_matrix: scipy.sparse.csr_matrix,
+) -> np.ndarray:
+    """Calculate the smoothed inverse document frequency of every word"""
+    binary_matrix = token_matrix.copy()
+    binary_matrix.sum_duplicates()
+    document_frequencies = np.bincount(
+        binary_matrix.indices, minlength=binary_matrix.shape[1]
+    )
+    return np.log((1 + binary_matrix.shape[0]) / (1 + document_frequencies)) + 1
+
+
+def create_embedding_matrix(
+    embedding: "WordEmbedding", word_index: Mapping[str, int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Gather the word vectors of the given words into an embedding matrix
+
+    Row ``i`` of the matrix is the word vector of the word with index ``i``.
+    The rows of the padding and of the words which are not in the
+    Word Embedding are zero.
+    A mask of the rows with a word vector is returned as well.
+    """
+    vocab_size = max(word_index.values(), default=PADDING_INDEX) + 1
+    embedding_matrix = np.zeros((vocab_size, embedding.shape[1]))
+    word_vectors, found_mask = embedding.get_word_vectors(word_index)
+    indices = np.fromiter(word_index.values(), dtype=np.int64)
+    embedding_matrix[indices[found_mask]] = word_vectors[found_mask]
+
+    known_rows = np.zeros(vocab_size, dtype=bool)
+    known_rows[indices[found_mask]] = True
+    return embedding_matrix, known_rows
+
+
+def create_sentence_vectors(
+    token_matrix: scipy.sparse.csr_matrix,
+    embedding_matrix: np.ndarray,
+    word_weights: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Create the weighted mean of the word vectors of every sentence
+
+    The weighted sum of the word vectors of all sentences is a single
+    sparse matrix product with the embedding matrix, whose cost only
+    depends on the amount of words and not on the longest sentence.
+    Words with a weight of zero are ignored, by default all words
+    have the same weight.
+    """
+    if word_weights is not None:
+        token_matrix = token_matrix @ scipy.sparse.diags(
+            np.asarray(word_weights, dtype=np.float64)
+        )
+    total_weights = np.asarray(token_matrix.sum(axis=1)).ravel()
+    sentence_vectors = np.asarray(token_matrix @ embedding_matrix)
+    return sentence_vectors / np.maximum(total_weights, 1e-12)[:, np.newaxis]
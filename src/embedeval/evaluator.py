@@ -0,0 +1,184 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import inspect
+import os
+import sys
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+import numpy as np
+
+from embedeval.embedding import WordEmbedding
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+from embedeval.parsers.word2vec_simple import SimpleWordEmbedding
+from embedeval.quantization import QuantizedWordEmbedding
+from embedeval.vocabulary import get_vocabulary
+from embedeval.taskregistry import load_module
+from embedeval.taskreport import TaskReport
+
+logger = get_component_logger("evaluator")
+
+#: Holds the Word Embedding shared with the Tasks in a process worker
+_worker_embedding: Optional[WordEmbedding] = None
+
+
+def evaluate_tasks(
+    embedding: WordEmbedding, tasks: List, jobs: int = 1, use_processes: bool = False
+) -> Iterator[Union[TaskReport, Exception]]:
+    """Evaluate the given Tasks on the given Word Embedding
+
+    Up to ``jobs`` Tasks are evaluated concurrently, either in threads
+    or in processes if ``use_processes`` is set.
+    Threads share the Word Embedding object.
+    Processes share the word vectors read-only through a memory-mapped file,
+    thus, they are never pickled.
+
+    The Task Reports are yielded in the order of the given Tasks as soon as
+    they are available. If a Task fails the exception is yielded instead.
+    If the Word Embedding cannot be shared with the processes,
+    an ``EmbedevalError`` is raised before any Task is evaluated.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _evaluate_task(task, embedding)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="embedeval-") as tmp_dir:
+        executor: Executor
+        if use_processes:
+            try:
+                shared_embedding = _share_embedding(embedding, Path(tmp_dir))
+            except Exception as exc:
+                raise EmbedevalError(
+                    f"Unable to share the Embedding {embedding.path} "
+                    f"with the worker processes: {exc}"
+                ) from exc
+
+            executor = ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_worker,
+                initargs=(
+                    shared_embedding,
+                    [inspect.getsourcefile(type(t)) for t in tasks],
+                ),
+            )
+            futures = [executor.submit(_evaluate_task_in_worker, t) for t in tasks]
+        else:
+            executor = ThreadPoolExecutor(max_workers=jobs)
+            futures = [executor.submit(_evaluate_task, t, embedding) for t in tasks]
+
+        with executor:
+            for future in futures:
+                try:
+                    yield future.result()
+                except Exception as exc:
+                    yield exc
+
+
+def _evaluate_task(task, embedding) -> Union[TaskReport, Exception]:
+    """Evaluate the given Task and return the exception if it fails"""
+    logger.debug("Evaluating Task %s ...", task.NAME)
+    try:
+        return task.evaluate(embedding)
+    except Exception as exc:
+        return exc
+
+
+def _evaluate_task_in_worker(task) -> Union[TaskReport, Exception]:
+    """Evaluate the given Task on the Word Embedding shared with this process"""
+    return _evaluate_task(task, _worker_embedding)
+
+
+def _share_embedding(embedding: WordEmbedding, tmp_dir: Path):
+    """Get the arguments to map the given Word Embedding in a process worker
+
+    The word vectors of a quantized Word Embedding are shared
+    as their codes, scales and lengths, thus the workers
+    map the word vectors in the reduced precision, too.
+    """
+    if isinstance(embedding, QuantizedWordEmbedding):
+        normalized_vectors = embedding.normalized_vectors
+        arrays = {
+            "codes": normalized_vectors.codes,
+            "scales": normalized_vectors.scales,
+            "norms": embedding.vector_norms,
+        }
+    else:
+        arrays = {"vectors": embedding.vectors}
+
+    # NOTE: the compact vocabulary is much smaller to pickle than a list of words
+    return (
+        embedding.path,
+        get_vocabulary(embedding),
+        {
+            name: _share_array(array, tmp_dir / f"{name}.bin")
+            for name, array in arrays.items()
+            if array is not None
+        },
+    )
+
+
+def _share_array(array: np.ndarray, tmp_path: Path):
+    """Get the arguments to map the given array in a process worker
+
+    If the array is already memory-mapped from an entire file,
+    like the word vectors of the native embedeval format, that file is shared.
+    Otherwise the array is written once to the given temporary file.
+    """
+    if (
+        isinstance(array, np.memmap)
+        and array.filename
+        and array.offset == 0
+        and array.flags["C_CONTIGUOUS"]
+        and os.path.exists(array.filename)
+        and os.path.getsize(array.filename) == array.nbytes
+    ):
+        array_path = array.filename
+        logger.debug("Sharing memory-mapped array from %s", array_path)
+    else:
+        array_path = str(tmp_path)
+        np.ascontiguousarray(array).tofile(array_path)
+        logger.debug("Sharing array through %s", array_path)
+
+    return array_path, array.shape, array.dtype.str
+
+
+def _map_array(shared_array) -> np.ndarray:
+    """Map an array shared by ``_share_array()`` read-only"""
+    array_path, shape, dtype = shared_array
+    if np.prod(shape) > 0:
+        return np.memmap(array_path, dtype=dtype, mode="r", shape=tuple(shape))
+    return np.empty(shape, dtype=dtype)
+
+
+def _init_worker(shared_embedding, task_module_paths):
+    """Initialize a process worker with the shared Word Embedding
+
+    The Task modules are loaded, too, because they are not
+    importable by their name if the worker process was spawned.
+    """
+    global _worker_embedding
+
+    for module_path in task_module_paths:
+        if Path(module_path).stem not in sys.modules:
+            load_module(Path(module_path))
+
+    path, vocabulary, shared_arrays = shared_embedding
+    arrays = {name: _map_array(array) for name, array in shared_arrays.items()}
+    if "codes" in arrays:
+        _worker_embedding = QuantizedWordEmbedding(
+            path, vocabulary, arrays["codes"], arrays.get("scales"), arrays["norms"]
+        )
+    else:
+        _worker_embedding = SimpleWordEmbedding(path, vocabulary, arrays["vectors"])
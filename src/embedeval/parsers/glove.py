@@ -0,0 +1,125 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from typing import List, Optional, Set
+from pathlib import Path
+
+import numpy as np
+
+from embedeval.compression import open_embedding_text
+from embedeval.errors import EmbedevalError
+from embedeval.embedding import WordEmbedding
+from embedeval.logger import get_component_logger
+from embedeval.parsers.word2vec_simple import (
+    DEFAULT_CHUNK_SIZE,
+    SimpleWordEmbedding,
+    _grow,
+    create_quantized_vectors_builder,
+    parse_lines,
+)
+from embedeval.vocabulary import Vocabulary
+
+logger = get_component_logger("glove-parser")
+
+#: Holds the amount of rows which are allocated before the first chunk is parsed
+INITIAL_ROWS = 1024
+
+
+def is_glove_embedding(path: Path) -> bool:
+    """Check if the given text Embedding file has no N x M header line
+
+    The first line of GloVe Embeddings is already a word and its vector,
+    while word2vec Embeddings start with exactly two integers.
+    """
+    with open_embedding_text(path) as embedding_file:
+        first_line = embedding_file.readline()
+
+    values = first_line.split()
+    if not values:
+        return False
+    return len(values) != 2 or not all(value.isdigit() for value in values)
+
+
+def load_embedding(
+    path: Path,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    required_words: Optional[Set[str]] = None,
+    max_words: Optional[int] = None,
+    precision="float32",
+) -> WordEmbedding:
+    """Load the given GloVe Word Embedding
+
+    GloVe Embeddings are word2vec text Embeddings without the
+    N x M header line, thus the size of the word vectors is
+    inferred from the first line and every other line must match it.
+
+    The file is read once in chunks of about ``chunk_size`` bytes.
+    The word vectors of every chunk are parsed with a single ``numpy`` call
+    into a ``float32`` matrix, which grows geometrically, because the
+    amount of words is unknown up front.
+
+    ``required_words``, ``max_words`` and ``precision`` are handled
+    like for ``embedeval.parsers.word2vec_simple.load_embedding()``.
+    Compressed files are decompressed while they are read.
+    """
+    with open_embedding_text(path) as glove_file:
+        lines = glove_file.readlines(chunk_size)
+        if not lines:
+            raise EmbedevalError(f"The GloVe Embedding {path} is empty")
+
+        word_vector_size = len(lines[0].lstrip(" ").partition(" ")[2].split())
+        if word_vector_size == 0:
+            raise EmbedevalError(
+                f"The first line of the GloVe Embedding {path} has no word vector"
+            )
+
+        words: List[str] = []
+        builder = create_quantized_vectors_builder(
+            precision, word_vector_size, INITIAL_ROWS
+        )
+        vectors = np.empty(
+            (INITIAL_ROWS if builder is None else 0, word_vector_size),
+            dtype=np.float32,
+        )
+
+        line_number = 1
+        while lines:
+            if max_words is not None:
+                lines = lines[: max_words - (line_number - 1)]
+            if not lines:
+                break
+
+            chunk_words, chunk_vectors = parse_lines(
+                lines, word_vector_size, line_number, required_words
+            )
+            line_number += len(lines)
+
+            if builder is not None:
+                builder.add(chunk_vectors)
+            else:
+                if len(words) + len(chunk_words) > len(vectors):
+                    vectors = _grow(vectors, len(words) + len(chunk_words))
+                vectors[len(words) : len(words) + len(chunk_words)] = chunk_vectors
+            words.extend(chunk_words)
+            lines = glove_file.readlines(chunk_size)
+
+    logger.debug(
+        "Loaded %d words with %d dimensions of the GloVe Embedding %s",
+        len(words),
+        word_vector_size,
+        path,
+    )
+    if builder is not None:
+        return builder.build(path, Vocabulary.from_words(words))
+
+    # NOTE: the unused rows of the geometrically grown matrix are released
+    #       in place, no other references to it exist.
+    vectors.resize((len(words), word_vector_size), refcheck=False)
+    return SimpleWordEmbedding(path, words, vectors)
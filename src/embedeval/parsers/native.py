@@ -0,0 +1,190 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from embedeval.embedding import WordEmbedding
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+from embedeval.parsers.word2vec_simple import SimpleWordEmbedding
+from embedeval.vocabulary import Vocabulary
+
+logger = get_component_logger("native-parser")
+
+#: Holds the version of the native embedeval Embedding format
+FORMAT_VERSION = 1
+
+#: Holds the suffix of the native Embedding directory next to the source Embedding
+CACHE_SUFFIX = ".embedeval"
+
+HEADER_FILENAME = "header.json"
+VECTORS_FILENAME = "vectors.bin"
+VOCABULARY_FILENAME = "vocabulary.txt"
+
+
+def get_cache_path(path: Path) -> Path:
+    """Get the path to the native Embedding directory for the given Embedding file"""
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def save_embedding(
+    embedding: WordEmbedding, source_path: Path, cache_path: Optional[Path] = None
+) -> Path:
+    """Save the given Word Embedding in the native embedeval format
+
+    The native format is a directory containing:
+
+    * the raw ``float32`` word vector matrix which can be memory-mapped
+    * the vocabulary with one word per line in the order of the matrix rows
+    * a JSON header with the shape, the dtype and the source file stats
+
+    The directory is written to a temporary location first and moved
+    into place at the end, so that readers never see a partial cache.
+    """
+    if cache_path is None:
+        cache_path = get_cache_path(source_path)
+
+    source_stat = source_path.stat()
+    header = {
+        "format_version": FORMAT_VERSION,
+        "shape": list(embedding.shape),
+        "dtype": "float32",
+        "source": {
+            "name": source_path.name,
+            "size": source_stat.st_size,
+            "mtime_ns": source_stat.st_mtime_ns,
+        },
+    }
+
+    tmp_cache_path = Path(
+        tempfile.mkdtemp(prefix=cache_path.name, dir=str(cache_path.parent))
+    )
+    try:
+        vectors = np.ascontiguousarray(embedding.vectors, dtype=np.float32)
+        vectors.tofile(str(tmp_cache_path / VECTORS_FILENAME))
+
+        with (tmp_cache_path / VOCABULARY_FILENAME).open(
+            "w", encoding="utf-8", newline="\n"
+        ) as vocabulary_file:
+            vocabulary_file.write("\n".join(embedding.get_words()))
+
+        with (tmp_cache_path / HEADER_FILENAME).open("w") as header_file:
+            json.dump(header, header_file, indent=4)
+
+        if cache_path.exists():
+            shutil.rmtree(str(cache_path))
+        os.replace(str(tmp_cache_path), str(cache_path))
+    except Exception as exc:
+        shutil.rmtree(str(tmp_cache_path), ignore_errors=True)
+        raise EmbedevalError(f"Failed to save Embedding to {cache_path}: {exc}")
+
+    logger.debug("Saved native Embedding for %s to %s", source_path, cache_path)
+    return cache_path
+
+
+def load_embedding(
+    source_path: Path, cache_path: Optional[Path] = None
+) -> Optional[SimpleWordEmbedding]:
+    """Load the native embedeval Embedding for the given source Embedding file
+
+    The word vectors are memory-mapped read-only and therefore
+    not read until they are accessed.
+
+    ``None`` is returned if there is no native Embedding or if
+    it's outdated, because the size or modification time of the
+    source Embedding file changed since it was saved.
+    An ``EmbedevalError`` is raised if the vocabulary or the word vectors
+    don't match the shape in the header, for example if they were truncated.
+    """
+    if cache_path is None:
+        cache_path = get_cache_path(source_path)
+
+    header = _read_header(cache_path)
+    if header is None or not _is_header_valid(header, source_path):
+        return None
+
+    word_size, word_vector_size = header["shape"]
+    # NOTE: the vocabulary is read as raw bytes into the compact
+    #       Vocabulary without creating a string for every word.
+    if word_size > 0:
+        vocabulary = Vocabulary.from_lines(
+            (cache_path / VOCABULARY_FILENAME).read_bytes()
+        )
+    else:
+        vocabulary = Vocabulary.from_words([])
+
+    if len(vocabulary) != word_size:
+        raise EmbedevalError(
+            f"Promised word size {word_size} from native Embedding header "
+            f"wasn't matched with a vocabulary size of {len(vocabulary)}"
+        )
+
+    vectors_path = cache_path / VECTORS_FILENAME
+    vectors_nbytes = word_size * word_vector_size * np.dtype(header["dtype"]).itemsize
+    try:
+        actual_vectors_nbytes = vectors_path.stat().st_size
+    except FileNotFoundError:
+        actual_vectors_nbytes = 0
+    if actual_vectors_nbytes != vectors_nbytes:
+        raise EmbedevalError(
+            f"Promised shape {word_size}x{word_vector_size} from native Embedding "
+            f"header needs {vectors_nbytes} bytes of word vectors, "
+            f"but {vectors_path} has {actual_vectors_nbytes} bytes"
+        )
+
+    if word_size * word_vector_size > 0:
+        vectors = np.memmap(
+            str(vectors_path),
+            dtype=header["dtype"],
+            mode="r",
+            shape=(word_size, word_vector_size),
+        )
+    else:
+        vectors = np.empty((word_size, word_vector_size), dtype=header["dtype"])
+
+    logger.debug("Loaded native Embedding for %s from %s", source_path, cache_path)
+    return SimpleWordEmbedding(source_path, vocabulary, vectors)
+
+
+def _read_header(cache_path: Path) -> Optional[Dict[str, Any]]:
+    """Read the header of the native Embedding in the given directory"""
+    try:
+        with (cache_path / HEADER_FILENAME).open("r") as header_file:
+            return json.load(header_file)
+    except FileNotFoundError:
+        return None
+    except ValueError as exc:
+        logger.debug("Ignoring native Embedding with invalid header: %s", exc)
+        return None
+
+
+def _is_header_valid(header: Dict[str, Any], source_path: Path) -> bool:
+    """Check if the given native Embedding header is valid for the source file"""
+    if header.get("format_version") != FORMAT_VERSION:
+        logger.debug("Ignoring native Embedding with different format version")
+        return False
+
+    source_stat = source_path.stat()
+    source = header.get("source", {})
+    if (
+        source.get("size") != source_stat.st_size
+        or source.get("mtime_ns") != source_stat.st_mtime_ns
+    ):
+        logger.debug("Ignoring outdated native Embedding for %s", source_path)
+        return False
+
+    return True
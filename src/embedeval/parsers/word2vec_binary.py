@@ -0,0 +1,241 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import mmap
+from typing import List, Optional, Set
+from pathlib import Path
+
+import numpy as np
+
+from embedeval.compression import detect_compression, open_embedding
+from embedeval.errors import EmbedevalError
+from embedeval.embedding import WordEmbedding
+from embedeval.logger import get_component_logger
+from embedeval.parsers.word2vec_simple import (
+    SimpleWordEmbedding,
+    _grow,
+    create_quantized_vectors_builder,
+    parse_header,
+)
+from embedeval.vocabulary import Vocabulary
+
+logger = get_component_logger("binary-parser")
+
+#: Holds the first bytes of a fastText model, which isn't a word2vec binary file
+FASTTEXT_MAGIC = (793712314).to_bytes(4, "little")
+
+#: Holds the amount of decompressed bytes which are read at once from compressed files
+DEFAULT_READ_SIZE = 4 * 1024 * 1024
+
+#: Holds the amount of word vectors which are quantized at once
+BLOCK_SIZE = 16384
+
+
+def load_embedding(
+    path: Path,
+    required_words: Optional[Set[str]] = None,
+    max_words: Optional[int] = None,
+    precision="float32",
+) -> WordEmbedding:
+    """Load the given binary Word2Vec Word Embedding
+
+    The format expects the N x M matrix size in a text header line,
+    followed by every word terminated by a space and its word vector
+    as M little-endian ``float32`` values, optionally followed by a newline.
+
+    The file is memory-mapped and scanned once for the offsets of the
+    word vectors, without reading the vectors themselves.
+    Then all word vectors are gathered from the mapped bytes into a
+    single ``float32`` matrix with one strided copy.
+
+    Like gensim, bytes of the words which aren't valid UTF-8 are ignored.
+
+    If ``required_words`` are given, only the vectors of those words are kept.
+
+    If ``max_words`` is given, only the first ``max_words`` words are read,
+    which are the most frequent words in word2vec files.
+
+    Compressed files can't be memory-mapped, thus they are decompressed
+    in chunks and the word vectors are copied into the matrix one by one.
+
+    If a ``precision`` other than ``float32`` is given, the word vectors
+    are gathered and quantized block by block into a ``QuantizedWordEmbedding``,
+    see ``embedeval.quantization.QuantizedVectorsBuilder``.
+    """
+    if detect_compression(path) is not None:
+        with open_embedding(path) as word2vec_file:
+            return _parse_stream(
+                path, word2vec_file, required_words, max_words, precision
+            )
+
+    with open(path, "rb") as word2vec_file:
+        try:
+            mapped_file = mmap.mmap(word2vec_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise EmbedevalError(f"The binary Embedding file {path} is empty")
+
+    try:
+        return _parse_mapped_file(
+            path, mapped_file, required_words, max_words, precision
+        )
+    finally:
+        mapped_file.close()
+
+
+def _parse_header_line(path, header_line):
+    """Parse the N x M Embedding size from the given raw header line"""
+    if header_line.startswith(FASTTEXT_MAGIC):
+        raise EmbedevalError(
+            f"The binary Embedding file {path} is a fastText model "
+            "and not in the word2vec binary format, use the .vec file instead"
+        )
+
+    try:
+        return parse_header(header_line.decode("ascii"))
+    except UnicodeDecodeError:
+        raise EmbedevalError(
+            f"The binary Embedding file {path} doesn't start with a text header line"
+        )
+
+
+def _parse_stream(path, word2vec_file, required_words, max_words, precision):
+    """Parse the word2vec binary format from the given stream in chunks
+
+    For quantized word vectors the matrix only holds a block of them.
+    """
+    word_size, word_vector_size = _parse_header_line(path, word2vec_file.readline())
+    line_size = word_size if max_words is None else min(word_size, max_words)
+
+    vector_bytes = word_vector_size * np.dtype(np.float32).itemsize
+    words: List[str] = []
+    expected_word_size = (
+        line_size if required_words is None else min(line_size, len(required_words))
+    )
+    builder = create_quantized_vectors_builder(
+        precision, word_vector_size, expected_word_size
+    )
+    vectors = np.empty(
+        (expected_word_size if builder is None else BLOCK_SIZE, word_vector_size),
+        dtype=np.float32,
+    )
+    # the first row of the words in the matrix
+    block_start = 0
+    buffer = b""
+    position = 0
+    for row in range(line_size):
+        word_end = buffer.find(b" ", position)
+        while word_end == -1 or word_end + 1 + vector_bytes > len(buffer):
+            chunk = word2vec_file.read(DEFAULT_READ_SIZE)
+            if not chunk:
+                raise EmbedevalError(
+                    f"Promised word size {word_size} from header "
+                    f"wasn't matched with a size of {row}"
+                )
+            buffer = buffer[position:] + chunk
+            position = 0
+            word_end = buffer.find(b" ", position)
+
+        # NOTE: the newline after the previous word vector is optional
+        word = buffer[position:word_end].lstrip(b"\n").decode("utf-8", errors="ignore")
+        if required_words is None or word in required_words:
+            if len(words) - block_start == len(vectors):
+                if builder is None:
+                    vectors = _grow(vectors, len(words) + 1)
+                else:
+                    builder.add(vectors)
+                    block_start = len(words)
+            vectors[len(words) - block_start] = np.frombuffer(
+                buffer, dtype="<f4", count=word_vector_size, offset=word_end + 1
+            )
+            words.append(word)
+        position = word_end + 1 + vector_bytes
+
+    if builder is not None:
+        builder.add(vectors[: len(words) - block_start])
+        return builder.build(path, Vocabulary.from_words(words))
+    return SimpleWordEmbedding(path, words, vectors[: len(words)])
+
+
+def _parse_mapped_file(path, mapped_file, required_words, max_words, precision):
+    """Parse the word2vec binary format from the given memory-mapped file"""
+    header_end = mapped_file.find(b"\n")
+    if header_end == -1:
+        header_end = len(mapped_file)
+    word_size, word_vector_size = _parse_header_line(path, mapped_file[:header_end])
+    line_size = word_size if max_words is None else min(word_size, max_words)
+
+    vector_bytes = word_vector_size * np.dtype(np.float32).itemsize
+    words: List[str] = []
+    offsets = np.empty(line_size, dtype=np.int64)
+    position = header_end + 1
+    for row in range(line_size):
+        word_end = mapped_file.find(b" ", position)
+        if word_end == -1 or word_end + 1 + vector_bytes > len(mapped_file):
+            raise EmbedevalError(
+                f"Promised word size {word_size} from header "
+                f"wasn't matched with a size of {row}"
+            )
+
+        # NOTE: the newline after the previous word vector is optional
+        words.append(
+            mapped_file[position:word_end]
+            .lstrip(b"\n")
+            .decode("utf-8", errors="ignore")
+        )
+        offsets[row] = word_end + 1
+        position = word_end + 1 + vector_bytes
+
+    if required_words is not None:
+        selected_rows = [
+            row for row, word in enumerate(words) if word in required_words
+        ]
+        words = [words[row] for row in selected_rows]
+        offsets = offsets[selected_rows]
+        logger.debug(
+            "Loaded %d of %d words required by the Tasks", len(words), line_size
+        )
+
+    builder = create_quantized_vectors_builder(
+        precision, word_vector_size, len(offsets)
+    )
+    if builder is not None:
+        for start in range(0, len(offsets), BLOCK_SIZE):
+            builder.add(
+                _gather_vectors(
+                    mapped_file, offsets[start : start + BLOCK_SIZE], vector_bytes
+                ).reshape(-1, word_vector_size)
+            )
+        return builder.build(path, Vocabulary.from_words(words))
+
+    vectors = _gather_vectors(mapped_file, offsets, vector_bytes)
+    return SimpleWordEmbedding(
+        path, words, vectors.reshape(len(words), word_vector_size)
+    )
+
+
+def _gather_vectors(mapped_file, offsets, vector_bytes):
+    """Copy the word vectors at the given byte offsets into a ``float32`` matrix
+
+    The word vectors aren't aligned at a fixed stride, because the
+    words have different lengths. Instead, the mapped bytes are viewed
+    as a strided matrix of overlapping windows of ``vector_bytes`` bytes
+    starting at every byte, of which the rows at the offsets are
+    copied with a single fancy-indexing operation.
+    """
+    if len(offsets) == 0:
+        return np.empty((0, vector_bytes // 4), dtype=np.float32)
+
+    mapped_bytes = np.frombuffer(mapped_file, dtype=np.uint8)
+    windows = np.lib.stride_tricks.sliding_window_view(mapped_bytes, vector_bytes)
+    vectors = windows[offsets]
+    # NOTE: the memory mapping can only be closed without views on it.
+    del windows, mapped_bytes
+
+    return vectors.view(np.dtype("<f4")).astype(np.float32, copy=False)
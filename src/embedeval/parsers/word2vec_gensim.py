@@ -8,13 +8,13 @@ NLP Embedding Evaluation Tool
 :license: MIT, see LICENSE for more details.
 """
 
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple
 from pathlib import Path
 
 import numpy as np
 from gensim.models import KeyedVectors
 
-from embedeval.embedding import WordEmbedding
+from embedeval.embedding import WordEmbedding, gather_word_vectors
 from embedeval.errors import EmbedevalError
 
 
@@ -28,6 +28,7 @@ class KeyedVectorsWordEmbedding(WordEmbedding):
     """
 
     def __init__(self, path, keyed_vectors):
+        super().__init__()
         self._path = path
         #: Holds the gensim KeyedVectors instance
         self.keyed_vectors = keyed_vectors
@@ -40,24 +41,68 @@ class KeyedVectorsWordEmbedding(WordEmbedding):
     def shape(self) -> Tuple[int, int]:
         return (len(self.keyed_vectors.vectors), self.keyed_vectors.vector_size)
 
+    @property
+    def vectors(self) -> np.ndarray:
+        return self.keyed_vectors.vectors
+
     def get_words(self) -> List[str]:
-        return list(self.keyed_vectors.vocab.keys())
+        return list(self._get_index_to_key())
+
+    def get_words_at(self, indices: Iterable[int]) -> List[str]:
+        index_to_key = self._get_index_to_key()
+        return [index_to_key[index] for index in indices]
 
     def get_word_vector(self, word: str) -> np.array:
-        return self.keyed_vectors.word_vec(word)
+        return self.keyed_vectors.get_vector(word)
+
+    def get_word_indices(self, words: Iterable[str]) -> np.ndarray:
+        key_to_index = getattr(self.keyed_vectors, "key_to_index", None)
+        if key_to_index is not None:
+            return np.fromiter(
+                (key_to_index.get(word, -1) for word in words), dtype=np.int64
+            )
+
+        vocab = self.keyed_vectors.vocab
+        return np.fromiter(
+            (vocab[word].index if word in vocab else -1 for word in words),
+            dtype=np.int64,
+        )
+
+    def get_word_vectors(self, words: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        return gather_word_vectors(
+            self.keyed_vectors.vectors, self.get_word_indices(words)
+        )
+
+    def _get_index_to_key(self) -> List[str]:
+        """Get the words in the order of their rows
+
+        NOTE: gensim 4 renamed ``index2word`` to ``index_to_key``
+              and replaced the ``vocab`` with ``key_to_index``.
+        """
+        index_to_key = getattr(self.keyed_vectors, "index_to_key", None)
+        if index_to_key is None:
+            index_to_key = self.keyed_vectors.index2word
+        return index_to_key
 
+    def _replace_vectors(self, vectors: np.ndarray) -> None:
+        self.keyed_vectors.vectors = vectors
 
-def load_embedding(path: Path, binary=False) -> KeyedVectorsWordEmbedding:
+
+def load_embedding(
+    path: Path, binary=False, max_words: Optional[int] = None
+) -> KeyedVectorsWordEmbedding:
     """Load the given Word2Vec Word Embedding using gensim
 
     The ``gensim.load_word2vec_format`` function is used to parse
     the word2vec Embdding file.
     The ``gensim.models.keyedvectors.KeyedVectors`` is wrapped in the
     embedeval specific ``WordEmbedding`` object.
+
+    If ``max_words`` is given, only the first ``max_words`` words are loaded.
     """
     try:
         keyed_vectors = KeyedVectors.load_word2vec_format(
-            path, binary=binary, unicode_errors="ignore"
+            path, binary=binary, unicode_errors="ignore", limit=max_words
         )
     except Exception as exc:
         raise EmbedevalError(
@@ -8,25 +8,52 @@ NLP Embedding Evaluation Tool
 :license: MIT, see LICENSE for more details.
 """
 
-from typing import List, Tuple
+import io
+import os
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterable, List, Optional, Set, Tuple, Union
 from pathlib import Path
 
 import numpy as np
 
+from embedeval.compression import detect_compression, open_embedding_text
 from embedeval.errors import EmbedevalError
-from embedeval.embedding import WordEmbedding
+from embedeval.embedding import WordEmbedding, gather_word_vectors
+from embedeval.logger import get_component_logger
+from embedeval.vocabulary import Vocabulary
+
+if TYPE_CHECKING:  # pragma: no cover
+    from embedeval.quantization import QuantizedVectorsBuilder
+
+logger = get_component_logger("simple-parser")
+
+#: Holds the approximate amount of bytes which are parsed at once
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+#: Holds the amount of byte ranges per worker for the parallel parser
+#  More ranges than workers balance differently fast workers.
+RANGES_PER_WORKER = 4
 
 
 class SimpleWordEmbedding(WordEmbedding):
     """Represents a word2vec specific Word Embedding
 
-    This Word Embedding should only be used for small datasets
-    as it's purely implemented in Python and therefore somewhat slow.
+    The word vectors are stored in a single ``float32``
+    matrix of the shape N x M, which may be memory-mapped.
+    The row of each word in that matrix is looked up
+    in the compact ``self.vocabulary``.
     """
 
-    def __init__(self, path, word_vectors):
+    def __init__(self, path, words: Union[Iterable[str], Vocabulary], vectors):
+        super().__init__()
         self._path = path
-        self.word_vectors = word_vectors
+        #: Holds the words in the order of the rows in ``self.vectors``
+        self.vocabulary = (
+            words if isinstance(words, Vocabulary) else Vocabulary.from_words(words)
+        )
+        self._vectors = vectors
 
     @property
     def path(self) -> Path:
@@ -34,66 +61,451 @@ class SimpleWordEmbedding(WordEmbedding):
 
     @property
     def shape(self) -> Tuple[int, int]:
-        return (len(self.word_vectors), self.word_vectors.values()[0].size)
+        return self._vectors.shape
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors
 
     def get_words(self) -> List[str]:
-        return list(self.word_vectors.keys())
+        return list(self.vocabulary)
+
+    def get_words_at(self, indices: Iterable[int]) -> List[str]:
+        return self.vocabulary.get_words(indices)
 
     def get_word_vector(self, word: str) -> np.array:
-        return self.word_vectors[word]
+        row = self.vocabulary.get_row(word)
+        if row < 0:
+            raise KeyError(word)
+        return self._vectors[row]
 
+    def get_word_indices(self, words: Iterable[str]) -> np.ndarray:
+        return self.vocabulary.get_rows(words)
 
-def load_embedding(path: Path) -> SimpleWordEmbedding:
+    def get_word_vectors(self, words: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        return gather_word_vectors(self._vectors, self.get_word_indices(words))
+
+    def _replace_vectors(self, vectors: np.ndarray) -> None:
+        self._vectors = vectors
+
+
+def load_embedding(
+    path: Path,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    required_words: Optional[Set[str]] = None,
+    max_words: Optional[int] = None,
+    precision="float32",
+) -> WordEmbedding:
     """Load the given Word2Vec Word Embedding
 
     The format for the Embedding expects the n x m matrix size
     in the first row of the text file.
 
     The current implementation fails, if that's not the case.
+    Use ``embedeval.parsers.glove.load_embedding()`` for
+    GloVe Embeddings without that header line.
+
+    The file is read in chunks of about ``chunk_size`` bytes.
+    All word vectors of a chunk are parsed with a single
+    ``numpy`` call into a preallocated ``float32`` matrix.
+
+    If ``required_words`` are given, the file is streamed once
+    and only the vectors of those words are parsed and kept.
+    Other words are skipped without parsing their vector.
+
+    If ``max_words`` is given, only the first ``max_words`` lines
+    are read, which are the most frequent words in word2vec files.
+
+    Compressed files are decompressed while they are read,
+    see ``embedeval.compression.open_embedding()``.
+
+    If a ``precision`` other than ``float32`` is given, the word vectors
+    of every chunk are quantized right away into a ``QuantizedWordEmbedding``,
+    see ``embedeval.quantization.QuantizedVectorsBuilder``.
     """
-    with open(path, "r", encoding="utf-8") as word2vec_file:
+    with open_embedding_text(path) as word2vec_file:
         header_line = word2vec_file.readline()
-        try:
-            word_size, word_vector_size = [int(x) for x in header_line.split()]
-        except ValueError as exc:
-            if "not enough" in str(exc):
-                raise EmbedevalError(
-                    "The given Embedding file doesn't contain the N x M "
-                    "Embedding size in the header line"
-                )
-            elif "too many" in str(exc):
-                raise EmbedevalError(
-                    "The given Embedding file has too many values in the header line"
-                )
-            elif "invalid literal" in str(exc):
-                raise EmbedevalError(
-                    "The header line must contain two integers "
-                    f"for the size but does: '{header_line}'"
-                )
+        word_size, word_vector_size = parse_header(header_line)
+        line_size = word_size if max_words is None else min(word_size, max_words)
+
+        words: List[str] = []
+        expected_word_size = (
+            line_size if required_words is None else min(line_size, len(required_words))
+        )
+        builder = create_quantized_vectors_builder(
+            precision, word_vector_size, expected_word_size
+        )
+        vectors = np.empty(
+            (expected_word_size if builder is None else 0, word_vector_size),
+            dtype=np.float32,
+        )
+
+        # the header line is line number 1
+        line_number = 2
+        while True:
+            lines = word2vec_file.readlines(chunk_size)
+            if max_words is not None:
+                lines = lines[: max_words - (line_number - 2)]
+            if not lines:
+                break
+
+            chunk_words, chunk_vectors = parse_lines(
+                lines, word_vector_size, line_number, required_words
+            )
+            line_number += len(lines)
+
+            if builder is not None:
+                builder.add(chunk_vectors)
             else:
-                raise EmbedevalError(
-                    "Unable to extract N x M Embedding size form the header line"
-                ) from exc
+                if len(words) + len(chunk_words) > len(vectors):
+                    vectors = _grow(vectors, len(words) + len(chunk_words))
+                vectors[len(words) : len(words) + len(chunk_words)] = chunk_vectors
+            words.extend(chunk_words)
+
+        # the header line is not a word
+        if line_number - 2 < line_size:
+            raise EmbedevalError(
+                f"Promised word size {word_size} from header "
+                f"wasn't matched with a size of {line_number - 2}"
+            )
 
-        word_vectors = {}
+        if required_words is not None:
+            logger.debug(
+                "Loaded %d of %d words required by the Tasks", len(words), line_size
+            )
+
+        if builder is not None:
+            return builder.build(path, Vocabulary.from_words(words))
+        return SimpleWordEmbedding(path, words, vectors[: len(words)])
+
+
+def load_embedding_parallel(
+    path: Path, workers: Optional[int] = None, chunk_size=DEFAULT_CHUNK_SIZE
+) -> SimpleWordEmbedding:
+    """Load the given Word2Vec Word Embedding using multiple processes
 
-        for word_number, line in enumerate(word2vec_file):
-            word, *raw_word_vector = line.split()
+    The file is split at line boundaries into byte ranges which are
+    parsed in a pool of ``workers`` processes, which defaults to
+    the amount of CPUs.
+
+    At first the lines of every byte range are counted to know
+    the first matrix row of each range.
+    Then every range is parsed and its word vectors are written
+    directly into a shared memory-mapped matrix, so that only
+    the words have to be transferred back from the workers.
+
+    Compressed files can't be split into byte ranges,
+    thus they are parsed by ``load_embedding()`` instead.
+    """
+    if detect_compression(path) is not None:
+        logger.debug("Parsing compressed Embedding %s in a single process", path)
+        return load_embedding(path, chunk_size)
 
-            word_vector = [np.float32(x) for x in raw_word_vector]
+    if workers is None:
+        workers = os.cpu_count() or 1
 
-            if len(word_vector) != word_vector_size:
-                raise EmbedevalError(
-                    f"Promised word vector size {word_vector_size} from header "
-                    f"wasn't matched on line {word_number + 2} with a size of {len(word_vector)}"
-                )
+    with open(path, "rb") as word2vec_file:
+        header_line = word2vec_file.readline().decode("utf-8", errors="ignore")
+        word_size, word_vector_size = parse_header(header_line)
+        byte_ranges = _split_byte_ranges(
+            word2vec_file, word2vec_file.tell(), workers * RANGES_PER_WORKER
+        )
 
-            word_vectors[word] = word_vector
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        line_counts = list(
+            executor.map(_count_lines, [path] * len(byte_ranges), byte_ranges)
+        )
 
-        if len(word_vectors) < word_size:
+        total_lines = sum(line_counts)
+        if total_lines < word_size:
             raise EmbedevalError(
                 f"Promised word size {word_size} from header "
-                f"wasn't matched with a size of {len(word_vectors)}"
+                f"wasn't matched with a size of {total_lines}"
+            )
+
+        if total_lines * word_vector_size == 0:
+            # NOTE: empty files cannot be memory-mapped.
+            return load_embedding(path, chunk_size)
+
+        vectors_fd, vectors_path = tempfile.mkstemp(suffix=".vectors")
+        os.close(vectors_fd)
+        try:
+            vectors = np.memmap(
+                vectors_path,
+                dtype=np.float32,
+                mode="w+",
+                shape=(total_lines, word_vector_size),
+            )
+            first_rows = np.cumsum([0] + line_counts[:-1]).tolist()
+            words_per_range = executor.map(
+                _parse_byte_range,
+                [path] * len(byte_ranges),
+                byte_ranges,
+                first_rows,
+                [vectors_path] * len(byte_ranges),
+                [vectors.shape] * len(byte_ranges),
+                [chunk_size] * len(byte_ranges),
+            )
+            words = [word for range_words in words_per_range for word in range_words]
+            del vectors
+            vectors = _release_vectors_file(
+                vectors_path, (total_lines, word_vector_size)
+            )
+        except BaseException:
+            _remove_file(vectors_path)
+            raise
+
+    return SimpleWordEmbedding(path, words, vectors)
+
+
+def create_quantized_vectors_builder(
+    precision: str, word_vector_size: int, expected_size: int
+) -> Optional["QuantizedVectorsBuilder"]:
+    """Create the builder to quantize parsed word vectors to the given precision
+
+    ``None`` is returned for ``float32``, which isn't quantized.
+    """
+    if precision == "float32":
+        return None
+
+    from embedeval.quantization import QuantizedVectorsBuilder
+
+    return QuantizedVectorsBuilder(precision, word_vector_size, expected_size)
+
+
+def parse_header(header_line: str) -> Tuple[int, int]:
+    """Parse the N x M Embedding size from the given header line"""
+    try:
+        word_size, word_vector_size = [int(x) for x in header_line.split()]
+    except ValueError as exc:
+        if "not enough" in str(exc):
+            raise EmbedevalError(
+                "The given Embedding file doesn't contain the N x M "
+                "Embedding size in the header line"
+            )
+        elif "too many" in str(exc):
+            raise EmbedevalError(
+                "The given Embedding file has too many values in the header line"
             )
+        elif "invalid literal" in str(exc):
+            raise EmbedevalError(
+                "The header line must contain two integers "
+                f"for the size but does: '{header_line}'"
+            )
+        else:
+            raise EmbedevalError(
+                "Unable to extract N x M Embedding size form the header line"
+            ) from exc
+
+    return word_size, word_vector_size
+
+
+def parse_lines(
+    lines: List[str],
+    word_vector_size: int,
+    first_line_number: int,
+    required_words: Optional[Set[str]] = None,
+) -> Tuple[List[str], np.ndarray]:
+    """Parse the given word2vec text lines into words and a word vector matrix
+
+    Like gensim, the word is only separated by a space from its vector
+    and not by any unicode whitespace.
+    All values of the chunk are converted by ``numpy`` at once
+    and the values of every line are counted on the raw bytes,
+    so that too few and too many values in different lines
+    of the same chunk can't make up for each other.
+    Only if the result doesn't match the expected shape every line
+    is validated on its own to report the faulty line number.
+
+    If ``required_words`` are given, all other lines are skipped.
+    """
+    split_lines = [line.lstrip(" ").partition(" ") for line in lines]
+    line_numbers = range(first_line_number, first_line_number + len(lines))
+    if required_words is not None:
+        split_lines, line_numbers = _select_lines(
+            split_lines, line_numbers, required_words
+        )
+    words = [word for word, _, _ in split_lines]
+
+    raw_chunk = "".join([raw_values for _, _, raw_values in split_lines])
+    with warnings.catch_warnings():
+        # NOTE: numpy only warns about unparsable values and
+        #       returns the values parsed so far.
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(raw_chunk, dtype=np.float32, sep=" ")
+        except (ValueError, DeprecationWarning):
+            values = None
+
+    if (
+        values is None
+        or values.size != len(words) * word_vector_size
+        or not _has_values_per_line(raw_chunk, len(words), word_vector_size)
+    ):
+        _validate_lines(split_lines, word_vector_size, line_numbers)
+
+    return words, values.reshape(len(words), word_vector_size)  # type: ignore
+
+
+def _has_values_per_line(raw_chunk, line_size, word_vector_size):
+    """Check if every line of the given raw values has the given amount of values
+
+    The values are counted as the starts of runs of non-whitespace bytes
+    before the end of every line.
+    """
+    data = np.frombuffer(raw_chunk.encode("utf-8"), dtype=np.uint8)
+    line_ends = np.flatnonzero(data == ord("\n"))
+    # NOTE: the last line may not end with a newline
+    if len(data) and data[-1] != ord("\n"):
+        line_ends = np.append(line_ends, len(data))
+    if len(line_ends) != line_size:
+        return False
+
+    # NOTE: bytes up to the space are treated as whitespace, other control
+    #       characters are rejected by ``numpy`` when the values are parsed.
+    is_space = data <= ord(" ")
+    value_starts = ~is_space
+    value_starts[1:] &= is_space[:-1]
+    values_per_line = np.diff(
+        np.searchsorted(np.flatnonzero(value_starts), line_ends), prepend=0
+    )
+    return bool(np.all(values_per_line == word_vector_size))
+
+
+def _select_lines(split_lines, line_numbers, required_words):
+    """Select the split lines and their line numbers of the required words"""
+    selected_lines = [
+        (split_line, line_number)
+        for split_line, line_number in zip(split_lines, line_numbers)
+        if split_line[0] in required_words
+    ]
+    return (
+        [split_line for split_line, _ in selected_lines],
+        [line_number for _, line_number in selected_lines],
+    )
+
+
+def _validate_lines(split_lines, word_vector_size, line_numbers):
+    """Find the first invalid line and raise an error for it"""
+    for line_number, (_, _, raw_values) in zip(line_numbers, split_lines):
+        raw_word_vector = raw_values.split()
+
+        if len(raw_word_vector) != word_vector_size:
+            raise EmbedevalError(
+                f"Promised word vector size {word_vector_size} "
+                f"wasn't matched on line {line_number} with a size of {len(raw_word_vector)}"
+            )
+
+        try:
+            [float(x) for x in raw_word_vector]
+        except ValueError as exc:
+            raise EmbedevalError(
+                f"Unable to parse word vector on line {line_number}: {exc}"
+            )
+
+    raise EmbedevalError(  # pragma: no cover
+        f"Unable to parse word vectors from line {line_numbers[0]} "
+        f"to line {line_numbers[-1]}"
+    )
+
+
+def _grow(vectors, min_size):
+    """Grow the given word vector matrix to at least the given amount of rows"""
+    new_size = max(min_size, 2 * len(vectors))
+    grown_vectors = np.empty((new_size, vectors.shape[1]), dtype=vectors.dtype)
+    grown_vectors[: len(vectors)] = vectors
+    return grown_vectors
+
+
+def _split_byte_ranges(file, start, amount):
+    """Split the given file from the start offset into line-aligned byte ranges"""
+    file_size = file.seek(0, io.SEEK_END)
+    range_size = max(1, (file_size - start) // amount)
+
+    boundaries = [start]
+    while boundaries[-1] + range_size < file_size:
+        file.seek(boundaries[-1] + range_size)
+        file.readline()
+        if file.tell() >= file_size:
+            break
+        boundaries.append(file.tell())
+    boundaries.append(file_size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _read_byte_range(path, byte_range, chunk_size):
+    """Read the given byte range in chunks of whole lines"""
+    start, end = byte_range
+    with open(path, "rb") as word2vec_file:
+        word2vec_file.seek(start)
+        remainder = b""
+        while start < end:
+            chunk = word2vec_file.read(min(chunk_size, end - start))
+            start += len(chunk)
+            chunk = remainder + chunk
+            if start < end:
+                last_line_end = chunk.rfind(b"\n") + 1
+                chunk, remainder = chunk[:last_line_end], chunk[last_line_end:]
+            if chunk:
+                yield chunk
+
+
+def _count_lines(path, byte_range):
+    """Count the lines in the given byte range of the Embedding file"""
+    line_count = 0
+    last_chunk = b""
+    for chunk in _read_byte_range(path, byte_range, DEFAULT_CHUNK_SIZE):
+        line_count += chunk.count(b"\n")
+        last_chunk = chunk
+
+    # the last line of the file may not end with a newline
+    if last_chunk and not last_chunk.endswith(b"\n"):
+        line_count += 1
+    return line_count
+
+
+def _parse_byte_range(path, byte_range, first_row, vectors_path, shape, chunk_size):
+    """Parse the given byte range into the shared memory-mapped matrix"""
+    vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=shape)
+    words: List[str] = []
+    for chunk in _read_byte_range(path, byte_range, chunk_size):
+        # NOTE: ``StringIO`` only splits lines at newlines, ``str.splitlines``
+        #       would also split at unicode line boundaries within words.
+        lines = io.StringIO(chunk.decode("utf-8", errors="ignore")).readlines()
+        row = first_row + len(words)
+        # the header line is line number 1
+        chunk_words, chunk_vectors = parse_lines(lines, shape[1], row + 2)
+        vectors[row : row + len(chunk_words)] = chunk_vectors
+        words.extend(chunk_words)
+
+    vectors.flush()
+    return words
+
+
+def _release_vectors_file(vectors_path, shape):
+    """Map the parsed matrix read-only and release its temporary file
+
+    The memory mapping stays valid on POSIX systems, but on Windows
+    files cannot be removed while they are mapped, thus
+    the matrix has to be copied into memory first.
+    """
+    vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=shape)
+    try:
+        os.remove(vectors_path)
+        return vectors
+    except PermissionError:  # pragma: no cover
+        pass
+
+    in_memory_vectors = np.array(vectors)  # pragma: no cover
+    del vectors  # pragma: no cover
+    _remove_file(vectors_path)  # pragma: no cover
+    return in_memory_vectors  # pragma: no cover
+
 
-        return SimpleWordEmbedding(path, word_vectors)
+def _remove_file(path):
+    """Remove the given file if it still exists"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,143 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+
+logger = get_component_logger("probe")
+
+#: Holds the default strength of the L2 regularization of the classifiers
+DEFAULT_L2 = 1.0
+
+#: Holds the maximum amount of Newton steps to fit a logistic regression
+MAX_NEWTON_ITERATIONS = 50
+
+#: Holds the largest weight change at which the logistic regression converged
+NEWTON_TOLERANCE = 1e-6
+
+
+class LinearProbe:
+    """Binary linear classifier on top of fixed features
+
+    Linear probes measure how much information about the labels
+    is linearly encoded in features, like sentence vectors of a
+    Word Embedding, without training the features themselves.
+
+    The features are standardized with the mean and standard deviation
+    of the training features and the classifier is either a logistic
+    regression fitted with Newton's method or a ridge regression
+    on the labels mapped to -1 and 1, which is solved in closed form.
+    Both only need a few ``numpy`` matrix operations on a CPU.
+    """
+
+    CLASSIFIERS = ("logistic", "ridge")
+
+    def __init__(self, classifier="logistic", l2=DEFAULT_L2):
+        if classifier not in self.CLASSIFIERS:
+            raise EmbedevalError(
+                f"Unknown classifier {classifier}, use one of {', '.join(self.CLASSIFIERS)}"
+            )
+
+        self.classifier = classifier
+        self.l2 = l2
+        self.mean: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        #: Holds the weights of the features followed by the bias
+        self.weights: Optional[np.ndarray] = None
+
+    def fit(self, features: np.ndarray, labels: np.ndarray) -> "LinearProbe":
+        """Fit the classifier to the given features and binary labels"""
+        features = np.asarray(features, dtype=np.float64)
+        self.mean = features.mean(axis=0)
+        self.scale = features.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+
+        inputs = self._prepare_inputs(features)
+        # NOTE: the bias is not regularized
+        regularization = np.full(inputs.shape[1], self.l2)
+        regularization[-1] = 0.0
+
+        labels = np.asarray(labels, dtype=np.float64)
+        if self.classifier == "ridge":
+            self.weights = np.linalg.solve(
+                inputs.T @ inputs + np.diag(regularization), inputs.T @ (2 * labels - 1)
+            )
+        else:
+            self.weights = _fit_logistic_regression(inputs, labels, regularization)
+        return self
+
+    def decision_function(self, features: np.ndarray) -> np.ndarray:
+        """Get the score of the given features, positive scores are predicted as 1"""
+        if self.weights is None:
+            raise EmbedevalError("The Linear Probe must be fitted first")
+        return (
+            self._prepare_inputs(np.asarray(features, dtype=np.float64)) @ self.weights
+        )
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Predict the binary labels of the given features"""
+        return (self.decision_function(features) > 0).astype(np.int64)
+
+    def _prepare_inputs(self, features: np.ndarray) -> np.ndarray:
+        """Standardize the features and append a constant feature for the bias"""
+        inputs = np.empty((len(features), features.shape[1] + 1))
+        inputs[:, :-1] = (features - self.mean) / self.scale
+        inputs[:, -1] = 1.0
+        return inputs
+
+
+def _fit_logistic_regression(
+    inputs: np.ndarray, labels: np.ndarray, regularization: np.ndarray
+) -> np.ndarray:
+    """Fit the weights of a L2 regularized logistic regression with Newton's method"""
+    weights = np.zeros(inputs.shape[1])
+    for iteration in range(1, MAX_NEWTON_ITERATIONS + 1):
+        probabilities = sigmoid(inputs @ weights)
+        gradient = inputs.T @ (probabilities - labels) + regularization * weights
+        curvatures = probabilities * (1 - probabilities)
+        hessian = (inputs * curvatures[:, np.newaxis]).T @ inputs
+        hessian[np.diag_indices_from(hessian)] += regularization
+        # NOTE: the tiny ridge keeps the Hessian invertible for separable labels
+        step = np.linalg.solve(hessian + 1e-9 * np.eye(len(hessian)), gradient)
+        weights -= step
+        if np.abs(step).max() < NEWTON_TOLERANCE:
+            break
+    logger.debug("Fitted logistic regression in %d Newton steps", iteration)
+    return weights
+
+
+def sigmoid(values: np.ndarray) -> np.ndarray:
+    """Get the logistic sigmoid of the given values without overflows"""
+    return np.exp(-np.logaddexp(0, -values))
+
+
+def accuracy_and_f1_score(
+    labels: np.ndarray, predictions: np.ndarray
+) -> Tuple[float, float]:
+    """Get the accuracy and the F1 score of the positive class of binary predictions"""
+    labels = np.asarray(labels).astype(bool)
+    predictions = np.asarray(predictions).astype(bool)
+    if len(labels) == 0:
+        return 0.0, 0.0
+
+    true_positives = np.count_nonzero(labels & predictions)
+    predicted_positives = np.count_nonzero(predictions)
+    actual_positives = np.count_nonzero(labels)
+    accuracy = np.count_nonzero(labels == predictions) / len(labels)
+    if true_positives == 0:
+        return float(accuracy), 0.0
+
+    precision = true_positives / predicted_positives
+    recall = true_positives / actual_positives
+    return float(accuracy), float(2 * precision * recall / (precision + recall))
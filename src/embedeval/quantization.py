@@ -0,0 +1,298 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+
+import numpy as np
+
+from embedeval.embedding import WordEmbedding, gather_word_vectors
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+from embedeval.similarity import (
+    DEFAULT_BLOCK_SIZE,
+    calculate_norms,
+    normalize_vectors,
+)
+from embedeval.vocabulary import Vocabulary, get_vocabulary
+
+logger = get_component_logger("quantization")
+
+#: Holds the precisions in which the word vectors can be stored
+PRECISIONS = ("float32", "float16", "int8")
+
+#: Holds the largest magnitude of the ``int8`` codes
+INT8_MAX = 127
+
+
+class QuantizedMatrix:
+    """Matrix of quantized rows which are dequantized when they are indexed
+
+    The rows are stored as ``float16`` or ``int8`` codes,
+    optionally with a ``float32`` scale per row.
+    Indexing rows, like a block of rows in the similarity kernels
+    or the rows of a batch of words, returns only those rows
+    dequantized to ``float32``, thus the matrix can be used in place
+    of a ``float32`` word vector matrix without dequantizing it entirely.
+    """
+
+    def __init__(self, codes: np.ndarray, scales: Optional[np.ndarray] = None):
+        #: Holds the quantized rows
+        self.codes = codes
+        #: Holds the scale of every row or ``None`` if the rows aren't scaled
+        self.scales = scales
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.codes.shape
+
+    @property
+    def ndim(self) -> int:
+        return self.codes.ndim
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Get the type of the dequantized rows"""
+        return np.dtype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the bytes used by the codes and the scales"""
+        return self.codes.nbytes + (0 if self.scales is None else self.scales.nbytes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, key) -> np.ndarray:
+        """Dequantize the given rows and index them further if necessary"""
+        row_key, column_key = (key[0], key[1:]) if isinstance(key, tuple) else (key, ())
+        rows = self.codes[row_key].astype(np.float32)
+        if self.scales is not None:
+            rows *= self.scales[row_key][..., np.newaxis]
+        return rows[(Ellipsis, *column_key)] if column_key else rows
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Dequantize the entire matrix"""
+        rows = self[:]
+        return rows if dtype is None else rows.astype(dtype, copy=False)
+
+    def mean(self, axis=None, dtype=None) -> np.ndarray:
+        return np.asarray(self).mean(axis=axis, dtype=dtype)
+
+
+class QuantizedWordEmbedding(WordEmbedding):
+    """Represents a Word Embedding with word vectors in a reduced precision
+
+    The word vectors are normalized to unit length and stored as
+    ``float16`` or as ``int8`` with a scale per word, which takes
+    a half or a quarter of the memory of ``float32`` word vectors.
+    The length of every word vector is kept in ``float32``,
+    thus the same codes are the normalized word vectors
+    and, scaled by their lengths, the raw word vectors.
+
+    Both are instances of ``QuantizedMatrix``,
+    which dequantizes only the rows it is indexed with.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        vocabulary: Vocabulary,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray],
+        norms: np.ndarray,
+    ):
+        super().__init__()
+        self._path = path
+        #: Holds the words in the order of the rows in ``self.vectors``
+        self.vocabulary = vocabulary
+        #: Holds the precision of the word vectors, see ``PRECISIONS``
+        self.precision = "int8" if codes.dtype == np.int8 else "float16"
+        self._vectors = QuantizedMatrix(
+            codes, norms if scales is None else scales * norms
+        )
+        self._derived_views = {
+            "normalized_vectors": QuantizedMatrix(codes, scales),
+            "vector_norms": norms,
+        }
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self._vectors.shape
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors  # type: ignore
+
+    def get_words(self) -> List[str]:
+        return list(self.vocabulary)
+
+    def get_words_at(self, indices: Iterable[int]) -> List[str]:
+        return self.vocabulary.get_words(indices)
+
+    def get_word_vector(self, word: str) -> np.array:
+        row = self.vocabulary.get_row(word)
+        if row < 0:
+            raise KeyError(word)
+        return self._vectors[row]
+
+    def get_word_indices(self, words: Iterable[str]) -> np.ndarray:
+        return self.vocabulary.get_rows(words)
+
+    def get_word_vectors(self, words: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        return gather_word_vectors(self._vectors, self.get_word_indices(words))
+
+    def restrict_vocab(self, size: int) -> WordEmbedding:
+        normalized_vectors = self._derived_views["normalized_vectors"]
+        return QuantizedWordEmbedding(
+            self.path,
+            self.vocabulary.prefix(size),
+            normalized_vectors.codes[:size],
+            (
+                None
+                if normalized_vectors.scales is None
+                else normalized_vectors.scales[:size]
+            ),
+            self._derived_views["vector_norms"][:size],
+        )
+
+    def get_memory_usage(self) -> Dict[str, int]:
+        """Get the bytes used by the word vectors and each derived view computed so far
+
+        The normalized word vectors share the codes of the word vectors.
+        """
+        memory_usage = {"vectors": self._vectors.nbytes}
+        memory_usage.update(
+            (name, view.nbytes) for name, view in self._derived_views.items()
+        )
+        memory_usage["normalized_vectors"] -= self._vectors.codes.nbytes
+        return memory_usage
+
+    def drop_raw_vectors(self) -> None:
+        """The raw word vectors are already derived from the normalized ones"""
+        logger.debug("The word vectors of %s are already quantized", self.path)
+
+
+class QuantizedVectorsBuilder:
+    """Quantizes word vectors block by block into the arrays of a quantized matrix
+
+    Parsers add the word vectors of every parsed chunk, thus the
+    word vectors never exist entirely as a ``float32`` matrix.
+    The arrays grow geometrically if more word vectors are added
+    than expected and are shrunk to the added word vectors when
+    the Word Embedding is built.
+    """
+
+    def __init__(self, precision: str, word_vector_size: int, expected_size=0):
+        if precision not in PRECISIONS or precision == "float32":
+            raise EmbedevalError(
+                f"Unknown precision {precision} to quantize to, "
+                f"use one of {', '.join(PRECISIONS[1:])}"
+            )
+
+        #: Holds the precision of the codes, see ``PRECISIONS``
+        self.precision = precision
+        #: Holds the amount of word vectors added so far
+        self.size = 0
+        self.codes = np.empty(
+            (expected_size, word_vector_size), dtype=np.dtype(precision)
+        )
+        self.scales = (
+            None if precision == "float16" else np.empty(expected_size, np.float32)
+        )
+        self.norms = np.empty(expected_size, dtype=np.float32)
+
+    def add(self, vectors: np.ndarray, norms: Optional[np.ndarray] = None) -> None:
+        """Quantize and add the given block of word vectors
+
+        The lengths of the word vectors are computed if they aren't given.
+        ``int8`` codes use a scale per word vector, which maps the
+        largest magnitude of the normalized word vector to 127.
+        """
+        start, end = self.size, self.size + len(vectors)
+        if end > len(self.codes):
+            self._grow(end)
+
+        self.norms[start:end] = calculate_norms(vectors) if norms is None else norms
+        block = normalize_vectors(vectors)
+        if self.scales is None:
+            self.codes[start:end] = block
+        else:
+            block_scales = np.abs(block).max(axis=1, initial=0.0) / INT8_MAX
+            self.scales[start:end] = block_scales
+            block_scales[block_scales == 0] = 1.0
+            self.codes[start:end] = np.rint(block / block_scales[:, np.newaxis])
+        self.size = end
+
+    def build(self, path: Path, vocabulary: Vocabulary) -> QuantizedWordEmbedding:
+        """Build the quantized Word Embedding of the added word vectors"""
+        # NOTE: the unused rows are released in place,
+        #       no other references to the arrays exist.
+        self.codes.resize((self.size, self.codes.shape[1]), refcheck=False)
+        self.norms.resize(self.size, refcheck=False)
+        if self.scales is not None:
+            self.scales.resize(self.size, refcheck=False)
+
+        logger.debug(
+            "Quantized %d word vectors of %s to %s using %.1f MiB",
+            self.size,
+            path,
+            self.precision,
+            (self.codes.nbytes + (0 if self.scales is None else self.scales.nbytes))
+            / 2 ** 20,
+        )
+        return QuantizedWordEmbedding(
+            path, vocabulary, self.codes, self.scales, self.norms
+        )
+
+    def _grow(self, min_size: int) -> None:
+        """Grow the arrays to at least the given amount of word vectors"""
+        new_size = max(min_size, 2 * len(self.codes))
+        for name in ("codes", "scales", "norms"):
+            array = getattr(self, name)
+            if array is not None:
+                grown_array = np.empty((new_size,) + array.shape[1:], dtype=array.dtype)
+                grown_array[: self.size] = array[: self.size]
+                setattr(self, name, grown_array)
+
+
+def quantize_embedding(
+    embedding: WordEmbedding, precision: str, block_size=DEFAULT_BLOCK_SIZE
+) -> WordEmbedding:
+    """Quantize the word vectors of the given Word Embedding to the given precision
+
+    The word vectors are normalized and quantized block by block,
+    thus only a block of them is converted to ``float32`` at once,
+    see ``QuantizedVectorsBuilder``.
+
+    The Word Embedding is returned as is for a ``float32`` precision.
+    """
+    if precision not in PRECISIONS:
+        raise EmbedevalError(
+            f"Unknown precision {precision}, use one of {', '.join(PRECISIONS)}"
+        )
+
+    if precision == "float32":
+        return embedding
+
+    vectors = embedding.vectors
+    # NOTE: the lengths of the raw word vectors are kept,
+    #       even if the raw word vectors were already dropped.
+    norms = np.asarray(embedding.vector_norms, dtype=np.float32)
+    builder = QuantizedVectorsBuilder(precision, vectors.shape[1], len(vectors))
+    for start in range(0, len(vectors), block_size):
+        builder.add(
+            vectors[start : start + block_size], norms[start : start + block_size]
+        )
+    return builder.build(embedding.path, get_vocabulary(embedding))
@@ -0,0 +1,419 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse
+
+from embedeval.embedding import WordEmbedding
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+from embedeval.vocabulary import get_vocabulary
+
+if TYPE_CHECKING:  # pragma: no cover
+    from embedeval.ann import IVFIndex
+
+logger = get_component_logger("similarity")
+
+#: Holds the default amount of word vectors compared with the queries at once
+DEFAULT_BLOCK_SIZE = 16384
+
+#: Holds the maximum amount of scores computed at once for a batch of queries
+MAX_BLOCK_SCORES = 2 ** 22
+
+#: Holds the value added to the denominator of 3CosMul to avoid a division by zero
+COSMUL_EPSILON = 1e-6
+
+
+class SimilarityEngine:
+    """Nearest neighbour search on the word vectors of a Word Embedding
+
+    The word vectors are normalized to unit length once in ``float32``,
+    so that the cosine similarity is a plain dot product.
+    Queries are compared with a block of word vectors at once
+    using a matrix multiplication and only the best candidates
+    of each block are kept using ``np.argpartition`` instead of
+    sorting the whole vocabulary.
+
+    Multiple queries can be answered at once with the ``search_*()``
+    methods, which work on the rows of the words in the word vector matrix.
+    The query words themselves are never part of the answer.
+
+    With ``approximate`` the queries are only compared with the candidates
+    from an approximate nearest neighbour index, see ``embedeval.ann``.
+    """
+
+    def __init__(
+        self,
+        embedding: WordEmbedding,
+        block_size=DEFAULT_BLOCK_SIZE,
+        normalized_vectors: Optional[np.ndarray] = None,
+        index: Optional["IVFIndex"] = None,
+    ):
+        self.embedding = embedding
+        self.block_size = block_size
+        #: Holds the word vectors normalized to unit length
+        if normalized_vectors is None:
+            normalized_vectors = embedding.normalized_vectors
+        self.normalized_vectors = normalized_vectors
+        #: Holds the index for the approximate search, see ``get_index()``
+        self.index = index
+        self._is_index_loaded = False
+
+    def get_index(self) -> Optional["IVFIndex"]:
+        """Get the index for the approximate nearest neighbour search
+
+        If no index is set, the one saved next to the Embedding file
+        is loaded, if there is any and if it was built for the words
+        of this Word Embedding.
+        """
+        if self.index is None and not self._is_index_loaded:
+            from embedeval.ann import load_index
+
+            self._is_index_loaded = True
+            if self.embedding.path is not None and Path(self.embedding.path).is_file():
+                self.index = load_index(
+                    Path(self.embedding.path), get_vocabulary(self.embedding)
+                )
+        return self.index
+
+    def get_rows(self, words: Sequence[str]) -> np.ndarray:
+        """Get the rows of the given words in the word vector matrix
+
+        An error is raised if one of the words is not in the Word Embedding.
+        """
+        rows = self.embedding.get_word_indices(words)
+        if (rows < 0).any():
+            missing_words = [w for w, r in zip(words, rows) if r < 0]
+            raise EmbedevalError(
+                f"Words not in the Embedding: {', '.join(missing_words)}"
+            )
+        return rows
+
+    def similarity(self, word1: str, word2: str) -> float:
+        """Get the cosine similarity of the given words"""
+        row1, row2 = self.get_rows([word1, word2])
+        return float(
+            np.dot(self.normalized_vectors[row1], self.normalized_vectors[row2])
+        )
+
+    def most_similar(
+        self,
+        positive: Sequence[str] = (),
+        negative: Sequence[str] = (),
+        topn=10,
+        approximate=False,
+    ) -> List[Tuple[str, float]]:
+        """Get the most similar words using the 3CosAdd method
+
+        The words are ranked by the cosine similarity with the sum of the
+        normalized positive word vectors minus the normalized negative ones.
+        Without negative words this is the plain top-k cosine similarity.
+        """
+        rows, scores = self.search_add(
+            self.get_rows(positive)[np.newaxis],
+            self.get_rows(negative)[np.newaxis],
+            topn,
+            approximate,
+        )
+        return self._to_words(rows[0], scores[0])
+
+    def most_similar_cosmul(
+        self,
+        positive: Sequence[str] = (),
+        negative: Sequence[str] = (),
+        topn=10,
+        approximate=False,
+    ) -> List[Tuple[str, float]]:
+        """Get the most similar words using the 3CosMul method
+
+        The words are ranked by the product of their cosine similarities
+        with the positive words divided by the product with the negative words,
+        as proposed by Levy and Goldberg in "Linguistic Regularities in Sparse
+        and Explicit Word Representations".
+        """
+        rows, scores = self.search_cosmul(
+            self.get_rows(positive)[np.newaxis],
+            self.get_rows(negative)[np.newaxis],
+            topn,
+            approximate,
+        )
+        return self._to_words(rows[0], scores[0])
+
+    def doesnt_match(self, words: Sequence[str]) -> str:
+        """Get the word which is the least similar to the mean of all words
+
+        Words which are not in the Word Embedding are ignored.
+        """
+        rows = self.embedding.get_word_indices(words)
+        used_words = [w for w, r in zip(words, rows) if r >= 0]
+        if len(used_words) < len(words):
+            logger.debug(
+                "Ignoring words not in the Embedding: %s",
+                ", ".join(w for w in words if w not in used_words),
+            )
+        if not used_words:
+            raise EmbedevalError("None of the given words are in the Embedding")
+
+        vectors = self.normalized_vectors[rows[rows >= 0]]
+        mean = normalize_vectors(vectors.mean(axis=0, keepdims=True))[0]
+        return used_words[int(np.argmin(vectors @ mean))]
+
+    def search_add(
+        self,
+        positive_rows: np.ndarray,
+        negative_rows: np.ndarray,
+        topn=10,
+        approximate=False,
+        candidate_rows: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the most similar rows for a batch of 3CosAdd queries
+
+        ``positive_rows`` and ``negative_rows`` are Q x P and Q x N matrices
+        with the rows of the query words.
+        Q x topn matrices with the rows of the most similar words and their
+        scores are returned, ordered from the most similar one.
+
+        If ``candidate_rows`` are given only those words are considered.
+        """
+        if approximate:
+            return self._search_approximately(
+                self.search_add, positive_rows, negative_rows, topn
+            )
+
+        n_positives = positive_rows.shape[1]
+        query_rows = np.concatenate([positive_rows, negative_rows], axis=1)
+        terms, term_indices = self._get_terms(query_rows)
+        queries = self._get_queries(positive_rows, negative_rows)
+
+        if len(terms) >= len(queries):
+            queries = normalize_vectors(queries)
+
+            def score_block(block):
+                return queries @ block.T
+
+        else:
+            # NOTE: the cosine similarity with the normalized sum of the query words
+            #       is the sum of the similarities with each word divided by the norm
+            #       of the sum. Thus, if the queries share their words, each word
+            #       is compared only once instead of every query.
+            #       The sums are calculated with a sparse matrix with the signs
+            #       of the query words.
+            query_norms = np.linalg.norm(queries, axis=1)
+            query_norms[query_norms == 0] = 1
+            signs = np.where(np.arange(query_rows.shape[1]) < n_positives, 1, -1)
+            term_signs = scipy.sparse.csr_matrix(
+                (
+                    (signs / query_norms[:, np.newaxis]).astype(np.float32).ravel(),
+                    term_indices.ravel(),
+                    np.arange(0, term_indices.size + 1, term_indices.shape[1]),
+                ),
+                shape=(len(query_rows), len(terms)),
+            )
+
+            def score_block(block):
+                return term_signs @ (terms @ block.T)
+
+        return self._search(score_block, query_rows, topn, candidate_rows)
+
+    def search_cosmul(
+        self,
+        positive_rows: np.ndarray,
+        negative_rows: np.ndarray,
+        topn=10,
+        approximate=False,
+        candidate_rows: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the most similar rows for a batch of 3CosMul queries
+
+        See ``search_add()`` for the arguments and the return value.
+        """
+        if approximate:
+            return self._search_approximately(
+                self.search_cosmul, positive_rows, negative_rows, topn
+            )
+
+        n_positives = positive_rows.shape[1]
+        query_rows = np.concatenate([positive_rows, negative_rows], axis=1)
+        terms, term_indices = self._get_terms(query_rows)
+
+        def score_block(block):
+            # NOTE: shift the cosine similarities to [0, 1] to keep the products positive
+            similarities = terms @ block.T
+            similarities += 1
+            similarities /= 2
+            return _product(similarities, term_indices[:, :n_positives]) / (
+                _product(similarities, term_indices[:, n_positives:]) + COSMUL_EPSILON
+            )
+
+        return self._search(score_block, query_rows, topn, candidate_rows)
+
+    def _search_approximately(
+        self, search, positive_rows: np.ndarray, negative_rows: np.ndarray, topn: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search each query only in its candidates from the index
+
+        The candidates of the 3CosMul queries are found with their 3CosAdd
+        query vector, too. The search is exact if there is no index.
+        """
+        index = self.get_index()
+        if index is None:
+            logger.debug("No index for the approximate search, searching exactly")
+            return search(positive_rows, negative_rows, topn)
+
+        queries = normalize_vectors(self._get_queries(positive_rows, negative_rows))
+        rows = np.full((len(queries), topn), -1, dtype=np.int64)
+        scores = np.full((len(queries), topn), -np.inf, dtype=np.float32)
+        candidates = index.get_candidates(
+            queries, topn, max_row=len(self.normalized_vectors)
+        )
+        for query, candidate_rows in enumerate(candidates):
+            query_rows, query_scores = search(
+                positive_rows[query : query + 1],
+                negative_rows[query : query + 1],
+                topn,
+                candidate_rows=candidate_rows,
+            )
+            rows[query, : query_rows.shape[1]] = query_rows[0]
+            scores[query, : query_scores.shape[1]] = query_scores[0]
+        return rows, scores
+
+    def _get_queries(
+        self, positive_rows: np.ndarray, negative_rows: np.ndarray
+    ) -> np.ndarray:
+        """Get the sum of the positive minus the negative normalized word vectors"""
+        return self.normalized_vectors[positive_rows].sum(
+            axis=1
+        ) - self.normalized_vectors[negative_rows].sum(axis=1)
+
+    def _get_terms(self, query_rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the distinct normalized vectors of the given query words
+
+        Returns the vectors and the index into them for each query word.
+        Query datasets usually share most of their words, so that
+        comparing only the distinct words saves most of the work.
+        """
+        unique_rows, term_indices = np.unique(query_rows, return_inverse=True)
+        return (
+            self.normalized_vectors[unique_rows],
+            term_indices.reshape(query_rows.shape),
+        )
+
+    def _search(
+        self,
+        score_block: Callable[[np.ndarray], np.ndarray],
+        exclude_rows: np.ndarray,
+        topn: int,
+        candidate_rows: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the best scored rows for a batch of queries block by block"""
+        n_queries = len(exclude_rows)
+        if candidate_rows is None:
+            n_rows = len(self.normalized_vectors)
+        else:
+            n_rows = len(candidate_rows)
+        topn = min(topn, n_rows)
+        best_rows = np.empty((n_queries, 0), dtype=np.int64)
+        best_scores = np.empty((n_queries, 0), dtype=np.float32)
+        if topn <= 0:
+            return best_rows, best_scores
+
+        # NOTE: large batches are compared with smaller blocks to bound the memory
+        block_size = max(1, min(self.block_size, MAX_BLOCK_SCORES // n_queries))
+        query_indices = np.broadcast_to(
+            np.arange(n_queries)[:, np.newaxis], exclude_rows.shape
+        )
+        for start in range(0, n_rows, block_size):
+            if candidate_rows is None:
+                block = self.normalized_vectors[start : start + block_size]
+                scores = score_block(block).astype(np.float32, copy=False)
+
+                excluded = (exclude_rows >= start) & (exclude_rows < start + len(block))
+                scores[query_indices[excluded], exclude_rows[excluded] - start] = -np.inf
+            else:
+                block_rows = candidate_rows[start : start + block_size]
+                block = self.normalized_vectors[block_rows]
+                scores = score_block(block).astype(np.float32, copy=False)
+
+                excluded = block_rows == exclude_rows[:, :, np.newaxis]
+                scores[excluded.any(axis=1)] = -np.inf
+
+            k = min(topn, len(block))
+            if k == 1:
+                candidates = scores.argmax(axis=1)[:, np.newaxis]
+            else:
+                candidates = np.argpartition(scores, len(block) - k, axis=1)[:, -k:]
+            if candidate_rows is None:
+                candidate_block_rows = candidates + start
+            else:
+                candidate_block_rows = block_rows[candidates]
+            best_rows = np.concatenate([best_rows, candidate_block_rows], axis=1)
+            best_scores = np.concatenate(
+                [best_scores, np.take_along_axis(scores, candidates, axis=1)], axis=1
+            )
+
+            if best_rows.shape[1] > topn:
+                best = np.argpartition(best_scores, -topn, axis=1)[:, -topn:]
+                best_rows = np.take_along_axis(best_rows, best, axis=1)
+                best_scores = np.take_along_axis(best_scores, best, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return (
+            np.take_along_axis(best_rows, order, axis=1),
+            np.take_along_axis(best_scores, order, axis=1),
+        )
+
+    def _to_words(self, rows, scores) -> List[Tuple[str, float]]:
+        """Get the words and scores for the given result rows"""
+        found = [(row, score) for row, score in zip(rows, scores) if score != -np.inf]
+        words = self.embedding.get_words_at([row for row, _ in found])
+        return [(word, float(score)) for word, (_, score) in zip(words, found)]
+
+
+def normalize_vectors(vectors: np.ndarray, block_size=DEFAULT_BLOCK_SIZE) -> np.ndarray:
+    """Normalize the given vectors to unit length in ``float32``
+
+    The vectors are converted block by block to limit the temporary memory.
+    Vectors with a length of zero stay zero.
+    """
+    normalized = np.empty(vectors.shape, dtype=np.float32)
+    for start in range(0, len(vectors), block_size):
+        block = np.asarray(vectors[start : start + block_size], dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        np.divide(block, norms, out=normalized[start : start + block_size])
+    return normalized
+
+
+def calculate_norms(vectors: np.ndarray, block_size=DEFAULT_BLOCK_SIZE) -> np.ndarray:
+    """Calculate the length of the given vectors in ``float32``
+
+    The vectors are converted block by block to limit the temporary memory.
+    """
+    norms = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), block_size):
+        block = np.asarray(vectors[start : start + block_size], dtype=np.float32)
+        norms[start : start + block_size] = np.linalg.norm(block, axis=1)
+    return norms
+
+
+def _product(similarities: np.ndarray, term_indices: np.ndarray) -> np.ndarray:
+    """Multiply the similarities of the given query words for each query"""
+    if term_indices.shape[1] == 0:
+        return np.ones(
+            (len(term_indices), similarities.shape[1]), dtype=similarities.dtype
+        )
+
+    product = similarities[term_indices[:, 0]]
+    for indices in term_indices[:, 1:].T:
+        product *= similarities[indices]
+    return product
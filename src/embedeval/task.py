@@ -9,10 +9,14 @@ NLP Embedding Evaluation Tool
 """
 
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Optional, Set
 
 from embedeval.taskreport import TaskReport
 from embedeval.taskregistry import registry as task_registry
-from embedeval.embedding import WordEmbedding
+
+if TYPE_CHECKING:  # pragma: no cover
+    # NOTE: the Word Embedding imports numpy, which slows down the startup.
+    from embedeval.embedding import WordEmbedding
 
 
 class Task(ABC):
@@ -34,12 +38,27 @@ class Task(ABC):
 
         This registration makes it possible
         to later discover and run the Tasks.
+        Subclasses without a ``NAME`` are only bases for other Tasks
+        and are not registered.
         """
         super().__init_subclass__(**kwargs)
-        task_registry.register(cls)
+        if cls.NAME:
+            task_registry.register(cls)
+
+    def required_words(self) -> Optional[Set[str]]:
+        """Get the words of the Word Embedding required by this Task
+
+        If all Tasks of an evaluation declare their required words
+        only the vectors of those words are loaded from the Word Embedding.
+        This makes a huge difference for large Word Embeddings.
+
+        By default ``None`` is returned, which means that
+        the entire Word Embedding is required.
+        """
+        return None
 
     @abstractmethod
-    def evaluate(self, embedding: WordEmbedding) -> TaskReport:
+    def evaluate(self, embedding: "WordEmbedding") -> TaskReport:
         """Evaluate this Task on the given Word Embedding
 
         The evaluation algorithm should always produce some kind of
@@ -0,0 +1,158 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from embedeval.cachedir import get_cache_dir
+from embedeval.checksum import calculate_checksum
+from embedeval.logger import get_component_logger
+
+logger = get_component_logger("task-cache")
+
+CONSTANTS_FILENAME = "constants.json"
+
+#: Holds the embedeval modules which build the artifacts of the Tasks
+ARTIFACT_MODULES = ("tokenizer", "encoder", "similarity")
+
+
+class TaskArtifactCache:
+    """Cache for the artifacts of a Task preprocessing
+
+    The artifacts are cached by the name of the Task,
+    the checksums of its dataset files and the version of the Task code.
+    Any change to one of them leads to a new preprocessing.
+
+    ``numpy`` arrays are saved as ``.npy`` files, JSON serializable
+    constants in a single JSON file and all other artifacts,
+    like tokenizers, are pickled.
+    """
+
+    def __init__(
+        self,
+        task_name: str,
+        dataset_paths: List[Path],
+        code_version: str,
+        cache_dir: Optional[Path] = None,
+    ):
+        if cache_dir is None:
+            cache_dir = get_cache_dir()
+
+        key = hashlib.sha256()
+        key.update(task_name.encode("utf-8"))
+        key.update(code_version.encode("utf-8"))
+        for dataset_path in dataset_paths:
+            key.update(calculate_checksum(dataset_path).encode("utf-8"))
+
+        #: Holds the path to the directory with the cached artifacts
+        self.path = cache_dir / "tasks" / task_name / key.hexdigest()
+
+    @classmethod
+    def for_task(cls, task, dataset_paths: List[Path]) -> "TaskArtifactCache":
+        """Create the artifact cache for the given Task instance
+
+        The embedeval version, the checksum of the Task's source file and
+        the checksums of the modules in ``ARTIFACT_MODULES``, which the
+        Tasks use to build their artifacts, make up the code version.
+        """
+        from embedeval import __version__
+
+        task_source_path = Path(inspect.getsourcefile(type(task)))  # type: ignore
+        package_path = Path(__file__).parent
+        code_version = "-".join(
+            [__version__, calculate_checksum(task_source_path)]
+            + [
+                calculate_checksum(package_path / f"{module}.py")
+                for module in ARTIFACT_MODULES
+            ]
+        )
+        return cls(task.NAME, dataset_paths, code_version)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Load the cached artifacts
+
+        ``None`` is returned if there are no cached artifacts
+        or if they cannot be loaded.
+        """
+        if not self.path.is_dir():
+            return None
+
+        try:
+            with (self.path / CONSTANTS_FILENAME).open("r") as constants_file:
+                artifacts = json.load(constants_file)
+
+            for artifact_path in self.path.iterdir():
+                if artifact_path.suffix == ".npy":
+                    artifacts[artifact_path.stem] = np.load(str(artifact_path))
+                elif artifact_path.suffix == ".pickle":
+                    with artifact_path.open("rb") as artifact_file:
+                        artifacts[artifact_path.stem] = pickle.load(artifact_file)
+        except Exception as exc:
+            logger.debug("Unable to load cached Task artifacts %s: %s", self.path, exc)
+            return None
+
+        logger.debug("Loaded cached Task artifacts from %s", self.path)
+        return artifacts
+
+    def save(self, artifacts: Dict[str, Any]) -> None:
+        """Save the given artifacts to the cache
+
+        The artifacts are written to a temporary directory first
+        and moved into place at the end.
+        Failing to save the artifacts is not an error,
+        they will just be created again the next time.
+        """
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = Path(
+                tempfile.mkdtemp(prefix=self.path.name, dir=str(self.path.parent))
+            )
+        except OSError as exc:
+            logger.debug("Unable to create Task artifact cache %s: %s", self.path, exc)
+            return
+
+        try:
+            constants = {}
+            for name, artifact in artifacts.items():
+                if isinstance(artifact, np.ndarray):
+                    np.save(str(tmp_path / f"{name}.npy"), artifact, allow_pickle=False)
+                elif _is_json_serializable(artifact):
+                    constants[name] = artifact
+                else:
+                    with (tmp_path / f"{name}.pickle").open("wb") as artifact_file:
+                        pickle.dump(artifact, artifact_file)
+
+            with (tmp_path / CONSTANTS_FILENAME).open("w") as constants_file:
+                json.dump(constants, constants_file)
+
+            os.replace(str(tmp_path), str(self.path))
+        except Exception as exc:
+            logger.debug("Unable to save Task artifacts to %s: %s", self.path, exc)
+            shutil.rmtree(str(tmp_path), ignore_errors=True)
+            return
+
+        logger.debug("Saved Task artifacts to %s", self.path)
+
+
+def _is_json_serializable(value) -> bool:
+    """Check if the given value can be saved as JSON without loss"""
+    try:
+        return json.loads(json.dumps(value)) == value
+    except (TypeError, ValueError):
+        return False
@@ -8,24 +8,50 @@ NLP Embedding Evaluation Tool
 :license: MIT, see LICENSE for more details.
 """
 
+import ast
 import importlib.util
+import json
+import os
 import sys
+import tempfile
 from pathlib import Path
-from typing import Any, Dict, List
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple
 
+from embedeval.cachedir import get_cache_dir
 from embedeval.errors import EmbedevalError
 from embedeval.logger import get_component_logger
 
 logger = get_component_logger("task-registry")
 
+#: Holds the version of the Task manifest format
+MANIFEST_VERSION = 2
 
-def load_tasks(locations: List[Path]) -> List[Path]:
-    """Load all Python modules in the given locations
+MANIFEST_FILENAME = "task-manifest.json"
+
+
+def load_tasks(
+    locations: List[Path], task_registry: Optional["TaskRegistry"] = None
+) -> List[Path]:
+    """Discover the Tasks in all Python modules in the given locations
+
+    The modules are not imported, but statically scanned for
+    Task classes with a literal ``NAME``. These Tasks are registered
+    with their module, which is imported once one of them is requested.
+    Modules defining a ``NAME`` which is not a literal are imported right away.
+
+    The scan results are kept in a manifest in the embedeval cache directory
+    and are reused as long as the size and modification time of a module
+    doesn't change.
 
     All given locations must already be expanded regarding
     * Environment Variables
     * User Home Directory
     """
+    if task_registry is None:
+        task_registry = registry
+
+    manifest = TaskManifest.load()
     loaded_modules = []
     for location in locations:
         if not location.exists():
@@ -34,13 +60,180 @@ def load_tasks(locations: List[Path]) -> List[Path]:
             )
 
         for module_path in location.glob("**/*.py"):
-            load_module(module_path)
+            task_names, needs_import = manifest.scan(module_path)
+            for task_name in task_names:
+                task_registry.register_module(task_name, module_path)
+
+            if needs_import:
+                task_registry.register_module_tasks(load_module(module_path))
             loaded_modules.append(module_path)
 
+    manifest.save()
     return loaded_modules
 
 
-def load_module(path: Path) -> None:
+def scan_module(path: Path) -> Tuple[List[str], bool]:
+    """Statically scan the given module for Task classes
+
+    Top-level classes with a base class named ``Task`` or with a Task class
+    of the same module as base class are Task classes.
+    Returns the literal ``NAME`` of all Task classes and if the module needs
+    to be imported to discover its Tasks, because a Task class defines
+    its ``NAME`` with something else than a literal string or because
+    a class with a ``NAME`` has base classes which aren't known to be Tasks.
+    """
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (OSError, SyntaxError, ValueError) as exc:
+        logger.debug("Unable to scan module %s for Tasks: %s", path, exc)
+        # NOTE: let the import report the actual error.
+        return [], True
+
+    task_names = []
+    task_class_names = {"Task"}
+    needs_import = False
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef) or not node.bases:
+            continue
+
+        is_task_class = any(
+            _get_base_name(base) in task_class_names for base in node.bases
+        )
+        if is_task_class:
+            task_class_names.add(node.name)
+
+        for statement in node.body:
+            if isinstance(statement, ast.Assign):
+                targets = statement.targets
+            elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+                targets = [statement.target]
+            else:
+                continue
+
+            if not any(isinstance(t, ast.Name) and t.id == "NAME" for t in targets):
+                continue
+
+            if not is_task_class:
+                # NOTE: the base classes may be Tasks imported from other modules.
+                needs_import = True
+                continue
+
+            # NOTE: string literals are ``ast.Str`` nodes before Python 3.8
+            #       and ``ast.Constant`` nodes since.
+            try:
+                task_name = ast.literal_eval(statement.value)
+            except (ValueError, TypeError):
+                task_name = None
+
+            if isinstance(task_name, str):
+                # NOTE: Tasks without a name are only bases for other Tasks
+                if task_name:
+                    task_names.append(task_name)
+            else:
+                needs_import = True
+
+    return task_names, needs_import
+
+
+def _get_base_name(base: ast.expr) -> Optional[str]:
+    """Get the name of the given base class, like ``Task`` for ``embedeval.task.Task``"""
+    if isinstance(base, ast.Name):
+        return base.id
+    if isinstance(base, ast.Attribute):
+        return base.attr
+    return None
+
+
+class TaskManifest:
+    """Manifest of the Tasks statically discovered in modules
+
+    The scan results of a module are stored by its path together with
+    its size and modification time to detect changes.
+    """
+
+    def __init__(self, path: Path, modules: Dict[str, Dict[str, Any]]) -> None:
+        #: Holds the path to the manifest file
+        self.path = path
+        #: Holds the scan results by module path
+        self.modules = modules
+        self.is_changed = False
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "TaskManifest":
+        """Load the Task manifest
+
+        An empty manifest is used if the manifest file
+        doesn't exist or cannot be read.
+        """
+        if path is None:
+            path = get_cache_dir() / MANIFEST_FILENAME
+
+        try:
+            with path.open("r") as manifest_file:
+                manifest = json.load(manifest_file)
+            if manifest.get("version") == MANIFEST_VERSION:
+                return cls(path, manifest["modules"])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as exc:
+            logger.debug("Ignoring invalid Task manifest %s: %s", path, exc)
+
+        return cls(path, {})
+
+    def scan(self, module_path: Path) -> Tuple[List[str], bool]:
+        """Get the scan results for the given module
+
+        The module is only scanned if it's not in the manifest yet
+        or if it has changed.
+        """
+        module_stat = module_path.stat()
+        entry = self.modules.get(str(module_path))
+        if (
+            entry is not None
+            and entry["size"] == module_stat.st_size
+            and entry["mtime_ns"] == module_stat.st_mtime_ns
+        ):
+            return entry["task_names"], entry["needs_import"]
+
+        task_names, needs_import = scan_module(module_path)
+        self.modules[str(module_path)] = {
+            "size": module_stat.st_size,
+            "mtime_ns": module_stat.st_mtime_ns,
+            "task_names": task_names,
+            "needs_import": needs_import,
+        }
+        self.is_changed = True
+        return task_names, needs_import
+
+    def save(self) -> None:
+        """Save the Task manifest if it has changed
+
+        Failing to save the manifest is not an error,
+        the modules will just be scanned again the next time.
+        """
+        if not self.is_changed:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=self.path.name, dir=str(self.path.parent)
+            )
+            with os.fdopen(fd, "w") as manifest_file:
+                json.dump(
+                    {"version": MANIFEST_VERSION, "modules": self.modules},
+                    manifest_file,
+                )
+            os.replace(tmp_path, str(self.path))
+        except OSError as exc:
+            logger.debug("Unable to save Task manifest %s: %s", self.path, exc)
+            return
+
+        self.is_changed = False
+        logger.debug("Saved Task manifest to %s", self.path)
+
+
+def load_module(path: Path) -> ModuleType:
     """Load the given module into the Python runtime"""
     module_name = path.stem
     try:
@@ -61,6 +254,7 @@ def load_module(path: Path) -> None:
                 module_name, path, exc
             )
         )
+    return module
 
 
 class TaskRegistry:
@@ -68,6 +262,8 @@ class TaskRegistry:
 
     def __init__(self) -> None:
         self.tasks: Dict[str, Any] = {}
+        #: Holds the module paths of discovered Tasks which are not imported yet
+        self.task_modules: Dict[str, Path] = {}
 
     def register(self, task_cls) -> None:
         """Register the given Task in the Registry"""
@@ -89,6 +285,46 @@ class TaskRegistry:
             self.tasks[task_name] = task_cls
             logger.debug("Registered Task %s", task_name)
 
+    def register_module_tasks(self, module: ModuleType) -> None:
+        """Register the Task classes defined in the given imported module
+
+        Task classes register themselves in the global registry when
+        they are defined, this registers them in other registries, too.
+        """
+        # NOTE: the Task module imports this module to register its subclasses.
+        from embedeval.task import Task
+
+        for task_cls in vars(module).values():
+            if (
+                isinstance(task_cls, type)
+                and issubclass(task_cls, Task)
+                and task_cls.__module__ == module.__name__
+                and isinstance(getattr(task_cls, "NAME", None), str)
+                and task_cls.NAME
+                and self.tasks.get(task_cls.NAME) is not task_cls
+            ):
+                self.register(task_cls)
+
+    def register_module(self, task_name: str, module_path: Path) -> None:
+        """Register the module which defines the Task with the given name
+
+        The module is imported once the Task is requested.
+        """
+        if task_name in self.tasks or task_name in self.task_modules:
+            logger.debug(
+                "Not registering Task %s from %s, "
+                "because one with the same name has already been registered",
+                task_name,
+                module_path,
+            )
+        else:
+            self.task_modules[task_name] = module_path
+            logger.debug("Discovered Task %s in %s", task_name, module_path)
+
+    def get_task_names(self) -> List[str]:
+        """Get the names of all registered and discovered Tasks"""
+        return sorted(set(self.tasks) | set(self.task_modules))
+
     def create_task(self, name: str):
         """Create a new Task of the given type"""
         task_cls = self.get_task_cls(name)
@@ -97,13 +333,19 @@ class TaskRegistry:
         return task
 
     def get_task_cls(self, name: str):
-        """Get a registered Task class for the given Task name"""
+        """Get a registered Task class for the given Task name
+
+        The module of a discovered Task is imported if necessary.
+        """
+        if name not in self.tasks and name in self.task_modules:
+            self.register_module_tasks(load_module(self.task_modules.pop(name)))
+
         try:
             return self.tasks[name]
         except KeyError:
             raise EmbedevalError(
                 f"No Task with name '{name}' registered. "
-                f"Choose one of: {', '.join(self.tasks.keys())}"
+                f"Choose one of: {', '.join(self.get_task_names())}"
             )
 
 
@@ -9,7 +9,8 @@ NLP Embedding Evaluation Tool
 """
 
 import textwrap
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, List, Union
 
 import colorful as cf
 
@@ -26,6 +27,9 @@ class TaskReport:
     title: str = ""
     #: Holds the body of the Task Report
     body: str = ""
+    #: Holds the measured values of the Task by name, e.g. the accuracy.
+    #  Those are used to compare the Task outcome of multiple Embeddings.
+    metrics: Dict[str, float] = field(default_factory=dict)
 
     def __str__(self):
         """Format the Report for the console output"""
@@ -45,3 +49,127 @@ class TaskReport:
         """
 
         return textwrap.dedent(output).strip()
+
+
+def format_comparison_table(
+    task_names: List[str], results: Dict[str, List[Union[TaskReport, Exception]]]
+) -> str:
+    """Format a table to compare the Task results of multiple Embeddings
+
+    The ``results`` contain the Task Reports of every Embedding by its name
+    in the order of the given Task names.
+    A failed Task evaluation is given as the raised exception instead of a report.
+    """
+    rows = []
+    for task_nbr, task_name in enumerate(task_names):
+        task_results = [r[task_nbr] for r in results.values()]
+        rows.append((task_name, [_format_outcome(r) for r in task_results], True))
+
+        for metric_name in _get_metric_names(task_results):
+            rows.append(
+                (
+                    f"  {metric_name}",
+                    [_format_metric(r, metric_name) for r in task_results],
+                    False,
+                )
+            )
+
+    return _format_table(["Task", *results.keys()], rows)
+
+
+def format_shift_table(
+    task_names: List[str],
+    reference_results: List[Union[TaskReport, Exception]],
+    results: List[Union[TaskReport, Exception]],
+    reference_name: str,
+    name: str,
+) -> str:
+    """Format a table of how much the Task metrics shift compared with a reference
+
+    The reference results and the results are the Task Reports of the same
+    Embedding in the order of the given Task names, for example evaluated
+    with the word vectors in ``float32`` and in a reduced precision.
+    """
+    rows = []
+    for task_name, reference, result in zip(task_names, reference_results, results):
+        outcomes = [_format_outcome(reference), _format_outcome(result)]
+        is_changed = outcomes[0] != outcomes[1]
+        rows.append((task_name, [*outcomes, "changed" if is_changed else ""], True))
+
+        for metric_name in _get_metric_names([reference, result]):
+            rows.append(
+                (
+                    f"  {metric_name}",
+                    [
+                        _format_metric(reference, metric_name),
+                        _format_metric(result, metric_name),
+                        _format_shift(reference, result, metric_name),
+                    ],
+                    False,
+                )
+            )
+
+    return _format_table(["Task", reference_name, name, "shift"], rows)
+
+
+def _get_metric_names(results):
+    """Get the names of the metrics of all given Task results in order"""
+    metric_names = []
+    for result in results:
+        if isinstance(result, TaskReport):
+            metric_names.extend(m for m in result.metrics if m not in metric_names)
+    return metric_names
+
+
+def _format_table(header, rows):
+    """Format the given rows of a name and cells under the given header"""
+    widths = [
+        max([len(header[0])] + [len(name) for name, _, _ in rows]),
+        *(
+            max([len(column)] + [len(cells[i]) for _, cells, _ in rows])
+            for i, column in enumerate(header[1:])
+        ),
+    ]
+
+    lines = ["  ".join(str(cf.bold(c.ljust(w))) for c, w in zip(header, widths))]
+    for name, cells, is_outcome in rows:
+        formatted_cells = [
+            str(_colorize_outcome(c.ljust(w), c)) if is_outcome else c.ljust(w)
+            for c, w in zip(cells, widths[1:])
+        ]
+        lines.append("  ".join([name.ljust(widths[0]), *formatted_cells]))
+
+    return "\n".join(line.rstrip() for line in lines)
+
+
+def _format_outcome(result):
+    """Format the outcome of the given Task result for the comparison table"""
+    if isinstance(result, TaskReport):
+        return "passed" if result.outcome else "failed"
+    return "error"
+
+
+def _format_metric(result, metric_name):
+    """Format the given metric of the given Task result for the comparison table"""
+    if isinstance(result, TaskReport) and metric_name in result.metrics:
+        return f"{result.metrics[metric_name]:.4f}"
+    return "-"
+
+
+def _format_shift(reference, result, metric_name):
+    """Format the shift of the given metric from the reference to the result"""
+    if (
+        isinstance(reference, TaskReport)
+        and isinstance(result, TaskReport)
+        and metric_name in reference.metrics
+        and metric_name in result.metrics
+    ):
+        return f"{result.metrics[metric_name] - reference.metrics[metric_name]:+.4f}"
+    return "-"
+
+
+def _colorize_outcome(text, outcome):
+    """Colorize the given text of an outcome in the comparison table"""
+    if outcome == "passed":
+        return cf.forestGreen(text)
+    return cf.firebrick(text)
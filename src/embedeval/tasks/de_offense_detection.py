@@ -8,14 +8,24 @@ NLP Embedding Evaluation Tool
 :license: MIT, see LICENSE for more details.
 """
 
-import re
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+from embedeval.encoder import (
+    calculate_inverse_document_frequencies,
+    create_embedding_matrix,
+    create_sentence_vectors,
+    encode_corpus,
+    to_padded_sequences,
+)
+from embedeval.errors import EmbedevalError
 from embedeval.logger import get_component_logger  # noqa
+from embedeval.probe import LinearProbe, accuracy_and_f1_score
 from embedeval.task import Task, TaskReport  # noqa
+from embedeval.taskcache import TaskArtifactCache  # noqa
+from embedeval.tokenizer import build_word_index, tokenize_corpus
 
 logger = get_component_logger("offense_detection")
 
@@ -61,27 +71,71 @@ class OffenseDetectionTask(Task):  # type: ignore
     TEXT_COLUMN_NAME = "tweet"
     SENTIMENT_COLUMN_NAME = "label"
 
-    def __init__(self):
-        super().__init__()
+    #: Holds how the Task is evaluated, either ``probe`` or ``keras``.
+    #  The ``probe`` fits a linear classifier to sentence vectors within seconds,
+    #  ``keras`` trains a neural network, which is a lot slower.
+    MODE = "probe"
+
+    #: Holds how the word vectors of a Tweet are weighted for the probe,
+    #  either ``mean`` for equal weights or ``tfidf``.
+    SENTENCE_WEIGHTING = "tfidf"
+
+    #: Holds the classifier of the probe, either ``logistic`` or ``ridge``
+    PROBE_CLASSIFIER = "logistic"
 
-        self.train_dataset = self._load_dataset(self.TRAIN_DATASET_PATH)
-        self.test_dataset = self._load_dataset(self.TEST_DATASET_PATH)
-        self.dataset = pd.concat([self.train_dataset, self.test_dataset])
-        self.corpus = self.dataset[self.TEXT_COLUMN_NAME]
-        self.tokenizer = self._create_tokenizer(self.corpus)
+    #: Holds the minimum scores to pass the Task
+    GOAL_F1_SCORE = 0.75
+    GOAL_ACCURACY = 0.70
 
-        self.corpus_sentence_length = self._calculate_sentence_length(self.corpus)
+    #: Holds the amount of processes which tokenize the Tweets
+    TOKENIZE_WORKERS = 1
 
-        self.train_corpus = self._prepare_dataset_corpus(
-            self.train_dataset[self.TEXT_COLUMN_NAME],
-            self.tokenizer,
-            self.corpus_sentence_length,
+    def __init__(self):
+        super().__init__()
+
+        # the preprocessed datasets are cached, because the preprocessing is slow
+        artifact_cache = TaskArtifactCache.for_task(
+            self, [self.TRAIN_DATASET_PATH, self.TEST_DATASET_PATH]
+        )
+        artifacts = artifact_cache.load()
+        if artifacts is None:
+            artifacts = self._preprocess_datasets()
+            artifact_cache.save(artifacts)
+
+        self.word_index = artifacts["word_index"]
+        self.corpus_sentence_length = artifacts["corpus_sentence_length"]
+        self.train_corpus = artifacts["train_corpus"]
+        self.train_labels = artifacts["train_labels"]
+        self.test_corpus = artifacts["test_corpus"]
+        self.test_labels = artifacts["test_labels"]
+
+    def _preprocess_datasets(self):
+        train_dataset = self._load_dataset(self.TRAIN_DATASET_PATH)
+        test_dataset = self._load_dataset(self.TEST_DATASET_PATH)
+
+        # NOTE: the Tweets are only tokenized once for all further preprocessing
+        train_tokens = tokenize_corpus(
+            train_dataset[self.TEXT_COLUMN_NAME], workers=self.TOKENIZE_WORKERS
         )
-        self.test_corpus = self._prepare_dataset_corpus(
-            self.test_dataset[self.TEXT_COLUMN_NAME],
-            self.tokenizer,
-            self.corpus_sentence_length,
+        test_tokens = tokenize_corpus(
+            test_dataset[self.TEXT_COLUMN_NAME], workers=self.TOKENIZE_WORKERS
         )
+        corpus_tokens = train_tokens + test_tokens
+        word_index = build_word_index(corpus_tokens)
+
+        corpus_sentence_length = self._calculate_sentence_length(corpus_tokens)
+
+        train_corpus = encode_corpus(train_tokens, word_index)
+        test_corpus = encode_corpus(test_tokens, word_index)
+
+        return {
+            "word_index": word_index,
+            "corpus_sentence_length": corpus_sentence_length,
+            "train_corpus": train_corpus,
+            "train_labels": np.asarray(train_dataset[self.SENTIMENT_COLUMN_NAME]),
+            "test_corpus": test_corpus,
+            "test_labels": np.asarray(test_dataset[self.SENTIMENT_COLUMN_NAME]),
+        }
 
     def _load_dataset(self, dataset_path):
         logger.debug("Loading dataset %s", str(dataset_path))
@@ -94,73 +148,36 @@ class OffenseDetectionTask(Task):  # type: ignore
         df["label"] = df["label"].map({"OFFENSE": 1, "OTHER": 0})
 
         # remove words starting with an @ from all tweets
-        df["tweet"] = df["tweet"].apply(lambda x: re.sub(r"@[A-Za-z0-9_]{3,}", "", x))
+        df["tweet"] = df["tweet"].str.replace(r"@[A-Za-z0-9_]{3,}", "", regex=True)
         logger.debug("Loaded dataset %s", str(dataset_path))
         return df
 
-    def _create_tokenizer(self, corpus):
-        # NOTE(TF): lazy import keras, because it takes forever to import
-        #           and we don't want to do that just to import this task module.
-        from keras.preprocessing.text import Tokenizer  # noqa
-
-        word_tokenizer = Tokenizer()
-        word_tokenizer.fit_on_texts(corpus)
-        return word_tokenizer
-
-    def _calculate_sentence_length(self, corpus):
-        from nltk.tokenize import word_tokenize  # noqa
-
-        # NOTE(TF): lazy import keras, because it takes forever to import
-        #           and we don't want to do that just to import this task module.
-
+    def _calculate_sentence_length(self, tokenized_corpus):
         logger.debug("Calculating corpus sentence length")
-        word_count = lambda sentence: len(word_tokenize(sentence))  # noqa
-        longest_sentence = max(corpus, key=word_count)
-        sentence_length = len(word_tokenize(longest_sentence))
+        sentence_length = max((len(tokens) for tokens in tokenized_corpus), default=0)
         logger.debug("Calculated corpus sentence length of %d", sentence_length)
 
         return sentence_length
 
-    def _prepare_dataset_corpus(self, corpus, tokenizer, sentence_length):
-        # NOTE(TF): lazy import keras, because it takes forever to import
-        #           and we don't want to do that just to import this task module.
-        from keras.preprocessing.sequence import pad_sequences  # noqa
-
-        text = tokenizer.texts_to_sequences(corpus)
-        padded_text = pad_sequences(text, sentence_length, padding="post")
-        return padded_text
+    def required_words(self):
+        return set(self.word_index)
 
     def evaluate(self, embedding) -> TaskReport:
         # define the minimum score to pass the Task
-        goal_f1_score = 0.75
-        goal_accuracy = 0.70
+        goal_f1_score = self.GOAL_F1_SCORE
+        goal_accuracy = self.GOAL_ACCURACY
 
         # define the title for the report
         report_title = f"Detect if the defined Tweets are offensive or not."
 
-        # create model
-        model = self._create_cnn_model(
-            embedding, self.tokenizer, self.corpus_sentence_length
-        )
+        if self.MODE == "probe":
+            actual_accuracy, actual_f1_score = self._evaluate_probe(embedding)
+        elif self.MODE == "keras":
+            actual_accuracy, actual_f1_score = self._evaluate_cnn_model(embedding)
+        else:
+            raise EmbedevalError(f"Unknown offense detection mode {self.MODE}")
 
-        model_verbosity = 1
-
-        # train model
-        model.fit(
-            self.train_corpus,
-            self.train_dataset[self.SENTIMENT_COLUMN_NAME],
-            validation_split=0.3,
-            epochs=5,
-            verbose=model_verbosity,
-        )
-
-        # evaluate model
-        print(model)
-        actual_loss, actual_accuracy, actual_f1_score = model.evaluate(
-            self.test_corpus,
-            self.test_dataset[self.SENTIMENT_COLUMN_NAME],
-            verbose=model_verbosity,
-        )
+        metrics = {"accuracy": actual_accuracy, "f1_score": actual_f1_score}
 
         if goal_accuracy > actual_accuracy or goal_f1_score > actual_f1_score:
             logger.error(
@@ -181,6 +198,7 @@ class OffenseDetectionTask(Task):  # type: ignore
 The goal of {goal_accuracy:.2} accuracy and {goal_f1_score:.2} F1 score was not reached.
 The actual accuracy was {actual_accuracy:.2} and F1 score was {actual_f1_score:.2}."""
                 ),
+                metrics=metrics,
             )
 
         logger.debug(
@@ -198,16 +216,64 @@ The actual accuracy was {actual_accuracy:.2} and F1 score was {actual_f1_score:.
 The goal of minimum {goal_accuracy:.2} accuracy and {goal_f1_score:.2} F1 score was reached.
 The actual accuracy was {actual_accuracy:.2} and F1 score was {actual_f1_score:.2}."""
             ),
+            metrics=metrics,
+        )
+
+    def _evaluate_cnn_model(self, embedding):
+        """Evaluate a neural network trained with the word vectors using keras"""
+        # create model
+        model = self._create_cnn_model(
+            embedding, self.word_index, self.corpus_sentence_length
         )
 
-    def _create_cnn_model(self, embedding, tokenizer, sentence_length):
+        model_verbosity = 1
+
+        # train model
+        model.fit(
+            to_padded_sequences(self.train_corpus, self.corpus_sentence_length),
+            self.train_labels,
+            validation_split=0.3,
+            epochs=5,
+            verbose=model_verbosity,
+        )
+
+        # evaluate model
+        print(model)
+        actual_loss, actual_accuracy, actual_f1_score = model.evaluate(
+            to_padded_sequences(self.test_corpus, self.corpus_sentence_length),
+            self.test_labels,
+            verbose=model_verbosity,
+        )
+        return actual_accuracy, actual_f1_score
+
+    def _evaluate_probe(self, embedding):
+        """Evaluate a linear classifier on the mean word vectors of the Tweets"""
+        embedding_matrix, known_rows = create_embedding_matrix(embedding, self.word_index)
+
+        # NOTE: words without a word vector are not part of the mean
+        word_weights = known_rows.astype(np.float64)
+        if self.SENTENCE_WEIGHTING == "tfidf":
+            word_weights *= calculate_inverse_document_frequencies(self.train_corpus)
+        elif self.SENTENCE_WEIGHTING != "mean":
+            raise EmbedevalError(f"Unknown sentence weighting {self.SENTENCE_WEIGHTING}")
+
+        probe = LinearProbe(self.PROBE_CLASSIFIER).fit(
+            create_sentence_vectors(self.train_corpus, embedding_matrix, word_weights),
+            self.train_labels,
+        )
+        predictions = probe.predict(
+            create_sentence_vectors(self.test_corpus, embedding_matrix, word_weights)
+        )
+        return accuracy_and_f1_score(self.test_labels, predictions)
+
+    def _create_cnn_model(self, embedding, word_index, sentence_length):
         # NOTE(TF): lazy import keras, because it takes forever to import
         #           and we don't want to do that just to import this task module.
         from keras.layers import Dense, Flatten  # noqa
         from keras.layers.embeddings import Embedding  # noqa
         from keras.models import Sequential  # noqa
 
-        embedding_matrix = self._create_embedding_matrix(embedding, tokenizer)
+        embedding_matrix = self._create_embedding_matrix(embedding, word_index)
 
         model = Sequential()
         model.add(
@@ -228,18 +294,6 @@ The actual accuracy was {actual_accuracy:.2} and F1 score was {actual_f1_score:.
 
         return model
 
-    def _create_embedding_matrix(self, embedding, tokenizer):
-        # Get the Vocabulary length and add 1 for all unknown words
-        vocab_length = len(tokenizer.word_index) + 1
-
-        embedding_matrix = np.zeros((vocab_length, embedding.shape[1]))
-        for word, index in tokenizer.word_index.items():
-            try:
-                embedding_vector = embedding.get_word_vector(word)
-            except KeyError:
-                embedding_vector = None
-
-            if embedding_vector is not None:
-                embedding_matrix[index] = embedding_vector
-
+    def _create_embedding_matrix(self, embedding, word_index):
+        embedding_matrix, _ = create_embedding_matrix(embedding, word_index)
         return embedding_matrix
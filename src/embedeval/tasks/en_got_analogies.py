@@ -0,0 +1,176 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from pathlib import Path
+from typing import List, Tuple
+
+import colorful as cf
+import numpy as np
+
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+from embedeval.task import Task, TaskReport
+
+logger = get_component_logger("analogies_task")
+
+
+def load_questions(path: Path) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Load the analogy questions from the given file
+
+    The file is in the format of the Google analogy dataset:
+    a line starting with a colon starts a new category and
+    every other line is a question ``a b c d``, which reads
+    ``a`` is to ``b`` as ``c`` is to ``d``.
+
+    Returns the names of the categories, a Q x 4 array with the words
+    of all questions and the index of the category of each question.
+    """
+    categories: List[str] = []
+    questions = []
+    question_categories = []
+    with path.open("r", encoding="utf-8") as questions_file:
+        for line_number, line in enumerate(questions_file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            if line.startswith(":"):
+                categories.append(line[1:].strip())
+                continue
+
+            words = line.split()
+            if len(words) != 4:
+                raise EmbedevalError(
+                    f"Analogy question on line {line_number} of {path} "
+                    f"must have 4 words, but has {len(words)}"
+                )
+
+            if not categories:
+                categories.append("uncategorized")
+            questions.append(words)
+            question_categories.append(len(categories) - 1)
+
+    return (
+        categories,
+        np.array(questions, dtype=object).reshape(-1, 4),
+        np.array(question_categories, dtype=np.int64),
+    )
+
+
+class AnalogyTask(Task):  # type: ignore
+    """Represents a Task answering a dataset of Word Analogy questions
+
+    Every question ``a b c d`` is answered by searching the word
+    most similar to ``b - a + c`` in the whole Word Embedding,
+    except for the words of the question.
+    The questions are answered in batches of ``BATCH_SIZE`` at once.
+
+    Questions with words which are not in the Word Embedding are skipped.
+
+    Subclass this Task with another ``NAME`` and ``QUESTIONS_PATH``
+    to evaluate another analogy dataset.
+    """
+
+    NAME = "en-got-analogies"
+
+    QUESTIONS_PATH = Path(__file__).parent / "data" / "got-analogies" / "questions.txt"
+
+    #: Holds the method to search the answers, either ``3CosAdd`` or ``3CosMul``
+    METHOD = "3CosAdd"
+
+    #: Holds the amount of questions which are answered at once
+    BATCH_SIZE = 2048
+
+    #: Holds if the answers are searched approximately in the candidates
+    #  of the index saved next to the Embedding with ``embedeval index``.
+    APPROXIMATE = False
+
+    #: Holds the minimum accuracy to pass the Task
+    GOAL_ACCURACY = 0.5
+
+    def __init__(self):
+        super().__init__()
+        self.categories, self.questions, self.question_categories = load_questions(
+            self.QUESTIONS_PATH
+        )
+
+    def evaluate(self, embedding) -> TaskReport:
+        report_title = (
+            f"Answer {len(self.questions)} analogy questions "
+            f"in {len(self.categories)} categories using {self.METHOD}"
+        )
+
+        engine = embedding.similarity_engine
+        if self.METHOD == "3CosAdd":
+            search = engine.search_add
+        elif self.METHOD == "3CosMul":
+            search = engine.search_cosmul
+        else:
+            raise EmbedevalError(f"Unknown analogy method {self.METHOD}")
+
+        rows = embedding.get_word_indices(self.questions.ravel()).reshape(-1, 4)
+        answered = (rows >= 0).all(axis=1)
+        answered_rows = rows[answered]
+        logger.debug(
+            "Answering %d of %d questions, the others have unknown words",
+            len(answered_rows),
+            len(rows),
+        )
+
+        is_correct = np.zeros(len(answered_rows), dtype=bool)
+        for start in range(0, len(answered_rows), self.BATCH_SIZE):
+            batch = answered_rows[start : start + self.BATCH_SIZE]
+            answers, _ = search(
+                batch[:, [1, 2]], batch[:, [0]], topn=1, approximate=self.APPROXIMATE
+            )
+            is_correct[start : start + len(batch)] = answers[:, 0] == batch[:, 3]
+
+        n_categories = len(self.categories)
+        categories = self.question_categories[answered]
+        totals = np.bincount(self.question_categories, minlength=n_categories)
+        answered_counts = np.bincount(categories, minlength=n_categories)
+        correct_counts = np.bincount(
+            categories, weights=is_correct, minlength=n_categories
+        ).astype(np.int64)
+
+        accuracy = is_correct.mean() if len(is_correct) > 0 else 0.0
+        coverage = len(answered_rows) / len(rows) if len(rows) > 0 else 0.0
+        metrics = {"accuracy": float(accuracy), "coverage": float(coverage)}
+
+        category_lines = []
+        for category, total, answered_count, correct_count in zip(
+            self.categories, totals, answered_counts, correct_counts
+        ):
+            if answered_count > 0:
+                category_accuracy = correct_count / answered_count
+                metrics[f"{category} accuracy"] = float(category_accuracy)
+                result = f"{category_accuracy:.2%} ({correct_count}/{answered_count})"
+            else:
+                result = "-"
+            category_lines.append(
+                f"    {category}: {result}, {total - answered_count} skipped"
+            )
+
+        logger.debug("Answered analogies with an accuracy of %f", accuracy)
+
+        return TaskReport(
+            self.NAME,
+            outcome=bool(accuracy >= self.GOAL_ACCURACY),
+            title=report_title,
+            body="\n".join(
+                [
+                    f"{cf.bold}Accuracy: {accuracy:.2%}{cf.reset} "
+                    f"(goal {self.GOAL_ACCURACY:.2%}), coverage: {coverage:.2%}",
+                    "Accuracy per category:",
+                ]
+                + category_lines
+            ),
+            metrics=metrics,
+        )
@@ -19,9 +19,15 @@ class OddOneOutTask(Task):  # type: ignore
 
     NAME = "en-got-odd-one-out"
 
+    #: Holds the words of which one is the odd one out
+    WORDS = "Eddard Catelyn Rob Riverrun Sansa"
+
+    def required_words(self):
+        return set(self.WORDS.split())
+
     def evaluate(self, embedding) -> TaskReport:
         # define the inputs for the Task
-        words = "Eddard Catelyn Rob Riverrun Sansa"
+        words = self.WORDS
 
         # define the goal for the odd one out function
         goal = "Riverrun"
@@ -32,7 +38,7 @@ class OddOneOutTask(Task):  # type: ignore
         )
 
         # evaluate odd one out
-        odd_one_out = embedding.keyed_vectors.doesnt_match(words.split())
+        odd_one_out = embedding.doesnt_match(words.split())
 
         # evaluate
         if goal != odd_one_out:
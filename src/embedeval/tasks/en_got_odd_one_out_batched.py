@@ -0,0 +1,156 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from pathlib import Path
+from typing import Tuple
+
+import colorful as cf
+import numpy as np
+
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+from embedeval.similarity import normalize_vectors
+from embedeval.task import Task, TaskReport
+
+logger = get_component_logger("odd_ones_out_task")
+
+#: Holds the minimum amount of words a group needs to have an odd one out
+MIN_GROUP_SIZE = 3
+
+
+def load_groups(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """Load the word groups from the given file
+
+    Every line is a group of words separated by whitespace,
+    of which the last word is the odd one out.
+    Lines starting with ``#`` are comments.
+
+    Returns a G x L array with the words of all groups padded
+    with empty words to the size L of the largest group
+    and the size of each group.
+    """
+    groups = []
+    with path.open("r", encoding="utf-8") as groups_file:
+        for line_number, line in enumerate(groups_file, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            words = line.split()
+            if len(words) < MIN_GROUP_SIZE:
+                raise EmbedevalError(
+                    f"Word group on line {line_number} of {path} must have "
+                    f"at least {MIN_GROUP_SIZE} words, but has {len(words)}"
+                )
+            groups.append(words)
+
+    group_sizes = np.array([len(words) for words in groups], dtype=np.int64)
+    padded_groups = np.full(
+        (len(groups), group_sizes.max(initial=0)), "", dtype=object
+    )
+    for group, words in enumerate(groups):
+        padded_groups[group, : len(words)] = words
+    return padded_groups, group_sizes
+
+
+def find_odd_ones_out(
+    embedding, groups: np.ndarray, group_sizes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the odd one out in each of the given padded word groups
+
+    Returns a G x L mask of the known words of each group
+    and the position of the odd one out in each group.
+    Groups with less than three known words have no meaningful answer.
+    """
+    n_groups, max_group_size = groups.shape
+    vectors, found_mask = embedding.get_word_vectors(groups.ravel())
+    vectors = normalize_vectors(vectors).reshape(n_groups, max_group_size, -1)
+    mask = found_mask.reshape(groups.shape) & (
+        np.arange(max_group_size) < group_sizes[:, np.newaxis]
+    )
+
+    known_sizes = mask.sum(axis=1)
+    means = np.einsum("gld,gl->gd", vectors, mask.astype(vectors.dtype))
+    means /= np.maximum(known_sizes, 1)[:, np.newaxis]
+    similarities = np.einsum("gld,gd->gl", vectors, means)
+    similarities[~mask] = np.inf
+    return mask, similarities.argmin(axis=1)
+
+
+class OddOnesOutTask(Task):  # type: ignore
+    """Represents a Task finding the odd one out in a dataset of word groups
+
+    The odd one out of a group is the word least similar to the
+    mean of the normalized word vectors of the group, like the
+    ``doesnt_match()`` method of the Word Embedding.
+    The groups are packed into a padded G x L x M tensor and
+    answered ``BATCH_SIZE`` at once with ``np.einsum``.
+
+    Words which are not in the Word Embedding are masked out of their group.
+    Groups whose odd one out is unknown or which have less than three
+    known words are skipped.
+    """
+
+    NAME = "en-got-odd-one-out-batched"
+
+    GROUPS_PATH = Path(__file__).parent / "data" / "got-odd-ones-out" / "groups.txt"
+
+    #: Holds the amount of groups which are answered at once
+    BATCH_SIZE = 4096
+
+    #: Holds the minimum accuracy to pass the Task
+    GOAL_ACCURACY = 0.5
+
+    def __init__(self):
+        super().__init__()
+        self.groups, self.group_sizes = load_groups(self.GROUPS_PATH)
+
+    def required_words(self):
+        return set(self.groups.ravel()) - {""}
+
+    def evaluate(self, embedding) -> TaskReport:
+        report_title = f"Find the odd one out in {len(self.groups)} groups of words"
+
+        n_groups = len(self.groups)
+        is_answered = np.zeros(n_groups, dtype=bool)
+        is_correct = np.zeros(n_groups, dtype=bool)
+        for start in range(0, n_groups, self.BATCH_SIZE):
+            batch = slice(start, start + self.BATCH_SIZE)
+            known_mask, answers = find_odd_ones_out(
+                embedding, self.groups[batch], self.group_sizes[batch]
+            )
+            odd_positions = self.group_sizes[batch] - 1
+            answered = (known_mask.sum(axis=1) >= MIN_GROUP_SIZE) & known_mask[
+                np.arange(len(known_mask)), odd_positions
+            ]
+            is_answered[batch] = answered
+            is_correct[batch] = answered & (answers == odd_positions)
+
+        n_answered = int(is_answered.sum())
+        n_correct = int(is_correct.sum())
+        accuracy = n_correct / n_answered if n_answered > 0 else 0.0
+        coverage = n_answered / n_groups if n_groups > 0 else 0.0
+        logger.debug(
+            "Found %d of %d odd ones out, %d groups were skipped",
+            n_correct,
+            n_answered,
+            n_groups - n_answered,
+        )
+
+        return TaskReport(
+            self.NAME,
+            outcome=bool(accuracy >= self.GOAL_ACCURACY),
+            title=report_title,
+            body=(
+                f"{cf.bold}Accuracy: {accuracy:.2%}{cf.reset} ({n_correct}/{n_answered}, "
+                f"goal {self.GOAL_ACCURACY:.2%}), coverage: {coverage:.2%}"
+            ),
+            metrics={"accuracy": float(accuracy), "coverage": float(coverage)},
+        )
@@ -37,9 +37,7 @@ class WordAnalogyTask(Task):  # type: ignore
 
         # evaluate most similar word analogies
         most_similar_analogy = dict(
-            embedding.keyed_vectors.most_similar_cosmul(  # type: ignore
-                positive=positives, negative=negatives
-            )
+            embedding.most_similar_cosmul(positive=positives, negative=negatives)
         )
 
         # evaluate actual similarity against the set goal
@@ -71,4 +69,5 @@ The following dictionary was returned:
                 f"The Goal of '{goal}' was found with a "
                 f"{cf.bold}similarity of {most_similar_analogy[goal]:.2}{cf.reset}."
             ),
+            metrics={"similarity": most_similar_analogy[goal]},
         )
@@ -0,0 +1,187 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import colorful as cf
+import numpy as np
+from scipy.stats import rankdata
+
+from embedeval.errors import EmbedevalError
+from embedeval.logger import get_component_logger
+from embedeval.similarity import normalize_vectors
+from embedeval.task import Task, TaskReport
+
+logger = get_component_logger("word_similarity_task")
+
+
+def load_pairs(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """Load the word pairs and their scores from the given TSV file
+
+    Every line is a word pair and its human similarity score
+    separated by tabs. Lines starting with ``#`` are comments.
+
+    Returns a P x 2 array with the words and the P scores.
+    """
+    pairs = []
+    scores = []
+    with path.open("r", encoding="utf-8") as pairs_file:
+        for line_number, line in enumerate(pairs_file, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            columns = line.split("\t")
+            if len(columns) != 3:
+                raise EmbedevalError(
+                    f"Word pair on line {line_number} of {path} "
+                    f"must have 3 tab separated columns, but has {len(columns)}"
+                )
+
+            try:
+                scores.append(float(columns[2]))
+            except ValueError:
+                raise EmbedevalError(
+                    f"Score '{columns[2]}' on line {line_number} of {path} "
+                    "is not a number"
+                )
+            pairs.append(columns[:2])
+
+    return (
+        np.array(pairs, dtype=object).reshape(-1, 2),
+        np.array(scores, dtype=np.float64),
+    )
+
+
+def pearson(x: np.ndarray, y: np.ndarray) -> float:
+    """Get the Pearson correlation coefficient of the given values
+
+    ``nan`` is returned if there are less than two values
+    or if one of them is constant.
+    """
+    if len(x) < 2:
+        return float("nan")
+
+    x = x - x.mean()
+    y = y - y.mean()
+    denominator = np.sqrt(np.dot(x, x) * np.dot(y, y))
+    if denominator == 0:
+        return float("nan")
+    return float(np.dot(x, y) / denominator)
+
+
+def spearman(x: np.ndarray, y: np.ndarray) -> float:
+    """Get the Spearman rank correlation coefficient of the given values
+
+    Tied values get the average of their ranks.
+    """
+    return pearson(rankdata(x), rankdata(y))
+
+
+class WordSimilarityTask(Task):  # type: ignore
+    """Represents a Task correlating word similarities with human scores
+
+    Every ``*.tsv`` file in ``DATASETS_PATH`` is a dataset of word pairs,
+    see ``load_pairs()``.
+    The cosine similarities of the pairs of all datasets are computed
+    at once and correlated with the scores of each dataset.
+
+    Pairs with words which are not in the Word Embedding are skipped.
+
+    No datasets are bundled with embedeval, thus this Task has no ``NAME``
+    and is not registered. Derive a named Task from it which sets
+    ``DATASETS_PATH`` to a directory with datasets, like WordSim-353 or SimLex-999.
+    """
+
+    NAME = ""
+
+    #: Holds the path to the directory with the ``*.tsv`` datasets
+    DATASETS_PATH: Optional[Path] = None
+
+    #: Holds the minimum mean Spearman correlation to pass the Task
+    GOAL_SPEARMAN = 0.3
+
+    def __init__(self):
+        super().__init__()
+        if self.DATASETS_PATH is None:
+            raise EmbedevalError(
+                f"The Task {self.NAME or type(self).__name__} must set the "
+                "DATASETS_PATH to a directory with word similarity datasets"
+            )
+
+        #: Holds the word pairs and scores by the name of the dataset
+        self.datasets: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            path.stem: load_pairs(path)
+            for path in sorted(self.DATASETS_PATH.glob("*.tsv"))
+        }
+        if not self.datasets:
+            raise EmbedevalError(f"No word similarity datasets in {self.DATASETS_PATH}")
+
+    def required_words(self):
+        return {
+            word for pairs, _ in self.datasets.values() for word in pairs.ravel()
+        }
+
+    def evaluate(self, embedding) -> TaskReport:
+        report_title = (
+            f"Correlate the similarity of word pairs "
+            f"with {len(self.datasets)} human scored datasets"
+        )
+
+        all_pairs = np.concatenate([pairs for pairs, _ in self.datasets.values()])
+        vectors, found_mask = embedding.get_word_vectors(all_pairs.ravel())
+        vectors = normalize_vectors(vectors).reshape(len(all_pairs), 2, -1)
+        cosines = np.einsum("pd,pd->p", vectors[:, 0], vectors[:, 1])
+        found = found_mask.reshape(-1, 2).all(axis=1)
+
+        metrics = {}
+        spearmans: List[float] = []
+        dataset_lines = []
+        start = 0
+        for name, (pairs, scores) in self.datasets.items():
+            dataset_found = found[start : start + len(pairs)]
+            dataset_cosines = cosines[start : start + len(pairs)][dataset_found]
+            start += len(pairs)
+
+            coverage = dataset_found.mean() if len(pairs) > 0 else 0.0
+            spearman_rho = spearman(scores[dataset_found], dataset_cosines)
+            pearson_r = pearson(scores[dataset_found], dataset_cosines)
+            metrics[f"{name} coverage"] = float(coverage)
+            if np.isnan(spearman_rho):
+                dataset_lines.append(f"    {name}: -, coverage: {coverage:.2%}")
+                continue
+
+            metrics[f"{name} spearman"] = spearman_rho
+            metrics[f"{name} pearson"] = pearson_r
+            spearmans.append(spearman_rho)
+            dataset_lines.append(
+                f"    {name}: Spearman {spearman_rho:.3f}, Pearson {pearson_r:.3f}, "
+                f"coverage: {coverage:.2%} ({dataset_found.sum()}/{len(pairs)})"
+            )
+
+        mean_spearman = float(np.mean(spearmans)) if spearmans else 0.0
+        metrics["spearman"] = mean_spearman
+        logger.debug("Correlated word similarities with a Spearman of %f", mean_spearman)
+
+        return TaskReport(
+            self.NAME,
+            outcome=bool(mean_spearman >= self.GOAL_SPEARMAN),
+            title=report_title,
+            body="\n".join(
+                [
+                    f"{cf.bold}Mean Spearman: {mean_spearman:.3f}{cf.reset} "
+                    f"(goal {self.GOAL_SPEARMAN:.3f})",
+                    "Correlation per dataset:",
+                ]
+                + dataset_lines
+            ),
+            metrics=metrics,
+        )
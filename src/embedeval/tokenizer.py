@@ -0,0 +1,87 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+
+#: Holds the characters which separate the words besides whitespace,
+#  which are the characters filtered by the ``keras`` ``Tokenizer``.
+SEPARATOR_CHARACTERS = "!\"#$%&()*+,-./:;<=>?@[\\]^_`{|}~"
+
+#: Holds the pattern of a single word
+WORD_PATTERN = re.compile(r"[^\s" + re.escape(SEPARATOR_CHARACTERS) + r"]+")
+
+#: Holds the default amount of sentences tokenized by a process worker at once
+DEFAULT_CHUNK_SIZE = 2048
+
+
+def tokenize(sentence: str, lowercase=True) -> List[str]:
+    """Split the given sentence into words
+
+    The words are separated by whitespace and punctuation
+    like by the ``keras`` ``Tokenizer``.
+    """
+    if lowercase:
+        sentence = sentence.lower()
+    return WORD_PATTERN.findall(sentence)
+
+
+def tokenize_corpus(
+    corpus: Iterable[str],
+    lowercase=True,
+    workers: Optional[int] = 1,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+) -> List[List[str]]:
+    """Split all sentences of the given corpus into words
+
+    The sentences are tokenized in chunks of ``chunk_size`` sentences
+    in a pool of ``workers`` processes if ``workers`` is more than one.
+    ``None`` uses as many processes as there are CPUs.
+
+    The tokenized corpus should be shared by all further preprocessing steps,
+    like building the vocabulary, so that a corpus is only tokenized once.
+    """
+    corpus = list(corpus)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(corpus) <= chunk_size:
+        return _tokenize_chunk(corpus, lowercase)
+
+    chunks = [corpus[i : i + chunk_size] for i in range(0, len(corpus), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        tokenized_chunks = executor.map(_tokenize_chunk, chunks, [lowercase] * len(chunks))
+        return [tokens for chunk in tokenized_chunks for tokens in chunk]
+
+
+def _tokenize_chunk(sentences: List[str], lowercase: bool) -> List[List[str]]:
+    """Tokenize a chunk of sentences, this is run in the process workers"""
+    return [tokenize(sentence, lowercase) for sentence in sentences]
+
+
+def build_word_index(tokenized_corpus: Iterable[Sequence[str]]) -> Dict[str, int]:
+    """Build the index of all words in the tokenized corpus
+
+    Like the ``word_index`` of the ``keras`` ``Tokenizer``,
+    the most frequent word has the index 1, because the index 0
+    is reserved for the padding.
+    Words with the same frequency are ordered by their first occurrence.
+    """
+    word_counts: Counter = Counter()
+    for tokens in tokenized_corpus:
+        word_counts.update(tokens)
+
+    return {
+        word: index
+        for index, (word, _) in enumerate(word_counts.most_common(), start=1)
+    }
@@ -0,0 +1,199 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import hashlib
+import zlib
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+if TYPE_CHECKING:  # pragma: no cover
+    from embedeval.embedding import WordEmbedding
+
+#: Holds the row of the empty slots in the hash table
+EMPTY_SLOT = -1
+
+
+class Vocabulary:
+    """Compact mapping between the words of a Word Embedding and their rows
+
+    Instead of a Python ``str`` object per word and a ``dict`` entry per word,
+    all words are stored UTF-8 encoded in a single byte blob together with
+    the offsets of every word in it.
+    The rows of the words are found with an open addressing hash table
+    of ``int32`` rows, which is at most half full and probed linearly
+    from the CRC-32 checksum of the word.
+    Thus, the vocabulary takes about the memory of the raw words
+    plus 16 bytes per word.
+
+    If a word occurs multiple times, its last row is found, like in a ``dict``.
+    Every row is inserted, the rows of the same word in descending order
+    along the probing sequence of the word.
+    """
+
+    def __init__(
+        self,
+        blob: bytes,
+        offsets: np.ndarray,
+        table: Optional[np.ndarray] = None,
+        size: Optional[int] = None,
+    ):
+        #: Holds the UTF-8 encoded words without any separator
+        self.blob = blob
+        #: Holds the offsets of the words in the blob followed by the end of the blob
+        self.offsets = offsets
+        #: Holds the amount of words, which may be less than the words in the blob
+        self.size = len(offsets) - 1 if size is None else size
+        #: Holds the row of a word in the slot of its hash or ``EMPTY_SLOT``
+        self.table = self._create_table() if table is None else table
+        self._mask = len(self.table) - 1
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "Vocabulary":
+        """Create the vocabulary of the given words in the order of their rows"""
+        encoded_words = [word.encode("utf-8") for word in words]
+        offsets = np.zeros(len(encoded_words) + 1, dtype=np.int64)
+        np.cumsum([len(word) for word in encoded_words], out=offsets[1:])
+        return cls(b"".join(encoded_words), offsets)
+
+    @classmethod
+    def from_lines(cls, data: bytes) -> "Vocabulary":
+        """Create the vocabulary of the given UTF-8 encoded words separated by newlines
+
+        Like ``str.split()``, empty data is a single empty word.
+        """
+        data_bytes = np.frombuffer(data, dtype=np.uint8)
+        separators = np.flatnonzero(data_bytes == ord("\n"))
+        # NOTE: the offsets are shifted by the separators removed before each word
+        offsets = np.empty(len(separators) + 2, dtype=np.int64)
+        offsets[0] = 0
+        offsets[1:-1] = separators - np.arange(len(separators))
+        offsets[-1] = len(data) - len(separators)
+        return cls(np.delete(data_bytes, separators).tobytes(), offsets)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the bytes used by the blob, the offsets and the hash table"""
+        return len(self.blob) + self.offsets.nbytes + self.table.nbytes
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, row: Union[int, slice]) -> Union[str, List[str]]:
+        """Get the word of the given row or the words of the given slice of rows"""
+        if isinstance(row, slice):
+            return self.get_words(range(len(self))[row])
+
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(f"Vocabulary row {row} is out of range")
+        return self.blob[self.offsets[row] : self.offsets[row + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.get_words(range(len(self))))
+
+    def __contains__(self, word) -> bool:
+        return isinstance(word, str) and self.get_row(word) != EMPTY_SLOT
+
+    def get_words(self, rows: Iterable[int]) -> List[str]:
+        """Get the words of the given rows"""
+        blob = self.blob
+        offsets = self.offsets
+        return [blob[offsets[r] : offsets[r + 1]].decode("utf-8") for r in rows]
+
+    def get_row(self, word: str) -> int:
+        """Get the row of the given word or ``-1`` if it's not in the vocabulary"""
+        word_bytes = word.encode("utf-8")
+        slot = zlib.crc32(word_bytes) & self._mask
+        while True:
+            row = int(self.table[slot])
+            if row == EMPTY_SLOT:
+                return EMPTY_SLOT
+            # NOTE: rows of a prefix's table after the prefix are skipped,
+            #       the earlier rows of the same word are probed later.
+            if (
+                row < self.size
+                and self.blob[self.offsets[row] : self.offsets[row + 1]] == word_bytes
+            ):
+                return row
+            slot = (slot + 1) & self._mask
+
+    def get_rows(self, words: Iterable[str]) -> np.ndarray:
+        """Get the rows of the given words, words which aren't found have row ``-1``"""
+        return np.fromiter((self.get_row(word) for word in words), dtype=np.int64)
+
+    def prefix(self, size: int) -> "Vocabulary":
+        """Get the vocabulary of the first ``size`` words
+
+        The blob, the offsets and the hash table are shared,
+        rows of the hash table after the prefix aren't found.
+        Thus, a word which occurs multiple times has its last row
+        within the prefix, like in a vocabulary of only those words.
+        """
+        return Vocabulary(self.blob, self.offsets, self.table, min(size, self.size))
+
+    def checksum(self) -> str:
+        """Get the SHA-256 checksum of the words in the order of their rows
+
+        Only the words of the vocabulary are part of the checksum,
+        thus a prefix has the checksum of a vocabulary of only those words.
+        """
+        digest = hashlib.sha256(
+            self.offsets[: self.size + 1].astype("<i8", copy=False).tobytes()
+        )
+        digest.update(memoryview(self.blob)[: self.offsets[self.size]])
+        return digest.hexdigest()
+
+    def _create_table(self) -> np.ndarray:
+        """Insert all rows into a new hash table
+
+        The rows are inserted in rounds: in every round each slot is given
+        to the first of the rows which probe it, the others probe the next slot.
+        The rows are inserted in reverse order, so that the last row of a word
+        which occurs multiple times is probed first.
+        """
+        n_words = len(self.offsets) - 1
+        table = np.full(
+            1 << max(1, 2 * n_words - 1).bit_length(), EMPTY_SLOT, dtype=np.int32
+        )
+        mask = len(table) - 1
+
+        blob = memoryview(self.blob)
+        offsets = self.offsets.tolist()
+        hashes = np.fromiter(
+            (zlib.crc32(blob[offsets[r] : offsets[r + 1]]) for r in range(n_words)),
+            dtype=np.int64,
+            count=n_words,
+        )
+        rows = np.arange(n_words - 1, -1, -1, dtype=np.int32)
+        slots = hashes[::-1] & mask
+        while len(rows) > 0:
+            free = table[slots] == EMPTY_SLOT
+            _, first_candidates = np.unique(slots[free], return_index=True)
+            inserted = np.flatnonzero(free)[first_candidates]
+            table[slots[inserted]] = rows[inserted]
+
+            remaining = np.ones(len(rows), dtype=bool)
+            remaining[inserted] = False
+            rows = rows[remaining]
+            slots = (slots[remaining] + 1) & mask
+        return table
+
+
+def get_vocabulary(embedding: "WordEmbedding") -> Vocabulary:
+    """Get the vocabulary of the given Word Embedding
+
+    The vocabulary is created from the words of Word Embeddings without one.
+    """
+    vocabulary = getattr(embedding, "vocabulary", None)
+    if isinstance(vocabulary, Vocabulary):
+        return vocabulary
+    return Vocabulary.from_words(embedding.get_words())
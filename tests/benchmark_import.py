@@ -0,0 +1,53 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+#: Holds the modules which must not be imported by the CLI at startup
+HEAVY_MODULES = ["gensim", "numpy", "pandas", "scipy", "keras", "nltk"]
+
+
+def import_with_report(module: str) -> Dict[str, int]:
+    """Import the given module in a new interpreter
+
+    Returns the cumulative import time in microseconds by imported module
+    from the ``-X importtime`` report.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:") :].split("|")
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+@pytest.mark.parametrize("module", ["embedeval", "embedeval.cli"])
+def test_import_time_benchmark(module, benchmark):
+    """Test benchmarks for importing embedeval without any heavy dependency"""
+    import_times = benchmark.pedantic(
+        import_with_report, args=(module,), iterations=1, rounds=5
+    )
+
+    benchmark.extra_info["cumulative_import_time_us"] = import_times[module]
+    imported_heavy_modules = [m for m in HEAVY_MODULES if m in import_times]
+    assert imported_heavy_modules == []
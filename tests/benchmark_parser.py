@@ -13,6 +13,8 @@ from pathlib import Path
 import pytest
 
 from embedeval.parsers.word2vec_gensim import load_embedding
+from embedeval.parsers.word2vec_simple import load_embedding as simple_load_embedding
+from embedeval.parsers.word2vec_simple import load_embedding_parallel
 
 DOWNLOADED_TEST_DATA = Path(__file__).parent / "data" / "downloads"
 
@@ -30,6 +32,36 @@ def test_parser_word2vec_text_benchmark(word2vec_path, benchmark):
     benchmark.pedantic(load_embedding, args=(word2vec_path,), iterations=1, rounds=1)
 
 
+@pytest.mark.parametrize(
+    "word2vec_path",
+    [
+        pytest.param(
+            DOWNLOADED_TEST_DATA / "cc.de.300.vec", id="cc.de.300.vec (2M / 300)"
+        )
+    ],
+)
+def test_simple_parser_word2vec_text_benchmark(word2vec_path, benchmark):
+    """Test benchmarks for loading word2vec text Embeddings with the simple parser"""
+    benchmark.pedantic(
+        simple_load_embedding, args=(word2vec_path,), iterations=1, rounds=1
+    )
+
+
+@pytest.mark.parametrize(
+    "word2vec_path",
+    [
+        pytest.param(
+            DOWNLOADED_TEST_DATA / "cc.de.300.vec", id="cc.de.300.vec (2M / 300)"
+        )
+    ],
+)
+def test_parallel_parser_word2vec_text_benchmark(word2vec_path, benchmark):
+    """Test benchmarks for loading word2vec text Embeddings with the parallel parser"""
+    benchmark.pedantic(
+        load_embedding_parallel, args=(word2vec_path,), iterations=1, rounds=1
+    )
+
+
 @pytest.mark.parametrize(
     "word2vec_path",
     [
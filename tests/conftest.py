@@ -7,3 +7,11 @@ NLP Embedding Evaluation Tool
 :copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
 :license: MIT, see LICENSE for more details.
 """
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolate_cache_dir(tmp_path, monkeypatch):
+    """Use a temporary cache directory for every test"""
+    monkeypatch.setenv("EMBEDEVAL_CACHE_DIR", str(tmp_path / "cache"))
@@ -0,0 +1,55 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from embedeval.parsers.word2vec_simple import SimpleWordEmbedding
+
+
+@pytest.fixture(name="animals_embedding")
+def create_animals_embedding():
+    """Create a Word Embedding with animals and vehicles"""
+    return SimpleWordEmbedding(
+        Path("embedding.vec"),
+        ["cat", "dog", "tiger", "lion", "car", "bus"],
+        np.array(
+            [
+                [1.0, 0.1, 0.0],
+                [1.0, 0.3, 0.0],
+                [0.8, 0.0, 0.4],
+                [0.9, 0.0, 0.3],
+                [0.0, 1.0, 0.2],
+                [0.1, 1.0, 0.0],
+            ],
+            dtype=np.float32,
+        ),
+    )
+
+
+@pytest.fixture(name="royalty_embedding")
+def create_royalty_embedding():
+    """Create a Word Embedding with a gender and a royalty dimension"""
+    return SimpleWordEmbedding(
+        Path("embedding.vec"),
+        ["man", "woman", "king", "queen", "apple"],
+        np.array(
+            [
+                [1.0, 0.0, 0.0, 0.0],
+                [1.0, 1.0, 0.0, 0.0],
+                [1.0, 0.0, 1.0, 0.0],
+                [1.0, 1.0, 1.0, 0.0],
+                [0.0, 0.0, 0.0, 1.0],
+            ],
+            dtype=np.float32,
+        ),
+    )
@@ -0,0 +1,104 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import textwrap
+
+import pytest
+
+from embedeval.errors import EmbedevalError
+from embedeval.tasks.en_got_analogies import AnalogyTask, load_questions
+
+
+@pytest.fixture(name="questions_path")
+def create_questions_file(tmp_path):
+    questions_path = tmp_path / "questions.txt"
+    questions_path.write_text(
+        textwrap.dedent(
+            """
+            : royalty
+            man woman king queen
+            woman man queen king
+            man woman foo bar
+            : wrong
+            man king woman apple
+            """
+        )
+    )
+    return questions_path
+
+
+def test_should_load_questions_by_category(questions_path):
+    # WHEN
+    categories, questions, question_categories = load_questions(questions_path)
+
+    # THEN
+    assert categories == ["royalty", "wrong"]
+    assert questions.shape == (4, 4)
+    assert list(questions[0]) == ["man", "woman", "king", "queen"]
+    assert list(question_categories) == [0, 0, 0, 1]
+
+
+def test_should_fail_to_load_question_without_4_words(tmp_path):
+    # GIVEN
+    questions_path = tmp_path / "questions.txt"
+    questions_path.write_text(": category\nman woman king\n")
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="line 2 .* must have 4 words"):
+        # WHEN
+        load_questions(questions_path)
+
+
+@pytest.mark.parametrize("method", ["3CosAdd", "3CosMul"])
+def test_analogies_should_report_accuracy_per_category(
+    royalty_embedding, questions_path, method, mocker
+):
+    # GIVEN
+    mocker.patch.object(AnalogyTask, "QUESTIONS_PATH", questions_path)
+    mocker.patch.object(AnalogyTask, "METHOD", method)
+    mocker.patch.object(AnalogyTask, "BATCH_SIZE", 2)
+    task = AnalogyTask()
+
+    # WHEN
+    report = task.evaluate(royalty_embedding)
+
+    # THEN
+    assert report.outcome
+    assert report.metrics == {
+        "accuracy": pytest.approx(2 / 3),
+        "coverage": pytest.approx(3 / 4),
+        "royalty accuracy": 1.0,
+        "wrong accuracy": 0.0,
+    }
+    assert "royalty: 100.00% (2/2), 1 skipped" in report.body
+
+
+def test_analogies_should_fail_with_weak_accuracy(
+    royalty_embedding, questions_path, mocker
+):
+    # GIVEN
+    mocker.patch.object(AnalogyTask, "QUESTIONS_PATH", questions_path)
+    mocker.patch.object(AnalogyTask, "GOAL_ACCURACY", 0.9)
+    task = AnalogyTask()
+
+    # WHEN
+    report = task.evaluate(royalty_embedding)
+
+    # THEN
+    assert not report.outcome
+
+
+def test_should_load_bundled_questions():
+    # WHEN
+    categories, questions, _ = load_questions(AnalogyTask.QUESTIONS_PATH)
+
+    # THEN
+    assert categories == ["house-seat", "character-house", "father-son"]
+    assert len(questions) > 0
@@ -0,0 +1,89 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+
+import pytest
+
+from embedeval.errors import EmbedevalError
+from embedeval.tasks.en_got_odd_one_out_batched import OddOnesOutTask, load_groups
+
+
+@pytest.fixture(name="groups_path")
+def create_groups_file(tmp_path):
+    groups_path = tmp_path / "groups.txt"
+    groups_path.write_text(
+        "# the last word is the odd one out\n"
+        "cat dog tiger lion car\n"
+        "car bus cat\n"
+        "cat dog car lion\n"
+        "cat unknown dog car\n"
+        "cat dog unknown\n"
+        "cat unknown car\n"
+    )
+    return groups_path
+
+
+def test_should_load_padded_word_groups(groups_path):
+    # WHEN
+    groups, group_sizes = load_groups(groups_path)
+
+    # THEN
+    assert groups.shape == (6, 5)
+    assert list(groups[1]) == ["car", "bus", "cat", "", ""]
+    assert list(group_sizes) == [5, 3, 4, 4, 3, 3]
+
+
+def test_should_fail_to_load_group_with_less_than_3_words(tmp_path):
+    # GIVEN
+    groups_path = tmp_path / "groups.txt"
+    groups_path.write_text("cat dog\n")
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="line 1 .* at least 3 words"):
+        # WHEN
+        load_groups(groups_path)
+
+
+def test_odd_ones_out_should_mask_unknown_words(animals_embedding, groups_path, mocker):
+    # GIVEN
+    mocker.patch.object(OddOnesOutTask, "GROUPS_PATH", groups_path)
+    mocker.patch.object(OddOnesOutTask, "BATCH_SIZE", 4)
+    task = OddOnesOutTask()
+
+    # WHEN
+    report = task.evaluate(animals_embedding)
+
+    # THEN
+    assert report.outcome
+    assert report.metrics == {
+        "accuracy": pytest.approx(3 / 4),
+        "coverage": pytest.approx(4 / 6),
+    }
+    assert "(3/4, goal 50.00%)" in report.body
+
+
+def test_odd_ones_out_should_require_words_of_all_groups(groups_path, mocker):
+    # GIVEN
+    mocker.patch.object(OddOnesOutTask, "GROUPS_PATH", groups_path)
+
+    # WHEN
+    required_words = OddOnesOutTask().required_words()
+
+    # THEN
+    assert required_words == {"cat", "dog", "tiger", "lion", "car", "bus", "unknown"}
+
+
+def test_should_load_bundled_groups():
+    # WHEN
+    groups, group_sizes = load_groups(OddOnesOutTask.GROUPS_PATH)
+
+    # THEN
+    assert len(groups) > 1000
+    assert (group_sizes == 5).all()
@@ -16,7 +16,7 @@ def test_odd_one_out_should_fail_on_wrong_return_string():
     # GIVEN
     task = OddOneOutTask()
     embedding_mock = MagicMock(name="embedding")
-    embedding_mock.keyed_vectors.doesnt_match.return_value = "Wrong"
+    embedding_mock.doesnt_match.return_value = "Wrong"
 
     # WHEN
     report = task.evaluate(embedding_mock)
@@ -29,7 +29,7 @@ def test_odd_one_out_should_pass_when_riverrun_is_returned():
     # GIVEN
     task = OddOneOutTask()
     embedding_mock = MagicMock(name="embedding")
-    embedding_mock.keyed_vectors.doesnt_match.return_value = "Riverrun"
+    embedding_mock.doesnt_match.return_value = "Riverrun"
 
     # WHEN
     report = task.evaluate(embedding_mock)
@@ -8,8 +8,13 @@ NLP Embedding Evaluation Tool
 :license: MIT, see LICENSE for more details.
 """
 
+from pathlib import Path
+
+import numpy as np
 import pytest
 
+from embedeval.parsers.word2vec_simple import SimpleWordEmbedding
+from embedeval.encoder import encode_sequences
 from embedeval.tasks.de_offense_detection import OffenseDetectionTask
 
 
@@ -22,9 +27,11 @@ def create_offense_detection_task(mocker):
     """
     mocker.patch("embedeval.tasks.de_offense_detection.OffenseDetectionTask._load_dataset")
     mocker.patch(
-        "embedeval.tasks.de_offense_detection.OffenseDetectionTask._calculate_sentence_length"
+        "embedeval.tasks.de_offense_detection.OffenseDetectionTask._calculate_sentence_length",
+        return_value=3,
     )  # noqa
     mocker.patch("pandas.concat")
+    mocker.patch.object(OffenseDetectionTask, "MODE", "keras")
     create_cnn_model_mock = mocker.patch(
         "embedeval.tasks.de_offense_detection.OffenseDetectionTask._create_cnn_model"
     )
@@ -78,3 +85,117 @@ def test_offense_detection_should_fail_with_weak_performance(
 
     # then
     assert report.outcome is False
+
+
+def test_offense_detection_should_create_embedding_matrix_for_indexed_words(
+    mocker,
+):
+    # given
+    word_index = {"known": 1, "unknown": 2, "other": 3}
+    embedding_mock = mocker.MagicMock(name="word embedding")
+    embedding_mock.shape = (10, 2)
+    embedding_mock.get_word_vectors.return_value = (
+        np.array([[1.0, 2.0], [0.0, 0.0], [3.0, 4.0]]),
+        np.array([True, False, True]),
+    )
+
+    # when
+    embedding_matrix = OffenseDetectionTask._create_embedding_matrix(
+        None, embedding_mock, word_index
+    )
+
+    # then
+    embedding_mock.get_word_vectors.assert_called_once_with(word_index)
+    assert np.array_equal(
+        embedding_matrix,
+        np.array([[0.0, 0.0], [1.0, 2.0], [0.0, 0.0], [3.0, 4.0]]),
+    )
+
+
+def test_offense_detection_should_preprocess_datasets_only_once(mocker):
+    # given
+    preprocess_datasets_mock = mocker.patch(
+        "embedeval.tasks.de_offense_detection.OffenseDetectionTask._preprocess_datasets"
+    )
+    preprocess_datasets_mock.return_value = {
+        "word_index": {"foo": 1},
+        "corpus_sentence_length": 2,
+        "train_corpus": np.array([[1, 0]]),
+        "train_labels": np.array([1]),
+        "test_corpus": np.array([[0, 1]]),
+        "test_labels": np.array([0]),
+    }
+
+    # when
+    OffenseDetectionTask()
+    offense_detection_task = OffenseDetectionTask()
+
+    # then
+    preprocess_datasets_mock.assert_called_once_with()
+    assert offense_detection_task.corpus_sentence_length == 2
+    assert np.array_equal(offense_detection_task.test_corpus, np.array([[0, 1]]))
+
+
+@pytest.fixture(name="probe_task")
+def create_probe_task(mocker):
+    """Create an OffenseDetectionTask with Tweets about either good or bad words"""
+    mocker.patch(
+        "embedeval.tasks.de_offense_detection.OffenseDetectionTask._preprocess_datasets",
+        return_value={
+            "word_index": {"good": 1, "bad": 2, "the": 3, "unknown": 4},
+            "corpus_sentence_length": 3,
+            "train_corpus": encode_sequences([[1, 3], [2, 3, 4], [1, 1], [2]] * 5, 5),
+            "train_labels": np.array([0, 1, 0, 1] * 5),
+            "test_corpus": encode_sequences([[3, 2], [1, 4, 3], [2, 2, 1]], 5),
+            "test_labels": np.array([1, 0, 1]),
+        },
+    )
+    mocker.patch("embedeval.taskcache.TaskArtifactCache.load", return_value=None)
+    mocker.patch("embedeval.taskcache.TaskArtifactCache.save")
+    return OffenseDetectionTask()
+
+
+@pytest.fixture(name="embedding")
+def create_embedding():
+    return SimpleWordEmbedding(
+        Path("embedding.vec"),
+        ["good", "bad", "the"],
+        np.array([[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]], dtype=np.float32),
+    )
+
+
+@pytest.mark.parametrize("sentence_weighting", ["mean", "tfidf"])
+@pytest.mark.parametrize("probe_classifier", ["logistic", "ridge"])
+def test_offense_detection_probe_should_classify_sentence_vectors(
+    probe_task, embedding, sentence_weighting, probe_classifier, mocker
+):
+    # given
+    mocker.patch.object(OffenseDetectionTask, "SENTENCE_WEIGHTING", sentence_weighting)
+    mocker.patch.object(OffenseDetectionTask, "PROBE_CLASSIFIER", probe_classifier)
+
+    # when
+    report = probe_task.evaluate(embedding)
+
+    # then
+    assert report.outcome
+    assert report.metrics == {"accuracy": 1.0, "f1_score": 1.0}
+
+
+def test_offense_detection_should_tokenize_datasets_once(mocker):
+    # given
+    tokenize_corpus_mock = mocker.patch(
+        "embedeval.tasks.de_offense_detection.tokenize_corpus",
+        side_effect=[[["das", "ist", "gut"]], [["das", "das"], ["schlecht"]]],
+    )
+
+    # when
+    offense_detection_task = OffenseDetectionTask()
+
+    # then
+    assert tokenize_corpus_mock.call_count == 2
+    assert offense_detection_task.word_index == {"das": 1, "ist": 2, "gut": 3, "schlecht": 4}
+    assert offense_detection_task.corpus_sentence_length == 3
+    assert offense_detection_task.test_corpus.toarray().tolist() == [
+        [0, 2, 0, 0, 0],
+        [0, 0, 0, 0, 1],
+    ]
@@ -0,0 +1,124 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy.stats import spearmanr
+
+from embedeval.errors import EmbedevalError
+from embedeval.taskregistry import registry as task_registry
+from embedeval.tasks.word_similarity import WordSimilarityTask, load_pairs, spearman
+
+#: Holds the toy datasets with made up scores
+TOY_DATASETS_PATH = Path(__file__).parent / "data" / "word-similarity"
+
+
+@pytest.fixture(name="datasets_path")
+def create_datasets_dir(tmp_path):
+    (tmp_path / "animals.tsv").write_text(
+        "# word1\tword2\tscore\n"
+        "cat\tdog\t8.0\n"
+        "cat\ttiger\t7.0\n"
+        "cat\tcar\t1.0\n"
+        "dog\tunknown\t5.0\n"
+    )
+    (tmp_path / "unknown.tsv").write_text("foo\tbar\t1.0\n")
+    return tmp_path
+
+
+def test_should_load_word_pairs_with_scores(datasets_path):
+    # WHEN
+    pairs, scores = load_pairs(datasets_path / "animals.tsv")
+
+    # THEN
+    assert pairs.shape == (4, 2)
+    assert list(pairs[0]) == ["cat", "dog"]
+    assert list(scores) == [8.0, 7.0, 1.0, 5.0]
+
+
+def test_should_fail_to_load_word_pair_without_score(tmp_path):
+    # GIVEN
+    pairs_path = tmp_path / "pairs.tsv"
+    pairs_path.write_text("cat\tdog\n")
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="line 1 .* must have 3 tab separated"):
+        # WHEN
+        load_pairs(pairs_path)
+
+
+def test_should_calculate_spearman_with_tied_ranks():
+    # GIVEN
+    x = np.array([1.0, 2.0, 2.0, 3.0, 5.0])
+    y = np.array([2.0, 1.0, 4.0, 4.0, 3.0])
+
+    # WHEN
+    rho = spearman(x, y)
+
+    # THEN
+    assert rho == pytest.approx(spearmanr(x, y)[0])
+
+
+def test_word_similarity_should_report_correlation_per_dataset(
+    animals_embedding, datasets_path, mocker
+):
+    # GIVEN
+    mocker.patch.object(WordSimilarityTask, "DATASETS_PATH", datasets_path)
+    task = WordSimilarityTask()
+
+    # WHEN
+    report = task.evaluate(animals_embedding)
+
+    # THEN
+    assert report.outcome
+    assert report.metrics == {
+        "animals coverage": 0.75,
+        "animals spearman": pytest.approx(1.0),
+        "animals pearson": pytest.approx(0.9, abs=0.1),
+        "unknown coverage": 0.0,
+        "spearman": pytest.approx(1.0),
+    }
+    assert "unknown: -, coverage: 0.00%" in report.body
+
+
+def test_word_similarity_should_require_words_of_all_datasets(datasets_path, mocker):
+    # GIVEN
+    mocker.patch.object(WordSimilarityTask, "DATASETS_PATH", datasets_path)
+
+    # WHEN
+    required_words = WordSimilarityTask().required_words()
+
+    # THEN
+    assert required_words == {"cat", "dog", "tiger", "car", "unknown", "foo", "bar"}
+
+
+def test_word_similarity_should_require_datasets_path():
+    # THEN
+    with pytest.raises(EmbedevalError, match="must set the DATASETS_PATH"):
+        # WHEN
+        WordSimilarityTask()
+
+
+def test_word_similarity_should_not_be_registered():
+    # THEN
+    assert WordSimilarityTask not in task_registry.tasks.values()
+
+
+def test_should_load_toy_datasets(mocker):
+    # GIVEN
+    mocker.patch.object(WordSimilarityTask, "DATASETS_PATH", TOY_DATASETS_PATH)
+
+    # WHEN
+    task = WordSimilarityTask()
+
+    # THEN
+    assert sorted(task.datasets) == ["toy-got-relatedness", "toy-got-similarity"]
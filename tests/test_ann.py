@@ -0,0 +1,198 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from embedeval.ann import (
+    build_index,
+    get_index_path,
+    load_index,
+    measure_recall,
+    save_index,
+)
+from embedeval.errors import EmbedevalError
+from embedeval.parsers.word2vec_simple import SimpleWordEmbedding
+
+
+@pytest.fixture(name="embedding")
+def create_embedding(tmp_path):
+    """Create a Word Embedding with clustered word vectors"""
+    rng = np.random.RandomState(42)
+    centers = rng.normal(size=(10, 16))
+    vectors = centers[rng.randint(0, 10, size=500)] + 0.3 * rng.normal(size=(500, 16))
+    embedding_path = tmp_path / "embedding.vec"
+    embedding_path.write_text("500 16\n")
+    return SimpleWordEmbedding(
+        embedding_path, [f"word{i}" for i in range(500)], vectors.astype(np.float32)
+    )
+
+
+def test_should_build_index_with_every_word_in_one_cluster(embedding):
+    # GIVEN
+    engine = embedding.similarity_engine
+
+    # WHEN
+    index = build_index(engine.normalized_vectors, n_clusters=20)
+
+    # THEN
+    assert index.n_clusters == 20
+    assert sorted(index.list_rows) == list(range(500))
+    assert index.list_offsets[0] == 0
+    assert index.list_offsets[-1] == 500
+    assert np.all(np.diff(index.list_offsets) >= 0)
+
+
+def test_should_find_exact_neighbours_when_probing_all_clusters(embedding):
+    # GIVEN
+    engine = embedding.similarity_engine
+    engine.index = build_index(engine.normalized_vectors, n_clusters=20, n_probe=20)
+
+    # WHEN
+    approximate = embedding.most_similar_cosmul(
+        ["word1", "word2"], ["word3"], topn=5, approximate=True
+    )
+
+    # THEN
+    assert approximate == pytest.approx(
+        embedding.most_similar_cosmul(["word1", "word2"], ["word3"], topn=5)
+    )
+
+
+@pytest.mark.parametrize("n_subvectors", [0, 4])
+def test_should_measure_recall_of_approximate_search(embedding, n_subvectors):
+    # GIVEN
+    engine = embedding.similarity_engine
+    engine.index = build_index(
+        engine.normalized_vectors, n_clusters=10, n_subvectors=n_subvectors, n_probe=3
+    )
+
+    # WHEN
+    recall, _, _ = measure_recall(engine, n_queries=50, topn=5)
+
+    # THEN
+    assert recall > 0.9
+
+
+@pytest.mark.parametrize("n_subvectors", [0, 4])
+def test_should_only_find_neighbours_in_restricted_vocab(embedding, n_subvectors):
+    # GIVEN
+    engine = embedding.similarity_engine
+    engine.index = build_index(
+        engine.normalized_vectors, n_clusters=20, n_subvectors=n_subvectors, n_probe=20
+    )
+    restricted_embedding = embedding.restrict_vocab(100)
+
+    # WHEN
+    approximate = restricted_embedding.most_similar(["word1"], topn=5, approximate=True)
+
+    # THEN
+    assert restricted_embedding.similarity_engine.index is engine.index
+    assert approximate == pytest.approx(
+        restricted_embedding.most_similar(["word1"], topn=5)
+    )
+
+
+def test_should_fail_to_quantize_with_indivisible_subvectors(embedding):
+    # THEN
+    with pytest.raises(EmbedevalError, match="must be divisible"):
+        # WHEN
+        build_index(embedding.similarity_engine.normalized_vectors, n_subvectors=5)
+
+
+def test_should_search_exactly_without_index(embedding):
+    # WHEN
+    approximate = embedding.most_similar(["word1"], topn=5, approximate=True)
+
+    # THEN
+    assert approximate == embedding.most_similar(["word1"], topn=5)
+
+
+def test_should_save_and_load_index_next_to_embedding(embedding):
+    # GIVEN
+    index = build_index(
+        embedding.similarity_engine.normalized_vectors, n_clusters=10, n_subvectors=4
+    )
+
+    # WHEN
+    index_path = save_index(index, embedding.path, embedding.vocabulary)
+    loaded_index = load_index(embedding.path, embedding.vocabulary)
+
+    # THEN
+    assert index_path == get_index_path(embedding.path)
+    assert np.array_equal(loaded_index.centroids, index.centroids)
+    assert np.array_equal(loaded_index.list_rows, index.list_rows)
+    assert np.array_equal(loaded_index.codes, index.codes)
+    assert loaded_index.n_probe == index.n_probe
+
+
+def test_should_use_saved_index_for_approximate_search(embedding, mocker):
+    # GIVEN
+    save_index(
+        build_index(embedding.similarity_engine.normalized_vectors, n_clusters=10),
+        embedding.path,
+        embedding.vocabulary,
+    )
+    get_candidates_spy = mocker.spy(
+        type(embedding.similarity_engine.get_index()), "get_candidates"
+    )
+
+    # WHEN
+    embedding.most_similar(["word1"], topn=5, approximate=True)
+
+    # THEN
+    get_candidates_spy.assert_called_once()
+
+
+def test_should_ignore_outdated_index(embedding):
+    # GIVEN
+    save_index(
+        build_index(embedding.similarity_engine.normalized_vectors, n_clusters=10),
+        embedding.path,
+        embedding.vocabulary,
+    )
+    source_stat = embedding.path.stat()
+    os.utime(
+        str(embedding.path), ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns + 1)
+    )
+
+    # WHEN
+    index = load_index(embedding.path, embedding.vocabulary)
+
+    # THEN
+    assert index is None
+
+
+@pytest.mark.parametrize(
+    "words",
+    [
+        pytest.param([f"word{i}" for i in range(400)], id="fewer rows"),
+        pytest.param([f"word{i + 1}" for i in range(500)], id="other words"),
+    ],
+)
+def test_should_search_exactly_if_index_was_built_for_other_words(embedding, words):
+    # GIVEN
+    save_index(
+        build_index(embedding.similarity_engine.normalized_vectors, n_clusters=10),
+        embedding.path,
+        embedding.vocabulary,
+    )
+    other_embedding = SimpleWordEmbedding(
+        embedding.path, words, embedding.vectors[: len(words)]
+    )
+
+    # WHEN
+    most_similar = other_embedding.most_similar(["word1"], topn=5, approximate=True)
+
+    # THEN
+    assert other_embedding.similarity_engine.get_index() is None
+    assert most_similar == other_embedding.most_similar(["word1"], topn=5)
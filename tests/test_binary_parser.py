@@ -0,0 +1,112 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import gzip
+
+import numpy as np
+import pytest
+from gensim.models import KeyedVectors
+
+from embedeval.errors import EmbedevalError
+from embedeval.parsers.word2vec_binary import FASTTEXT_MAGIC, load_embedding
+
+WORDS = ["word1", "wörd2", "a", "longer-word4"]
+VECTORS = np.arange(12, dtype=np.float32).reshape(4, 3) / 4
+
+
+def write_word2vec_binary(path, words, vectors, separator=b"\n"):
+    """Write the given words and vectors in the word2vec binary format"""
+    with path.open("wb") as word2vec_file:
+        word2vec_file.write(f"{len(words)} {vectors.shape[1]}\n".encode("ascii"))
+        for word, vector in zip(words, vectors):
+            word2vec_file.write(word.encode("utf-8") + b" ")
+            word2vec_file.write(vector.astype("<f4").tobytes() + separator)
+
+
+@pytest.fixture(name="word2vec_path")
+def create_word2vec_file(tmp_path):
+    """Create a word2vec binary Embedding file"""
+    word2vec_path = tmp_path / "embedding.bin"
+    write_word2vec_binary(word2vec_path, WORDS, VECTORS)
+    yield word2vec_path
+
+
+@pytest.mark.parametrize("separator", [b"\n", b""])
+def test_should_load_word2vec_binary_embedding(tmp_path, separator):
+    # GIVEN
+    word2vec_path = tmp_path / "embedding.bin"
+    write_word2vec_binary(word2vec_path, WORDS, VECTORS, separator)
+
+    # WHEN
+    embedding = load_embedding(word2vec_path)
+
+    # THEN
+    assert embedding.get_words() == WORDS
+    assert embedding.vectors.dtype == np.float32
+    assert np.array_equal(embedding.vectors, VECTORS)
+    assert np.array_equal(embedding.get_word_vector("wörd2"), VECTORS[1])
+
+
+def test_should_load_gzip_compressed_word2vec_binary_embedding(word2vec_path):
+    # GIVEN
+    compressed_path = word2vec_path.with_suffix(".bin.gz")
+    compressed_path.write_bytes(gzip.compress(word2vec_path.read_bytes()))
+
+    # WHEN
+    embedding = load_embedding(compressed_path, max_words=3)
+
+    # THEN
+    assert embedding.get_words() == WORDS[:3]
+    assert np.array_equal(embedding.vectors, VECTORS[:3])
+
+
+def test_should_load_same_embedding_as_gensim(word2vec_path):
+    # GIVEN
+    keyed_vectors = KeyedVectors.load_word2vec_format(word2vec_path, binary=True)
+
+    # WHEN
+    embedding = load_embedding(word2vec_path)
+
+    # THEN
+    assert np.array_equal(embedding.vectors, keyed_vectors.vectors)
+
+
+def test_should_only_load_required_and_first_words(word2vec_path):
+    # WHEN
+    embedding = load_embedding(
+        word2vec_path, required_words={"a", "word1", "longer-word4"}, max_words=3
+    )
+
+    # THEN
+    assert embedding.get_words() == ["word1", "a"]
+    assert np.array_equal(embedding.vectors, VECTORS[[0, 2]])
+
+
+def test_should_fail_if_word_size_from_header_is_not_matched(tmp_path):
+    # GIVEN
+    word2vec_path = tmp_path / "embedding.bin"
+    write_word2vec_binary(word2vec_path, WORDS, VECTORS)
+    word2vec_path.write_bytes(b"5 3" + word2vec_path.read_bytes()[3:])
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="word size 5 .* size of 4"):
+        # WHEN
+        load_embedding(word2vec_path)
+
+
+def test_should_fail_to_load_fasttext_model(tmp_path):
+    # GIVEN
+    fasttext_path = tmp_path / "cc.de.300.bin"
+    fasttext_path.write_bytes(FASTTEXT_MAGIC + bytes(12))
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="is a fastText model"):
+        # WHEN
+        load_embedding(fasttext_path)
@@ -8,6 +8,7 @@ NLP Embedding Evaluation Tool
 :license: MIT, see LICENSE for more details.
 """
 
+import gzip
 import logging
 from pathlib import Path
 
@@ -17,6 +18,8 @@ import pytest
 import embedeval
 from embedeval import __version__
 from embedeval.cli import cli, logger
+from embedeval.errors import EmbedevalError
+from embedeval.taskreport import TaskReport
 
 
 @pytest.fixture(name="existing_embed_file")
@@ -118,3 +121,403 @@ def test_cli_should_create_all_given_tasks(existing_embed_file, mocker):
     taskregistry_create_task_mock.assert_has_calls(
         [mocker.call("foo"), mocker.call("bar"), mocker.call("meh")]
     )
+
+
+def test_cli_should_convert_embedding_to_native_format(tmpdir):
+    # GIVEN
+    runner = CliRunner()
+    embed_filepath = tmpdir / "embed.vec"
+    embed_filepath.write("1 2\nword 1.0 2.0\n")
+
+    # WHEN
+    result = runner.invoke(cli, ["convert", str(embed_filepath)])
+
+    # THEN
+    assert result.exit_code == 0
+    assert (tmpdir / "embed.vec.embedeval" / "header.json").exists()
+
+
+def test_cli_should_convert_compressed_embedding_detected_by_content(tmpdir):
+    # GIVEN
+    runner = CliRunner()
+    embed_filepath = tmpdir / "embed.vec"
+    embed_filepath.write_binary(gzip.compress(b"1 2\nword 1.0 2.0\n"))
+
+    # WHEN
+    result = runner.invoke(cli, ["convert", str(embed_filepath)])
+
+    # THEN
+    assert result.exit_code == 0
+    assert (tmpdir / "embed.vec.embedeval" / "header.json").exists()
+
+
+def test_cli_should_load_glove_embedding_without_header(tmpdir, mocker):
+    # GIVEN
+    runner = CliRunner()
+    embed_filepath = tmpdir / "glove.txt"
+    embed_filepath.write("foo 1.0 2.0\nbar 2.0 1.0\n")
+    mocker.patch("embedeval.cli.load_tasks")
+    task_mock = mocker.MagicMock(name="task")
+    task_mock.required_words.return_value = None
+    mocker.patch("embedeval.cli.task_registry.create_task", return_value=task_mock)
+
+    # WHEN
+    result = runner.invoke(cli, [str(embed_filepath), "--task", "foo", "--no-cache"])
+
+    # THEN
+    assert result.exit_code == 0
+    embedding = task_mock.evaluate.call_args[0][0]
+    assert embedding.get_words() == ["foo", "bar"]
+
+
+def test_cli_should_convert_text_embedding_with_invalid_utf8_word(tmpdir):
+    # GIVEN
+    runner = CliRunner()
+    embed_filepath = tmpdir / "embed.vec"
+    embed_filepath.write_binary(b"2 2\nw\xe9rd 1.0 2.0\nword 3.0 4.0\n")
+
+    # WHEN
+    result = runner.invoke(cli, ["convert", str(embed_filepath)])
+
+    # THEN
+    assert result.exit_code == 0
+    assert (tmpdir / "embed.vec.embedeval" / "header.json").exists()
+
+
+def test_cli_should_build_index_and_report_recall(tmpdir):
+    # GIVEN
+    runner = CliRunner()
+    embed_filepath = tmpdir / "embed.vec"
+    embed_filepath.write("3 2\nfoo 1.0 2.0\nbar 2.0 1.0\nmeh 1.0 1.0\n")
+
+    # WHEN
+    result = runner.invoke(cli, ["index", str(embed_filepath), "--clusters", "2", "-k", "1"])
+
+    # THEN
+    assert result.exit_code == 0
+    assert (tmpdir / "embed.vec.ann.npz").exists()
+    assert "Recall@1 for 3 random words with 2 probed clusters: 100.00%" in result.output
+
+
+def test_cli_should_only_load_words_required_by_all_tasks(existing_embed_file, mocker):
+    # GIVEN
+    runner = CliRunner()
+    mocker.patch("embedeval.cli.load_tasks")
+    task_mock = mocker.MagicMock(name="task")
+    task_mock.required_words.side_effect = [{"foo", "bar"}, {"meh"}]
+    mocker.patch("embedeval.cli.task_registry.create_task", return_value=task_mock)
+    simple_load_embedding_mock = mocker.patch("embedeval.parsers.word2vec_simple.load_embedding")
+
+    # WHEN
+    runner.invoke(cli, [existing_embed_file, "--task", "foo", "--task", "bar"])
+
+    # THEN
+    simple_load_embedding_mock.assert_called_once_with(
+        Path(existing_embed_file),
+        required_words={"foo", "bar", "meh"},
+        max_words=None,
+        precision="float32",
+    )
+
+
+def test_cli_should_load_entire_embedding_if_a_task_requires_it(
+    existing_embed_file, mocker
+):
+    # GIVEN
+    runner = CliRunner()
+    mocker.patch("embedeval.cli.load_tasks")
+    task_mock = mocker.MagicMock(name="task")
+    task_mock.required_words.side_effect = [{"foo", "bar"}, None]
+    mocker.patch("embedeval.cli.task_registry.create_task", return_value=task_mock)
+    load_embedding_mock = mocker.patch("embedeval.parsers.word2vec_gensim.load_embedding")
+
+    # WHEN
+    runner.invoke(cli, [existing_embed_file, "--task", "foo", "--task", "bar"])
+
+    # THEN
+    load_embedding_mock.assert_called_once_with(
+        Path(existing_embed_file), max_words=None
+    )
+
+
+def test_cli_should_only_load_the_first_words_if_vocab_is_restricted(
+    existing_embed_file, mocker
+):
+    # GIVEN
+    runner = CliRunner()
+    mocker.patch("embedeval.cli.load_tasks")
+    task_mock = mocker.MagicMock(name="task")
+    task_mock.required_words.return_value = None
+    mocker.patch("embedeval.cli.task_registry.create_task", return_value=task_mock)
+    load_embedding_mock = mocker.patch("embedeval.parsers.word2vec_gensim.load_embedding")
+
+    # WHEN
+    runner.invoke(
+        cli, [existing_embed_file, "--task", "foo", "--restrict-vocab", "100"]
+    )
+
+    # THEN
+    load_embedding_mock.assert_called_once_with(
+        Path(existing_embed_file), max_words=100
+    )
+
+
+def test_cli_should_restrict_vocab_of_native_embedding(tmpdir, mocker):
+    # GIVEN
+    runner = CliRunner()
+    embed_filepath = tmpdir / "embed.vec"
+    embed_filepath.write("3 2\nfoo 1.0 2.0\nbar 2.0 1.0\nmeh 1.0 1.0\n")
+    runner.invoke(cli, ["convert", str(embed_filepath)])
+    mocker.patch("embedeval.cli.load_tasks")
+    mocker.patch("embedeval.cli.task_registry.create_task")
+    evaluate_tasks_mock = mocker.patch("embedeval.evaluator.evaluate_tasks")
+
+    # WHEN
+    runner.invoke(
+        cli, [str(embed_filepath), "--task", "foo", "--restrict-vocab", "2"]
+    )
+
+    # THEN
+    embedding = evaluate_tasks_mock.call_args.args[0]
+    assert embedding.get_words() == ["foo", "bar"]
+
+
+def test_cli_should_drop_raw_vectors_of_embedding(tmpdir, mocker):
+    # GIVEN
+    runner = CliRunner()
+    embed_filepath = tmpdir / "embed.vec"
+    embed_filepath.write("2 2\nfoo 3.0 4.0\nbar 0.0 2.0\n")
+    mocker.patch("embedeval.cli.load_tasks")
+    task_mock = mocker.MagicMock(name="task")
+    task_mock.required_words.return_value = {"foo", "bar"}
+    mocker.patch("embedeval.cli.task_registry.create_task", return_value=task_mock)
+    evaluate_tasks_mock = mocker.patch("embedeval.evaluator.evaluate_tasks")
+
+    # WHEN
+    runner.invoke(cli, [str(embed_filepath), "--task", "foo", "--drop-raw-vectors"])
+
+    # THEN
+    embedding = evaluate_tasks_mock.call_args.args[0]
+    assert embedding.get_word_vector("foo") == pytest.approx([0.6, 0.8])
+    assert list(embedding.vector_norms) == [5.0, 2.0]
+
+
+def test_cli_should_report_shift_of_task_metrics_in_reduced_precision(tmpdir, mocker):
+    # GIVEN
+    runner = CliRunner()
+    embed_filepath = tmpdir / "embed.vec"
+    embed_filepath.write("2 2\nfoo 3.0 4.0\nbar 0.0 2.0\n")
+    mocker.patch("embedeval.cli.load_tasks")
+    task_mock = mocker.MagicMock(name="task")
+    task_mock.NAME = "task"
+    task_mock.required_words.return_value = {"foo", "bar"}
+    mocker.patch("embedeval.cli.task_registry.create_task", return_value=task_mock)
+    evaluate_tasks_mock = mocker.patch(
+        "embedeval.evaluator.evaluate_tasks",
+        side_effect=[
+            [TaskReport("task", outcome=True, metrics={"accuracy": 0.5})],
+            [TaskReport("task", outcome=True, metrics={"accuracy": 0.25})],
+        ],
+    )
+
+    # WHEN
+    result = runner.invoke(
+        cli,
+        [
+            str(embed_filepath),
+            "--task",
+            "task",
+            "--precision",
+            "int8",
+            "--precision-shift",
+        ],
+    )
+
+    # THEN
+    assert result.exit_code == 0
+    assert evaluate_tasks_mock.call_args.args[0].precision == "int8"
+    assert "Shift of int8 compared with float32" in result.output
+    assert "-0.2500" in result.output
+
+
+def test_cli_should_quantize_embedding_while_parsing_it(tmpdir, mocker):
+    # GIVEN
+    runner = CliRunner()
+    embed_filepath = tmpdir / "embed.vec"
+    embed_filepath.write("2 2\nfoo 3.0 4.0\nbar 0.0 2.0\n")
+    mocker.patch("embedeval.cli.load_tasks")
+    task_mock = mocker.MagicMock(name="task")
+    task_mock.required_words.return_value = None
+    mocker.patch("embedeval.cli.task_registry.create_task", return_value=task_mock)
+    quantize_embedding_mock = mocker.patch(
+        "embedeval.quantization.quantize_embedding"
+    )
+
+    # WHEN
+    result = runner.invoke(
+        cli, [str(embed_filepath), "--task", "foo", "--precision", "float16"]
+    )
+
+    # THEN
+    assert result.exit_code == 0
+    quantize_embedding_mock.assert_not_called()
+    embedding = task_mock.evaluate.call_args[0][0]
+    assert embedding.precision == "float16"
+    assert embedding.get_words() == ["foo", "bar"]
+
+
+def test_cli_should_fail_to_report_precision_shift_in_float32(existing_embed_file):
+    # GIVEN
+    runner = CliRunner()
+
+    # WHEN
+    result = runner.invoke(cli, [existing_embed_file, "--precision-shift"])
+
+    # THEN
+    assert result.exit_code == 2
+    assert "--precision-shift requires a reduced --precision" in result.output
+
+
+def test_cli_should_evaluate_tasks_with_given_jobs(existing_embed_file, mocker):
+    # GIVEN
+    runner = CliRunner()
+    mocker.patch("embedeval.cli.load_tasks")
+    mocker.patch("embedeval.cli.task_registry.create_task")
+    mocker.patch("embedeval.parsers.word2vec_gensim.load_embedding")
+    evaluate_tasks_mock = mocker.patch("embedeval.evaluator.evaluate_tasks")
+
+    # WHEN
+    runner.invoke(
+        cli, [existing_embed_file, "--task", "foo", "--jobs", "4", "--processes"]
+    )
+
+    # THEN
+    evaluate_tasks_mock.assert_called_once_with(
+        mocker.ANY, mocker.ANY, jobs=4, use_processes=True
+    )
+
+
+@pytest.mark.parametrize("embedding_jobs", ["1", "2"])
+def test_cli_should_evaluate_tasks_created_once_on_all_given_embeddings(
+    embedding_jobs, tmpdir, mocker
+):
+    # GIVEN
+    runner = CliRunner()
+    for name in ["first.vec", "second.vec", "other.txt"]:
+        (tmpdir / name).write("0 0")
+    mocker.patch("embedeval.cli.load_tasks")
+    taskregistry_create_task_mock = mocker.patch(
+        "embedeval.cli.task_registry.create_task"
+    )
+    taskregistry_create_task_mock.return_value.NAME = "foo"
+    taskregistry_create_task_mock.return_value.required_words.return_value = None
+    load_embedding_mock = mocker.patch("embedeval.parsers.word2vec_gensim.load_embedding")
+    evaluate_tasks_mock = mocker.patch("embedeval.evaluator.evaluate_tasks")
+    evaluate_tasks_mock.return_value = [TaskReport("foo", outcome=True)]
+
+    # WHEN
+    result = runner.invoke(
+        cli,
+        [
+            str(tmpdir / "*.vec"),
+            str(tmpdir / "other.txt"),
+            "--task",
+            "foo",
+            "--embedding-jobs",
+            embedding_jobs,
+        ],
+    )
+
+    # THEN
+    assert result.exit_code == 0
+    taskregistry_create_task_mock.assert_called_once_with("foo")
+    assert sorted(c.args[0].name for c in load_embedding_mock.call_args_list) == [
+        "first.vec",
+        "other.txt",
+        "second.vec",
+    ]
+    assert evaluate_tasks_mock.call_count == 3
+    assert "Comparison of all Embeddings" in result.output
+
+
+@pytest.fixture(name="embed_files")
+def create_embed_files(tmpdir, mocker):
+    """Create two Embedding files and a mocked Task for them"""
+    for name in ["first.vec", "second.vec"]:
+        (tmpdir / name).write("0 0")
+    mocker.patch("embedeval.cli.load_tasks")
+    task_mock = mocker.MagicMock(name="task")
+    task_mock.NAME = "foo"
+    task_mock.required_words.return_value = None
+    mocker.patch("embedeval.cli.task_registry.create_task", return_value=task_mock)
+    yield str(tmpdir / "*.vec")
+
+
+@pytest.mark.parametrize("embedding_jobs", ["1", "2"])
+def test_cli_should_evaluate_other_embeddings_if_loading_one_fails_unexpectedly(
+    embedding_jobs, embed_files, mocker
+):
+    # GIVEN
+    runner = CliRunner()
+
+    def load_embedding(path, max_words):
+        if path.name == "first.vec":
+            raise ValueError("broken")
+        return mocker.MagicMock(name="embedding")
+
+    mocker.patch(
+        "embedeval.parsers.word2vec_gensim.load_embedding", side_effect=load_embedding
+    )
+    evaluate_tasks_mock = mocker.patch(
+        "embedeval.evaluator.evaluate_tasks",
+        return_value=[TaskReport("foo", outcome=True)],
+    )
+
+    # WHEN
+    result = runner.invoke(
+        cli, [embed_files, "--task", "foo", "--embedding-jobs", embedding_jobs]
+    )
+
+    # THEN
+    assert result.exit_code == 1
+    assert "ValueError: broken" in result.output
+    evaluate_tasks_mock.assert_called_once()
+    assert "Comparison of all Embeddings" in result.output
+
+
+def test_cli_should_evaluate_other_embeddings_if_sharing_one_fails(
+    embed_files, mocker
+):
+    # GIVEN
+    runner = CliRunner()
+    mocker.patch("embedeval.parsers.word2vec_gensim.load_embedding")
+
+    def evaluate_tasks(embedding, tasks, jobs, use_processes):
+        if evaluate_tasks_mock.call_count == 1:
+            raise EmbedevalError("Unable to share the Embedding")
+        yield TaskReport("foo", outcome=True)
+
+    evaluate_tasks_mock = mocker.patch(
+        "embedeval.evaluator.evaluate_tasks", side_effect=evaluate_tasks
+    )
+
+    # WHEN
+    result = runner.invoke(cli, [embed_files, "--task", "foo", "-j", "2", "--processes"])
+
+    # THEN
+    assert result.exit_code == 1
+    assert "Unable to share the Embedding" in result.output
+    assert evaluate_tasks_mock.call_count == 2
+    assert "Comparison of all Embeddings" in result.output
+
+
+def test_cli_should_fail_if_embedding_glob_does_not_match(tmpdir):
+    # GIVEN
+    runner = CliRunner()
+
+    # WHEN
+    result = runner.invoke(cli, [str(tmpdir / "*.vec"), "--task", "foo"])
+
+    # THEN
+    assert result.exit_code != 0
+    assert "No Embedding file matches" in result.output
@@ -0,0 +1,127 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from embedeval.compression import (
+    detect_compression,
+    is_binary_embedding,
+    open_embedding,
+    open_embedding_text,
+)
+
+CONTENT = "3 2\nwörd 1.0 2.0\n".encode("utf-8") * 1000
+
+COMPRESSORS = [
+    ("gzip", gzip.compress),
+    ("bzip2", bz2.compress),
+    ("xz", lzma.compress),
+]
+
+
+@pytest.mark.parametrize("compression, compress", COMPRESSORS)
+def test_should_detect_compression_by_magic_bytes(tmp_path, compression, compress):
+    # GIVEN
+    embedding_path = tmp_path / "embedding.vec"
+    embedding_path.write_bytes(compress(CONTENT))
+
+    # THEN
+    assert detect_compression(embedding_path) == compression
+
+
+def test_should_not_detect_compression_of_plain_file(tmp_path):
+    # GIVEN
+    embedding_path = tmp_path / "embedding.vec.gz"
+    embedding_path.write_bytes(CONTENT)
+
+    # THEN
+    assert detect_compression(embedding_path) is None
+
+
+@pytest.mark.parametrize("compression, compress", COMPRESSORS)
+def test_should_read_decompressed_bytes_ahead_in_chunks(
+    tmp_path, compression, compress
+):
+    # GIVEN
+    embedding_path = tmp_path / "embedding.vec"
+    embedding_path.write_bytes(compress(CONTENT))
+
+    # WHEN
+    with open_embedding(embedding_path, read_ahead_size=1000) as embedding_file:
+        content = embedding_file.read()
+
+    # THEN
+    assert content == CONTENT
+
+
+def test_should_read_decompressed_text_lines(tmp_path):
+    # GIVEN
+    embedding_path = tmp_path / "embedding.vec.gz"
+    embedding_path.write_bytes(gzip.compress(CONTENT))
+
+    # WHEN
+    with open_embedding_text(embedding_path) as embedding_file:
+        lines = [embedding_file.readline() for _ in range(2)]
+
+    # THEN
+    assert lines == ["3 2\n", "wörd 1.0 2.0\n"]
+
+
+def test_should_close_before_reading_all_chunks(tmp_path):
+    # GIVEN
+    embedding_path = tmp_path / "embedding.vec.gz"
+    embedding_path.write_bytes(gzip.compress(CONTENT))
+
+    # WHEN
+    embedding_file = open_embedding(embedding_path, read_ahead_size=10)
+    embedding_file.read(5)
+    embedding_file.close()
+
+    # THEN
+    assert embedding_file.closed
+
+
+@pytest.mark.parametrize(
+    "content, expected_binary",
+    [
+        (CONTENT, False),
+        (b"1 2\nw\xe9rd 1.0 -2e-3\n", False),
+        (b"1 2\nword \x00\x00\x80?\x00\x00\x00@", True),
+        (b"1 2\nw\xe9rd \xcd\xcc\xcc=\x00\x00\x00@", True),
+        (b"word 1.0 2.0\n", False),
+        (b"\xba\x16O/\x0c\x00\x00\x00", True),
+    ],
+)
+def test_should_sniff_binary_embedding(tmp_path, content, expected_binary):
+    # GIVEN
+    embedding_path = tmp_path / "embedding"
+    embedding_path.write_bytes(gzip.compress(content))
+
+    # THEN
+    assert is_binary_embedding(embedding_path) is expected_binary
+
+
+def test_should_read_zstd_compressed_embedding(tmp_path):
+    # GIVEN
+    zstandard = pytest.importorskip("zstandard")
+    embedding_path = tmp_path / "embedding.vec.zst"
+    embedding_path.write_bytes(zstandard.ZstdCompressor().compress(CONTENT))
+
+    # WHEN
+    with open_embedding(embedding_path) as embedding_file:
+        content = embedding_file.read()
+
+    # THEN
+    assert detect_compression(embedding_path) == "zstd"
+    assert content == CONTENT
@@ -0,0 +1,103 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from embedeval.encoder import (
+    calculate_inverse_document_frequencies,
+    create_embedding_matrix,
+    create_sentence_vectors,
+    encode_corpus,
+    encode_sequences,
+    get_sequence_lengths,
+    to_padded_sequences,
+)
+from embedeval.parsers.word2vec_simple import SimpleWordEmbedding
+
+
+@pytest.fixture(name="token_matrix")
+def create_token_matrix():
+    return encode_sequences([[2, 1, 2], [], [3, 1, 2, 1, 3]], vocab_size=4)
+
+
+def test_should_encode_sequences_in_order_without_padding(token_matrix):
+    # THEN
+    assert token_matrix.shape == (3, 4)
+    assert list(get_sequence_lengths(token_matrix)) == [3, 0, 5]
+    assert list(token_matrix.indices) == [2, 1, 2, 3, 1, 2, 1, 3]
+    assert token_matrix.toarray().tolist() == [[0, 1, 2, 0], [0, 0, 0, 0], [0, 2, 1, 2]]
+
+
+def test_should_encode_tokenized_corpus_without_unknown_words():
+    # WHEN
+    token_matrix = encode_corpus(
+        [["a", "b", "unknown", "a"], ["b"]], word_index={"a": 1, "b": 2}
+    )
+
+    # THEN
+    assert token_matrix.shape == (2, 3)
+    assert list(token_matrix.indices) == [1, 2, 1, 2]
+
+
+@pytest.mark.parametrize(
+    "length, expected_sequences",
+    [
+        pytest.param(None, [[2, 1, 2, 0, 0], [0] * 5, [3, 1, 2, 1, 3]], id="longest"),
+        pytest.param(4, [[2, 1, 2, 0], [0] * 4, [1, 2, 1, 3]], id="truncated"),
+    ],
+)
+def test_should_pad_sequences_like_keras(token_matrix, length, expected_sequences):
+    # WHEN
+    padded_sequences = to_padded_sequences(token_matrix, length)
+
+    # THEN
+    assert padded_sequences.tolist() == expected_sequences
+
+
+def test_should_count_every_word_once_per_document_for_idf(token_matrix):
+    # WHEN
+    idf = calculate_inverse_document_frequencies(token_matrix)
+
+    # THEN
+    assert np.allclose(idf, np.log(4 / np.array([1, 3, 3, 2])) + 1)
+
+
+def test_should_create_embedding_matrix_of_known_words():
+    # GIVEN
+    embedding = SimpleWordEmbedding(
+        Path("embedding.vec"),
+        ["a", "c"],
+        np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32),
+    )
+
+    # WHEN
+    embedding_matrix, known_rows = create_embedding_matrix(
+        embedding, {"a": 1, "b": 2, "c": 3}
+    )
+
+    # THEN
+    assert embedding_matrix.tolist() == [[0, 0], [1, 2], [0, 0], [3, 4]]
+    assert known_rows.tolist() == [False, True, False, True]
+
+
+def test_should_create_weighted_mean_sentence_vectors(token_matrix):
+    # GIVEN
+    embedding_matrix = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [0.0, 0.0]])
+
+    # WHEN
+    sentence_vectors = create_sentence_vectors(
+        token_matrix, embedding_matrix, np.array([0.0, 1.0, 1.0, 0.0])
+    )
+
+    # THEN
+    assert np.allclose(sentence_vectors, [[1 / 3, 2 / 3], [0.0, 0.0], [2 / 3, 1 / 3]])
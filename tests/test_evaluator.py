@@ -0,0 +1,129 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+from embedeval.errors import EmbedevalError
+from embedeval import evaluator
+from embedeval.evaluator import evaluate_tasks
+from embedeval.parsers.word2vec_simple import SimpleWordEmbedding
+from embedeval.quantization import QuantizedWordEmbedding, quantize_embedding
+from embedeval.taskregistry import load_module
+from embedeval.taskreport import TaskReport
+
+
+@pytest.fixture(name="embedding")
+def create_embedding(tmp_path):
+    """Create a small in-memory Word Embedding"""
+    yield SimpleWordEmbedding(
+        tmp_path / "embedding.vec",
+        ["word1", "word2"],
+        np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32),
+    )
+
+
+@pytest.fixture(name="vector_sum_task_cls")
+def create_vector_sum_task_module(tmp_path):
+    """Create and load a Task module which reports the sum of a word vector"""
+    module_path = tmp_path / "vector_sum_task.py"
+    module_path.write_text(
+        textwrap.dedent(
+            '''
+            from embedeval.task import Task, TaskReport
+
+
+            class VectorSumTask(Task):
+                NAME = "vector-sum"
+
+                def __init__(self, word=None):
+                    self.word = word
+
+                def evaluate(self, embedding):
+                    if self.word is None:
+                        raise ValueError("no word")
+                    vector_sum = float(embedding.get_word_vector(self.word).sum())
+                    return TaskReport(self.NAME, outcome=True, body=str(vector_sum))
+            '''
+        )
+    )
+    load_module(module_path)
+    yield sys.modules["vector_sum_task"].VectorSumTask
+    del sys.modules["vector_sum_task"]
+
+
+@pytest.mark.parametrize(
+    "jobs, use_processes",
+    [
+        pytest.param(1, False, id="sequential"),
+        pytest.param(2, False, id="threads"),
+        pytest.param(2, True, id="processes"),
+    ],
+)
+def test_should_evaluate_tasks_in_given_order(
+    jobs, use_processes, embedding, vector_sum_task_cls
+):
+    # GIVEN
+    tasks = [
+        vector_sum_task_cls("word2"),
+        vector_sum_task_cls(),
+        vector_sum_task_cls("word1"),
+    ]
+
+    # WHEN
+    results = list(
+        evaluate_tasks(embedding, tasks, jobs=jobs, use_processes=use_processes)
+    )
+
+    # THEN
+    assert results[0] == TaskReport("vector-sum", outcome=True, body="7.0")
+    assert isinstance(results[1], ValueError)
+    assert results[2] == TaskReport("vector-sum", outcome=True, body="3.0")
+
+
+def test_should_fail_if_embedding_cannot_be_shared_with_processes(
+    embedding, vector_sum_task_cls, mocker
+):
+    # GIVEN
+    mocker.patch(
+        "embedeval.evaluator.get_vocabulary", side_effect=MemoryError("no memory")
+    )
+    tasks = [vector_sum_task_cls("word1"), vector_sum_task_cls("word2")]
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="Unable to share .* no memory"):
+        # WHEN
+        list(evaluate_tasks(embedding, tasks, jobs=2, use_processes=True))
+
+
+@pytest.mark.parametrize("precision", ["float16", "int8"])
+def test_should_share_quantized_embedding_with_processes(
+    precision, embedding, tmp_path, mocker
+):
+    # GIVEN
+    mocker.patch.object(evaluator, "_worker_embedding", None)
+    quantized_embedding = quantize_embedding(embedding, precision)
+
+    # WHEN
+    shared_embedding = evaluator._share_embedding(quantized_embedding, tmp_path)
+    evaluator._init_worker(shared_embedding, [])
+
+    # THEN
+    worker_embedding = evaluator._worker_embedding
+    assert isinstance(worker_embedding, QuantizedWordEmbedding)
+    assert worker_embedding.precision == precision
+    assert isinstance(worker_embedding.normalized_vectors.codes, np.memmap)
+    np.testing.assert_array_equal(
+        worker_embedding.get_word_vector("word2"),
+        quantized_embedding.get_word_vector("word2"),
+    )
@@ -0,0 +1,110 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import gzip
+
+import numpy as np
+import pytest
+
+from embedeval.errors import EmbedevalError
+from embedeval.parsers.glove import is_glove_embedding, load_embedding
+
+WORDS = [f"wörd{i}" for i in range(3000)]
+VECTORS = np.arange(3 * len(WORDS), dtype=np.float32).reshape(-1, 3) / 4
+
+
+@pytest.fixture(name="glove_path")
+def create_glove_file(tmp_path):
+    """Create a GloVe Embedding file with more words than initially allocated"""
+    glove_path = tmp_path / "glove.txt"
+    glove_path.write_text(
+        "".join(
+            f"{word} {' '.join(str(x) for x in vector)}\n"
+            for word, vector in zip(WORDS, VECTORS)
+        ),
+        encoding="utf-8",
+    )
+    yield glove_path
+
+
+def test_should_load_glove_embedding_with_inferred_vector_size(glove_path):
+    # WHEN
+    embedding = load_embedding(glove_path, chunk_size=1000)
+
+    # THEN
+    assert embedding.shape == (len(WORDS), 3)
+    assert embedding.get_words() == WORDS
+    assert np.array_equal(embedding.vectors, VECTORS)
+    assert np.array_equal(embedding.get_word_vector("wörd42"), VECTORS[42])
+
+
+def test_should_only_load_required_and_first_words(glove_path):
+    # WHEN
+    embedding = load_embedding(
+        glove_path, required_words={"wörd1", "wörd7", "wörd2000"}, max_words=10
+    )
+
+    # THEN
+    assert embedding.get_words() == ["wörd1", "wörd7"]
+    assert np.array_equal(embedding.vectors, VECTORS[[1, 7]])
+
+
+def test_should_load_gzip_compressed_glove_embedding(glove_path):
+    # GIVEN
+    compressed_path = glove_path.with_suffix(".txt.gz")
+    compressed_path.write_bytes(gzip.compress(glove_path.read_bytes()))
+
+    # WHEN
+    embedding = load_embedding(compressed_path)
+
+    # THEN
+    assert np.array_equal(embedding.vectors, VECTORS)
+
+
+@pytest.mark.parametrize(
+    "first_line, expected_glove",
+    [
+        ("word 1.0 2.0\n", True),
+        ("word 1.0\n", True),
+        ("3 2\n", False),
+        ("", False),
+    ],
+)
+def test_should_detect_glove_embedding_without_header(
+    tmp_path, first_line, expected_glove
+):
+    # GIVEN
+    embedding_path = tmp_path / "embedding.txt"
+    embedding_path.write_text(first_line, encoding="utf-8")
+
+    # THEN
+    assert is_glove_embedding(embedding_path) is expected_glove
+
+
+def test_should_fail_if_word_vector_size_of_first_line_is_not_matched(tmp_path):
+    # GIVEN
+    glove_path = tmp_path / "glove.txt"
+    glove_path.write_text("word1 1.0 2.0\nword2 3.0\n", encoding="utf-8")
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="wasn't matched on line 2 with a size of 1"):
+        # WHEN
+        load_embedding(glove_path)
+
+
+def test_should_fail_for_empty_glove_embedding(tmp_path):
+    # GIVEN
+    glove_path = tmp_path / "glove.txt"
+    glove_path.write_text("word1\n", encoding="utf-8")
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="has no word vector"):
+        # WHEN
+        load_embedding(glove_path)
@@ -0,0 +1,100 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from embedeval.errors import EmbedevalError
+from embedeval.parsers import native
+from embedeval.parsers.word2vec_simple import load_embedding as simple_load_embedding
+
+
+@pytest.fixture(name="word2vec_path")
+def create_word2vec_file(tmp_path):
+    """Create a word2vec text Embedding file"""
+    word2vec_path = tmp_path / "embedding.vec"
+    word2vec_path.write_text(
+        "3 2\nword1 1.0 2.0\nword2 3.0 4.0\nwörd3 5.0 6.0\n", encoding="utf-8"
+    )
+    yield word2vec_path
+
+
+def test_should_load_saved_native_embedding_memory_mapped(word2vec_path):
+    # GIVEN
+    embedding = simple_load_embedding(word2vec_path)
+
+    # WHEN
+    cache_path = native.save_embedding(embedding, word2vec_path)
+    native_embedding = native.load_embedding(word2vec_path)
+
+    # THEN
+    assert cache_path == word2vec_path.with_name("embedding.vec.embedeval")
+    assert isinstance(native_embedding.vectors, np.memmap)
+    assert native_embedding.path == word2vec_path
+    assert native_embedding.shape == (3, 2)
+    assert native_embedding.get_words() == ["word1", "word2", "wörd3"]
+    assert np.array_equal(native_embedding.vectors, embedding.vectors)
+    assert np.array_equal(native_embedding.get_word_vector("wörd3"), [5.0, 6.0])
+
+
+def test_should_record_shape_dtype_and_source_stats_in_native_header(word2vec_path):
+    # GIVEN
+    embedding = simple_load_embedding(word2vec_path)
+
+    # WHEN
+    cache_path = native.save_embedding(embedding, word2vec_path)
+
+    # THEN
+    header = json.loads((cache_path / native.HEADER_FILENAME).read_text())
+    assert header["shape"] == [3, 2]
+    assert header["dtype"] == "float32"
+    assert header["source"]["size"] == word2vec_path.stat().st_size
+    assert header["source"]["mtime_ns"] == word2vec_path.stat().st_mtime_ns
+
+
+def test_should_not_load_native_embedding_if_not_converted(word2vec_path):
+    # WHEN
+    native_embedding = native.load_embedding(word2vec_path)
+
+    # THEN
+    assert native_embedding is None
+
+
+def test_should_not_load_outdated_native_embedding(word2vec_path):
+    # GIVEN
+    native.save_embedding(simple_load_embedding(word2vec_path), word2vec_path)
+    source_stat = word2vec_path.stat()
+    os.utime(
+        str(word2vec_path),
+        ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns + 1_000_000_000),
+    )
+
+    # WHEN
+    native_embedding = native.load_embedding(word2vec_path)
+
+    # THEN
+    assert native_embedding is None
+
+
+def test_should_fail_to_load_native_embedding_with_truncated_vectors(word2vec_path):
+    # GIVEN
+    cache_path = native.save_embedding(
+        simple_load_embedding(word2vec_path), word2vec_path
+    )
+    vectors_path = cache_path / native.VECTORS_FILENAME
+    vectors_path.write_bytes(vectors_path.read_bytes()[:-4])
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="needs 24 bytes .* has 20 bytes"):
+        # WHEN
+        native.load_embedding(word2vec_path)
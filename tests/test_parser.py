@@ -8,14 +8,20 @@ NLP Embedding Evaluation Tool
 :license: MIT, see LICENSE for more details.
 """
 
+import functools
+import gzip
 import textwrap
 import uuid
 
 import numpy as np
 import pytest
 
+from embedeval.errors import EmbedevalError
 from embedeval.parsers.word2vec_gensim import load_embedding as gensim_load_embedding
 from embedeval.parsers.word2vec_simple import load_embedding as simple_load_embedding
+from embedeval.parsers.word2vec_simple import (
+    load_embedding_parallel as parallel_load_embedding,
+)
 
 
 def create_tmp_word_embedding(path, embedding_content):
@@ -31,6 +37,10 @@ def create_tmp_word_embedding(path, embedding_content):
     "load_embedding_func",
     [
         pytest.param(simple_load_embedding, id="simple parser"),
+        pytest.param(
+            functools.partial(parallel_load_embedding, workers=2),
+            id="parallel parser",
+        ),
         pytest.param(gensim_load_embedding, id="gensim parser"),
     ],
 )
@@ -57,6 +67,10 @@ def test_should_parse_word2vec_with_single_entry(load_embedding_func, tmp_path):
     "load_embedding_func",
     [
         pytest.param(simple_load_embedding, id="simple parser"),
+        pytest.param(
+            functools.partial(parallel_load_embedding, workers=2),
+            id="parallel parser",
+        ),
         pytest.param(gensim_load_embedding, id="gensim parser"),
     ],
 )
@@ -83,3 +97,272 @@ def test_should_parse_word2vec_with_multiple_entires(load_embedding_func, tmp_pa
     assert np.array_equal(embedding.get_word_vector("word2"), np.array([3.0, 4.0]))
     assert np.array_equal(embedding.get_word_vector("word3"), np.array([5.0, 6.0]))
     assert np.array_equal(embedding.get_word_vector("word4"), np.array([7.0, 8.0]))
+
+
+def test_simple_parser_should_parse_word_vectors_into_single_matrix(tmp_path):
+    """Loading a Word2Vec Embedding should create a single float32 matrix"""
+    # GIVEN
+    word2vec_path = create_tmp_word_embedding(
+        tmp_path,
+        """
+            3 2
+            word1 1.0 2.0
+            word2 3.0 4.0
+            word3 5.0 6.0
+        """,
+    )
+
+    # WHEN
+    embedding = simple_load_embedding(word2vec_path, chunk_size=1)
+
+    # THEN
+    assert embedding.shape == (3, 2)
+    assert embedding.vectors.dtype == np.float32
+    assert embedding.vectors.flags["C_CONTIGUOUS"]
+    assert np.array_equal(
+        embedding.vectors, np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    )
+    assert list(embedding.vocabulary.get_rows(["word1", "word2", "word3"])) == [0, 1, 2]
+
+
+@pytest.mark.parametrize(
+    "embedding_content, expected_error",
+    [
+        pytest.param(
+            """
+                2 2
+                word1 1.0 2.0
+                word2 3.0
+            """,
+            "wasn't matched on line 3 with a size of 1",
+            id="too few values",
+        ),
+        pytest.param(
+            """
+                2 2
+                word1 1.0 2.0 3.0
+                word2 3.0 4.0
+            """,
+            "wasn't matched on line 2 with a size of 3",
+            id="too many values",
+        ),
+        pytest.param(
+            """
+                2 2
+                word1 1.0 2.0
+                word2 3.0 foo
+            """,
+            "Unable to parse word vector on line 3",
+            id="invalid value",
+        ),
+        pytest.param(
+            """
+                3 2
+                word1 1.0 2.0
+                word2 3.0 4.0
+            """,
+            "Promised word size 3 from header wasn't matched with a size of 2",
+            id="too few words",
+        ),
+    ],
+)
+@pytest.mark.parametrize(
+    "load_embedding_func",
+    [
+        pytest.param(simple_load_embedding, id="simple parser"),
+        pytest.param(
+            functools.partial(parallel_load_embedding, workers=2),
+            id="parallel parser",
+        ),
+    ],
+)
+def test_simple_parser_should_fail_for_invalid_word_vectors(
+    load_embedding_func, embedding_content, expected_error, tmp_path
+):
+    """Loading an invalid Word2Vec Embedding should fail with the faulty line"""
+    # GIVEN
+    word2vec_path = create_tmp_word_embedding(tmp_path, embedding_content)
+
+    # THEN
+    with pytest.raises(EmbedevalError, match=expected_error):
+        # WHEN
+        load_embedding_func(word2vec_path, chunk_size=1)
+
+
+@pytest.mark.parametrize(
+    "load_embedding_func",
+    [
+        pytest.param(simple_load_embedding, id="simple parser"),
+        pytest.param(parallel_load_embedding, id="parallel parser"),
+    ],
+)
+def test_simple_parser_should_fail_for_values_shifted_between_lines_of_a_chunk(
+    load_embedding_func, tmp_path
+):
+    """Too few and too many values in the same chunk shouldn't make up for each other"""
+    # GIVEN
+    word2vec_path = create_tmp_word_embedding(
+        tmp_path,
+        """
+            2 3
+            w1 1 2
+            w2 3 4 5 6
+        """,
+    )
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="wasn't matched on line 2 with a size of 2"):
+        # WHEN
+        load_embedding_func(word2vec_path)
+
+
+def test_parallel_parser_should_parse_all_byte_ranges_in_order(tmp_path):
+    """Loading a Word2Vec Embedding in parallel should keep the order of the words"""
+    # GIVEN
+    word_vectors = np.arange(200, dtype=np.float32).reshape(100, 2)
+    word2vec_path = create_tmp_word_embedding(
+        tmp_path,
+        "100 2\n"
+        + "\n".join(f"word{i} {x} {y}" for i, (x, y) in enumerate(word_vectors)),
+    )
+
+    # WHEN
+    embedding = parallel_load_embedding(word2vec_path, workers=3, chunk_size=64)
+
+    # THEN
+    assert embedding.get_words() == [f"word{i}" for i in range(100)]
+    assert np.array_equal(embedding.vectors, word_vectors)
+
+
+def test_simple_parser_should_only_load_required_words(tmp_path):
+    """Loading a Word2Vec Embedding should only keep the required words"""
+    # GIVEN
+    word2vec_path = create_tmp_word_embedding(
+        tmp_path,
+        """
+            4 2
+            word1 1.0 2.0
+            word2 3.0 4.0
+            word3 5.0 6.0
+            word4 7.0 8.0
+        """,
+    )
+
+    # WHEN
+    embedding = simple_load_embedding(
+        word2vec_path, chunk_size=1, required_words={"word2", "word4", "unknown"}
+    )
+
+    # THEN
+    assert embedding.get_words() == ["word2", "word4"]
+    assert np.array_equal(embedding.vectors, np.array([[3.0, 4.0], [7.0, 8.0]]))
+
+
+def test_simple_parser_should_only_load_first_words(tmp_path):
+    """Loading a Word2Vec Embedding should stop after the first words"""
+    # GIVEN
+    word2vec_path = create_tmp_word_embedding(
+        tmp_path,
+        """
+            4 2
+            word1 1.0 2.0
+            word2 3.0 4.0
+            word3 5.0 6.0
+            word4 7.0
+        """,
+    )
+
+    # WHEN
+    embedding = simple_load_embedding(word2vec_path, chunk_size=1, max_words=2)
+
+    # THEN
+    assert embedding.get_words() == ["word1", "word2"]
+    assert np.array_equal(embedding.vectors, np.array([[1.0, 2.0], [3.0, 4.0]]))
+
+
+def test_simple_parser_should_parse_gzip_compressed_embedding(tmp_path):
+    """Loading a compressed Word2Vec Embedding should detect its compression"""
+    # GIVEN
+    word2vec_path = tmp_path / "embedding.vec.gz"
+    word2vec_path.write_bytes(gzip.compress("2 2\nwörd1 1.0 2.0\nword2 3.0 4.0\n".encode()))
+
+    # WHEN
+    embedding = simple_load_embedding(word2vec_path, required_words={"wörd1"})
+
+    # THEN
+    assert embedding.get_words() == ["wörd1"]
+    assert np.array_equal(embedding.vectors, np.array([[1.0, 2.0]]))
+
+
+@pytest.mark.parametrize(
+    "load_embedding_func",
+    [
+        pytest.param(
+            functools.partial(simple_load_embedding, required_words={"word2"}),
+            id="simple parser",
+        ),
+        pytest.param(parallel_load_embedding, id="parallel parser"),
+    ],
+)
+def test_simple_parser_should_ignore_invalid_utf8_bytes(load_embedding_func, tmp_path):
+    """Loading a Word2Vec Embedding should ignore invalid UTF-8 bytes like gensim"""
+    # GIVEN
+    word2vec_path = tmp_path / "embedding.vec"
+    word2vec_path.write_bytes(b"2 2\nw\xe9rd1 1.0 2.0\nword2 3.0 4.0\n")
+
+    # WHEN
+    embedding = load_embedding_func(word2vec_path)
+
+    # THEN
+    assert embedding.get_words()[-1] == "word2"
+    assert np.array_equal(embedding.get_word_vector("word2"), np.array([3.0, 4.0]))
+
+
+def test_simple_parser_should_report_line_of_invalid_required_word(tmp_path):
+    """Loading only the required words should fail with the faulty line"""
+    # GIVEN
+    word2vec_path = create_tmp_word_embedding(
+        tmp_path,
+        """
+            3 2
+            word1 1.0 2.0
+            word2 3.0 4.0
+            word3 5.0
+        """,
+    )
+
+    # THEN
+    with pytest.raises(EmbedevalError, match="on line 4 with a size of 1"):
+        # WHEN
+        simple_load_embedding(word2vec_path, required_words={"word1", "word3"})
+
+
+@pytest.mark.parametrize(
+    "load_embedding_func",
+    [
+        pytest.param(simple_load_embedding, id="simple parser"),
+        pytest.param(gensim_load_embedding, id="gensim parser"),
+    ],
+)
+def test_should_get_word_vectors_of_multiple_words(load_embedding_func, tmp_path):
+    """Getting multiple word vectors should mask the unknown words"""
+    # GIVEN
+    word2vec_path = create_tmp_word_embedding(
+        tmp_path,
+        """
+            3 2
+            word1 1.0 2.0
+            word2 3.0 4.0
+            word3 5.0 6.0
+        """,
+    )
+    embedding = load_embedding_func(word2vec_path)
+
+    # WHEN
+    word_vectors, found_mask = embedding.get_word_vectors(
+        ["word3", "unknown", "word1"]
+    )
+
+    # THEN
+    assert np.array_equal(word_vectors, np.array([[5.0, 6.0], [0.0, 0.0], [1.0, 2.0]]))
+    assert np.array_equal(found_mask, np.array([True, False, True]))
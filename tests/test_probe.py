@@ -0,0 +1,66 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import numpy as np
+import pytest
+
+from embedeval.errors import EmbedevalError
+from embedeval.probe import LinearProbe, accuracy_and_f1_score
+
+
+@pytest.fixture(name="dataset")
+def create_dataset():
+    """Create two Gaussian blobs with binary labels"""
+    rng = np.random.RandomState(42)
+    labels = rng.randint(0, 2, size=400)
+    features = rng.normal(size=(400, 5)) + 2.0 * labels[:, np.newaxis]
+    return features, labels
+
+
+@pytest.mark.parametrize("classifier", ["logistic", "ridge"])
+def test_probe_should_separate_linearly_separable_classes(dataset, classifier):
+    # GIVEN
+    features, labels = dataset
+
+    # WHEN
+    probe = LinearProbe(classifier).fit(features[:300], labels[:300])
+
+    # THEN
+    accuracy, _ = accuracy_and_f1_score(labels[300:], probe.predict(features[300:]))
+    assert accuracy > 0.95
+
+
+def test_probe_should_fit_logistic_regression_with_strong_regularization(dataset):
+    # GIVEN
+    features, labels = dataset
+
+    # WHEN
+    probe = LinearProbe("logistic", l2=1e9).fit(features, labels)
+
+    # THEN
+    assert np.allclose(probe.weights[:-1], 0.0, atol=1e-4)
+
+
+def test_probe_should_fail_for_unknown_classifier():
+    # THEN
+    with pytest.raises(EmbedevalError, match="Unknown classifier svm"):
+        # WHEN
+        LinearProbe("svm")
+
+
+def test_should_calculate_accuracy_and_f1_score_of_positive_class():
+    # WHEN
+    accuracy, f1_score = accuracy_and_f1_score(
+        np.array([1, 1, 0, 0, 1]), np.array([1, 0, 0, 1, 1])
+    )
+
+    # THEN
+    assert accuracy == pytest.approx(3 / 5)
+    assert f1_score == pytest.approx(2 / 3)
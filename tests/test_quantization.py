@@ -0,0 +1,176 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import gzip
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from embedeval.errors import EmbedevalError
+from embedeval.parsers import glove, word2vec_binary, word2vec_simple
+from embedeval.parsers.word2vec_simple import SimpleWordEmbedding
+from embedeval.quantization import (
+    QuantizedMatrix,
+    QuantizedVectorsBuilder,
+    quantize_embedding,
+)
+
+WORDS = [f"word{i}" for i in range(200)]
+
+
+@pytest.fixture(name="embedding")
+def create_embedding():
+    """Create a small in-memory Word Embedding with random word vectors"""
+    vectors = np.random.RandomState(42).normal(size=(len(WORDS), 16))
+    vectors[7] = 0.0
+    return SimpleWordEmbedding(Path("embedding.vec"), WORDS, vectors.astype(np.float32))
+
+
+@pytest.mark.parametrize(
+    "precision, tolerance, expected_bytes",
+    [("float16", 1e-2, 200 * 16 * 2 + 200 * 4), ("int8", 5e-2, 200 * 16 + 200 * 4)],
+)
+def test_should_quantize_word_vectors_to_precision(
+    embedding, precision, tolerance, expected_bytes
+):
+    # WHEN
+    quantized_embedding = quantize_embedding(embedding, precision, block_size=32)
+
+    # THEN
+    assert quantized_embedding.precision == precision
+    assert quantized_embedding.shape == embedding.shape
+    assert quantized_embedding.get_memory_usage()["vectors"] == expected_bytes
+    assert np.allclose(
+        np.asarray(quantized_embedding.vectors), embedding.vectors, atol=tolerance
+    )
+    assert np.allclose(quantized_embedding.vector_norms, embedding.vector_norms)
+    assert not quantized_embedding.get_word_vector("word7").any()
+
+
+def test_should_find_same_most_similar_words_in_int8(embedding):
+    # GIVEN
+    quantized_embedding = quantize_embedding(embedding, "int8")
+
+    # WHEN
+    most_similar = quantized_embedding.most_similar(positive=["word3"], topn=3)
+
+    # THEN
+    expected = embedding.most_similar(positive=["word3"], topn=3)
+    assert [w for w, _ in most_similar] == [w for w, _ in expected]
+    assert [s for _, s in most_similar] == pytest.approx(
+        [s for _, s in expected], abs=1e-2
+    )
+
+
+def test_should_dequantize_only_indexed_rows():
+    # GIVEN
+    matrix = QuantizedMatrix(
+        np.array([[1, -2], [3, 4], [0, 0]], dtype=np.int8),
+        np.array([0.5, 2.0, 1.0], dtype=np.float32),
+    )
+
+    # THEN
+    assert matrix.shape == (3, 2)
+    assert matrix.nbytes == 6 + 12
+    assert list(matrix[0]) == [0.5, -1.0]
+    assert matrix[1:].tolist() == [[6.0, 8.0], [0.0, 0.0]]
+    assert matrix[[1, 0], 1].tolist() == [8.0, -1.0]
+    assert matrix[np.array([[0], [1]])].shape == (2, 1, 2)
+
+
+def test_should_restrict_vocab_of_quantized_embedding(embedding):
+    # GIVEN
+    quantized_embedding = quantize_embedding(embedding, "float16")
+
+    # WHEN
+    restricted_embedding = quantized_embedding.restrict_vocab(10)
+
+    # THEN
+    assert restricted_embedding.get_words() == WORDS[:10]
+    assert np.shares_memory(
+        restricted_embedding.vectors.codes, quantized_embedding.vectors.codes
+    )
+
+
+def test_should_keep_float32_embedding_as_is(embedding):
+    # THEN
+    assert quantize_embedding(embedding, "float32") is embedding
+
+
+def test_should_fail_to_quantize_to_unknown_precision(embedding):
+    # THEN
+    with pytest.raises(EmbedevalError, match="Unknown precision int4"):
+        # WHEN
+        quantize_embedding(embedding, "int4")
+
+
+def write_embedding(path, embedding, file_format):
+    """Write the given Word Embedding as word2vec text, GloVe or word2vec binary"""
+    if file_format == "binary":
+        content = f"{embedding.shape[0]} {embedding.shape[1]}\n".encode("ascii")
+        for word, vector in zip(embedding.get_words(), embedding.vectors):
+            content += word.encode("utf-8") + b" " + vector.astype("<f4").tobytes()
+    else:
+        content = "".join(
+            f"{word} {' '.join(repr(float(x)) for x in vector)}\n"
+            for word, vector in zip(embedding.get_words(), embedding.vectors)
+        ).encode("utf-8")
+        if file_format == "text":
+            content = f"{embedding.shape[0]} {embedding.shape[1]}\n".encode() + content
+    path.write_bytes(content)
+
+
+@pytest.mark.parametrize(
+    "file_format, load_embedding",
+    [
+        ("text", word2vec_simple.load_embedding),
+        ("glove", glove.load_embedding),
+        ("binary", word2vec_binary.load_embedding),
+    ],
+)
+@pytest.mark.parametrize("is_compressed", [False, True])
+def test_should_quantize_word_vectors_while_parsing(
+    embedding, tmp_path, file_format, load_embedding, is_compressed, monkeypatch
+):
+    # GIVEN
+    monkeypatch.setattr(word2vec_binary, "BLOCK_SIZE", 64)
+    embedding_path = tmp_path / "embedding"
+    write_embedding(embedding_path, embedding, file_format)
+    if is_compressed:
+        embedding_path.write_bytes(gzip.compress(embedding_path.read_bytes()))
+
+    # WHEN
+    parsed_embedding = load_embedding(embedding_path, precision="int8", max_words=150)
+
+    # THEN
+    expected_embedding = quantize_embedding(embedding.restrict_vocab(150), "int8")
+    assert parsed_embedding.precision == "int8"
+    assert parsed_embedding.get_words() == WORDS[:150]
+    assert np.array_equal(
+        parsed_embedding.vectors.codes, expected_embedding.vectors.codes
+    )
+    assert np.allclose(parsed_embedding.vector_norms, expected_embedding.vector_norms)
+
+
+def test_should_grow_quantized_vectors_while_adding_blocks(embedding):
+    # GIVEN
+    builder = QuantizedVectorsBuilder("float16", 16, expected_size=3)
+
+    # WHEN
+    for start in range(0, len(WORDS), 64):
+        builder.add(embedding.vectors[start : start + 64])
+    quantized_embedding = builder.build(embedding.path, embedding.vocabulary)
+
+    # THEN
+    assert quantized_embedding.shape == embedding.shape
+    assert np.allclose(
+        np.asarray(quantized_embedding.vectors), embedding.vectors, atol=1e-2
+    )
@@ -0,0 +1,364 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from embedeval.embedding import WordEmbedding
+from embedeval.errors import EmbedevalError
+from embedeval.parsers.word2vec_simple import SimpleWordEmbedding
+from embedeval.similarity import SimilarityEngine, normalize_vectors
+
+WORDS = [f"word{i}" for i in range(50)]
+
+
+@pytest.fixture(name="embedding")
+def create_embedding():
+    """Create a small in-memory Word Embedding with random word vectors"""
+    vectors = np.random.RandomState(42).normal(size=(len(WORDS), 8))
+    return SimpleWordEmbedding(Path("embedding.vec"), WORDS, vectors.astype(np.float32))
+
+
+def cosine_similarities(embedding, vector):
+    normalized = normalize_vectors(embedding.vectors)
+    return normalized @ (vector / np.linalg.norm(vector))
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 50, 1000])
+def test_should_find_most_similar_words_by_cosine(embedding, block_size):
+    # GIVEN
+    engine = SimilarityEngine(embedding, block_size=block_size)
+    similarities = cosine_similarities(embedding, embedding.get_word_vector("word3"))
+    similarities[3] = -np.inf
+    expected_rows = np.argsort(-similarities)[:5]
+
+    # WHEN
+    most_similar = engine.most_similar(positive=["word3"], topn=5)
+
+    # THEN
+    assert [w for w, _ in most_similar] == [WORDS[r] for r in expected_rows]
+    assert np.allclose([s for _, s in most_similar], similarities[expected_rows])
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1000])
+def test_should_find_most_similar_words_by_3cosadd(embedding, block_size):
+    # GIVEN
+    engine = SimilarityEngine(embedding, block_size=block_size)
+    normalized = normalize_vectors(embedding.vectors)
+    similarities = cosine_similarities(
+        embedding, normalized[1] + normalized[2] - normalized[3]
+    )
+    similarities[[1, 2, 3]] = -np.inf
+    expected_rows = np.argsort(-similarities)[:3]
+
+    # WHEN
+    most_similar = engine.most_similar(
+        positive=["word1", "word2"], negative=["word3"], topn=3
+    )
+
+    # THEN
+    assert [w for w, _ in most_similar] == [WORDS[r] for r in expected_rows]
+    assert np.allclose([s for _, s in most_similar], similarities[expected_rows])
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1000])
+def test_should_find_most_similar_words_by_3cosmul(embedding, block_size):
+    # GIVEN
+    engine = SimilarityEngine(embedding, block_size=block_size)
+    normalized = normalize_vectors(embedding.vectors)
+    a, b, c = ((1 + normalized @ normalized[r]) / 2 for r in (1, 2, 3))
+    scores = a * b / (c + 1e-6)
+    scores[[1, 2, 3]] = -np.inf
+    expected_rows = np.argsort(-scores)[:3]
+
+    # WHEN
+    most_similar = engine.most_similar_cosmul(
+        positive=["word1", "word2"], negative=["word3"], topn=3
+    )
+
+    # THEN
+    assert [w for w, _ in most_similar] == [WORDS[r] for r in expected_rows]
+    assert np.allclose([s for _, s in most_similar], scores[expected_rows], rtol=1e-5)
+
+
+@pytest.mark.parametrize(
+    "search_method, method",
+    [("search_add", "most_similar"), ("search_cosmul", "most_similar_cosmul")],
+)
+@pytest.mark.parametrize(
+    "query_rows",
+    [
+        pytest.param(np.array([[1, 2, 3], [4, 5, 6], [10, 11, 12]]), id="distinct"),
+        pytest.param(
+            np.random.RandomState(1).choice(5, size=(20, 3)), id="sharing words"
+        ),
+    ],
+)
+def test_should_answer_batch_of_queries_like_single_queries(
+    embedding, search_method, method, query_rows
+):
+    # GIVEN
+    engine = SimilarityEngine(embedding, block_size=7)
+    search = getattr(engine, search_method)
+    most_similar = getattr(engine, method)
+
+    # WHEN
+    rows, scores = search(query_rows[:, :2], query_rows[:, 2:], topn=4)
+
+    # THEN
+    assert rows.shape == scores.shape == (len(query_rows), 4)
+    for query, (a, b, c) in enumerate(query_rows):
+        expected = most_similar([WORDS[a], WORDS[b]], [WORDS[c]], topn=4)
+        assert [WORDS[r] for r in rows[query]] == [w for w, _ in expected]
+        assert np.allclose(scores[query], [s for _, s in expected], rtol=1e-5)
+
+
+def test_should_never_return_query_words(embedding):
+    # GIVEN
+    engine = SimilarityEngine(embedding, block_size=7)
+
+    # WHEN
+    most_similar = engine.most_similar(
+        positive=["word1", "word2"], negative=["word3"], topn=100
+    )
+
+    # THEN
+    assert len(most_similar) == len(WORDS) - 3
+    assert {"word1", "word2", "word3"}.isdisjoint(w for w, _ in most_similar)
+
+
+def test_should_find_word_which_doesnt_match():
+    # GIVEN
+    vectors = np.array(
+        [[1.0, 0.1], [1.0, 0.0], [0.9, 0.1], [0.0, 1.0]], dtype=np.float32
+    )
+    embedding = SimpleWordEmbedding(
+        Path("embedding.vec"), ["cat", "dog", "mouse", "car"], vectors
+    )
+
+    # WHEN
+    odd_one_out = embedding.doesnt_match(["cat", "car", "dog", "mouse", "unknown"])
+
+    # THEN
+    assert odd_one_out == "car"
+
+
+def test_should_fail_for_words_not_in_embedding(embedding):
+    # THEN
+    with pytest.raises(EmbedevalError, match="Words not in the Embedding: unknown"):
+        # WHEN
+        embedding.most_similar(positive=["word1", "unknown"])
+
+
+def test_should_create_similarity_engine_only_once(embedding):
+    # WHEN
+    engine = embedding.similarity_engine
+
+    # THEN
+    assert embedding.similarity_engine is engine
+
+
+def test_should_view_first_words_of_embedding_without_copy(embedding):
+    # WHEN
+    restricted_embedding = embedding.restrict_vocab(10)
+
+    # THEN
+    assert restricted_embedding.shape == (10, 8)
+    assert restricted_embedding.get_words() == WORDS[:10]
+    assert np.shares_memory(restricted_embedding.vectors, embedding.vectors)
+    assert list(restricted_embedding.get_word_indices(["word9", "word10"])) == [9, -1]
+    with pytest.raises(KeyError):
+        restricted_embedding.get_word_vector("word10")
+
+
+def test_should_find_earlier_row_of_duplicate_word_in_restricted_vocab():
+    # GIVEN
+    embedding = SimpleWordEmbedding(
+        Path("embedding.vec"),
+        ["a", "b", "c", "a"],
+        np.arange(8, dtype=np.float32).reshape(4, 2),
+    )
+
+    # WHEN
+    restricted_embedding = embedding.restrict_vocab(3)
+
+    # THEN
+    assert list(restricted_embedding.get_word_indices(["a", "b", "d"])) == [0, 1, -1]
+    assert list(restricted_embedding.get_word_vector("a")) == [0.0, 1.0]
+    assert list(embedding.get_word_indices(["a"])) == [3]
+
+
+def test_should_only_find_most_similar_words_in_restricted_vocab(embedding):
+    # GIVEN
+    restricted_embedding = embedding.restrict_vocab(10)
+    similarities = cosine_similarities(embedding, embedding.get_word_vector("word3"))
+    similarities[3] = -np.inf
+    expected_rows = np.argsort(-similarities[:10])[:5]
+
+    # WHEN
+    most_similar = restricted_embedding.most_similar(positive=["word3"], topn=5)
+
+    # THEN
+    assert [w for w, _ in most_similar] == [WORDS[r] for r in expected_rows]
+
+
+def test_should_share_normalized_vectors_with_restricted_vocab(embedding):
+    # GIVEN
+    engine = embedding.similarity_engine
+
+    # WHEN
+    restricted_engine = embedding.restrict_vocab(10).similarity_engine
+
+    # THEN
+    assert len(restricted_engine.normalized_vectors) == 10
+    assert np.shares_memory(restricted_engine.normalized_vectors, engine.normalized_vectors)
+
+
+def test_should_share_normalized_vectors_between_engine_and_tasks(embedding):
+    # WHEN
+    normalized_vectors = embedding.normalized_vectors
+
+    # THEN
+    assert embedding.normalized_vectors is normalized_vectors
+    assert embedding.similarity_engine.normalized_vectors is normalized_vectors
+    assert np.allclose(normalized_vectors, normalize_vectors(embedding.vectors))
+
+
+def test_should_derive_norms_and_centered_vectors_of_embedding(embedding):
+    # WHEN
+    vector_norms = embedding.vector_norms
+    centered_vectors = embedding.centered_vectors
+
+    # THEN
+    assert np.allclose(vector_norms, np.linalg.norm(embedding.vectors, axis=1))
+    assert np.allclose(centered_vectors.mean(axis=0), 0.0, atol=1e-6)
+    assert embedding.get_memory_usage() == {
+        "vectors": 50 * 8 * 4,
+        "vector_norms": 50 * 4,
+        "centered_vectors": 50 * 8 * 4,
+    }
+
+
+def test_should_drop_raw_vectors_but_keep_their_norms(embedding):
+    # GIVEN
+    raw_vectors = embedding.vectors.copy()
+    embedding.normalized_vectors  # noqa
+
+    # WHEN
+    embedding.drop_raw_vectors()
+
+    # THEN
+    assert embedding.vectors is embedding.normalized_vectors
+    assert np.allclose(embedding.vector_norms, np.linalg.norm(raw_vectors, axis=1))
+    assert embedding.get_memory_usage() == {
+        "vectors": 50 * 8 * 4,
+        "normalized_vectors": 0,
+        "vector_norms": 50 * 4,
+    }
+
+
+def test_should_normalize_only_first_words_of_restricted_vocab(embedding):
+    # WHEN
+    restricted_embedding = embedding.restrict_vocab(10)
+
+    # THEN
+    assert len(restricted_embedding.normalized_vectors) == 10
+    assert not embedding._derived_views
+
+
+def test_should_derive_views_of_other_embedding_while_one_is_locked(embedding):
+    # GIVEN
+    other_embedding = SimpleWordEmbedding(
+        Path("other.vec"), WORDS, np.ones((len(WORDS), 8), dtype=np.float32)
+    )
+    is_locked = threading.Event()
+    is_released = threading.Event()
+
+    def hold_lock():
+        with embedding._derived_views_lock, embedding._similarity_engine_lock:
+            is_locked.set()
+            is_released.wait(timeout=5)
+
+    locking_thread = threading.Thread(target=hold_lock)
+    locking_thread.start()
+    is_locked.wait(timeout=5)
+
+    # WHEN
+    engines = []
+    creating_thread = threading.Thread(
+        target=lambda: engines.append(other_embedding.similarity_engine)
+    )
+    creating_thread.start()
+    creating_thread.join(timeout=5)
+    is_blocked = creating_thread.is_alive()
+    is_released.set()
+    locking_thread.join()
+    creating_thread.join()
+
+    # THEN
+    assert not is_blocked
+    assert engines[0].embedding is other_embedding
+    assert "normalized_vectors" not in embedding._derived_views
+
+
+def test_should_normalize_zero_vectors_to_zero():
+    # GIVEN
+    vectors = np.array([[3.0, 4.0], [0.0, 0.0]])
+
+    # WHEN
+    normalized = normalize_vectors(vectors, block_size=1)
+
+    # THEN
+    assert normalized.dtype == np.float32
+    assert np.allclose(normalized, [[0.6, 0.8], [0.0, 0.0]])
+
+
+class DictWordEmbedding(WordEmbedding):
+    """Word Embedding implementing only the abstract members"""
+
+    def __init__(self, word_vectors):
+        # NOTE: like some third-party Word Embeddings, ``super().__init__()``
+        #       is not called.
+        self.word_vectors = word_vectors
+
+    @property
+    def path(self):
+        return Path("embedding.vec")
+
+    @property
+    def shape(self):
+        return len(self.word_vectors), len(next(iter(self.word_vectors.values())))
+
+    def get_words(self):
+        return list(self.word_vectors)
+
+    def get_word_vector(self, word):
+        return self.word_vectors[word]
+
+
+def test_should_search_embedding_implementing_only_required_members(embedding):
+    # GIVEN
+    dict_embedding = DictWordEmbedding(
+        {word: embedding.get_word_vector(word) for word in WORDS}
+    )
+
+    # WHEN
+    vectors, found_mask = dict_embedding.get_word_vectors(["word3", "unknown"])
+    most_similar = dict_embedding.most_similar(["word3"], topn=5)
+
+    # THEN
+    assert list(dict_embedding.get_word_indices(["word3", "unknown"])) == [3, -1]
+    assert list(found_mask) == [True, False]
+    assert np.array_equal(vectors[0], embedding.get_word_vector("word3"))
+    assert not vectors[1].any()
+    assert most_similar == pytest.approx(embedding.most_similar(["word3"], topn=5))
@@ -11,7 +11,7 @@ NLP Embedding Evaluation Tool
 import pytest
 
 from embedeval.errors import EmbedevalError
-from embedeval.taskregistry import TaskRegistry, load_module, load_tasks
+from embedeval.taskregistry import TaskRegistry, load_module, load_tasks, registry
 
 
 def test_should_fail_to_register_task_without_name():
@@ -105,19 +105,163 @@ def test_should_fail_to_load_task_for_not_existent_location(mocker):
         load_tasks(locations)
 
 
-def test_should_load_python_module_in_location(mocker):
+def test_should_discover_tasks_in_location_without_importing_them(tmp_path, mocker):
     # GIVEN
     load_module_mock = mocker.patch("embedeval.taskregistry.load_module")
-    module_mock = mocker.MagicMock(name="Python Module")
-    location = mocker.MagicMock()
-    location.glob.return_value = [module_mock]
+    module_path = tmp_path / "some_task.py"
+    module_path.write_text(
+        "class SomeTask(Task):\n"
+        "    NAME = 'some-task'\n"
+        "\n"
+        "class OtherTask(Task):\n"
+        "    NAME: str = 'other-task'\n"
+    )
+    registry = TaskRegistry()
+
+    # WHEN
+    loaded_locations = load_tasks([tmp_path], registry)
+
+    # THEN
+    load_module_mock.assert_not_called()
+    assert loaded_locations == [module_path]
+    assert registry.get_task_names() == ["other-task", "some-task"]
+
+
+def test_should_not_discover_base_tasks_without_name(tmp_path, mocker):
+    # GIVEN
+    load_module_mock = mocker.patch("embedeval.taskregistry.load_module")
+    module_path = tmp_path / "base_task.py"
+    module_path.write_text(
+        "class BaseTask(Task):\n"
+        "    NAME = ''\n"
+        "\n"
+        "class SomeTask(BaseTask):\n"
+        "    NAME = 'some-task'\n"
+    )
+    registry = TaskRegistry()
+
+    # WHEN
+    load_tasks([tmp_path], registry)
+
+    # THEN
+    load_module_mock.assert_not_called()
+    assert registry.get_task_names() == ["some-task"]
+
+
+def test_should_import_module_with_dynamic_task_name(tmp_path, mocker):
+    # GIVEN
+    load_module_mock = mocker.patch("embedeval.taskregistry.load_module")
+    module_path = tmp_path / "dynamic_task.py"
+    module_path.write_text("class DynamicTask(Task):\n    NAME = 'dynamic-' + 'task'\n")
+    registry = TaskRegistry()
+
+    # WHEN
+    load_tasks([tmp_path], registry)
+
+    # THEN
+    load_module_mock.assert_called_once_with(module_path)
+    assert registry.get_task_names() == []
+
+
+def test_should_only_register_task_classes_of_imported_module(tmp_path):
+    # GIVEN
+    (tmp_path / "derived_registry_task.py").write_text(
+        "from pathlib import Path\n"
+        "\n"
+        "from embedeval.tasks.word_similarity import WordSimilarityTask\n"
+        "\n"
+        "class Settings(object):\n"
+        "    NAME = 'settings'\n"
+        "\n"
+        "class DerivedTask(WordSimilarityTask):\n"
+        "    NAME = 'derived-registry-task'\n"
+        "    DATASETS_PATH = Path('datasets')\n"
+    )
+    custom_registry = TaskRegistry()
+
+    # WHEN
+    load_tasks([tmp_path], custom_registry)
+
+    # THEN
+    assert custom_registry.get_task_names() == ["derived-registry-task"]
+
+
+def test_should_import_task_module_when_task_is_requested(tmp_path):
+    # GIVEN
+    (tmp_path / "lazy_registry_task.py").write_text(
+        "from embedeval.task import Task\n"
+        "\n"
+        "class LazyTask(Task):\n"
+        "    NAME = 'lazy-task'\n"
+        "\n"
+        "    def evaluate(self, embedding):\n"
+        "        ...\n"
+    )
+    load_tasks([tmp_path])
+
+    # WHEN
+    task_cls = registry.get_task_cls("lazy-task")
+
+    # THEN
+    assert task_cls.__name__ == "LazyTask"
+    assert task_cls.__module__ == "lazy_registry_task"
+
+
+def test_should_get_lazily_imported_task_from_given_registry(tmp_path):
+    # GIVEN
+    (tmp_path / "custom_registry_task.py").write_text(
+        "from embedeval.task import Task\n"
+        "\n"
+        "class CustomRegistryTask(Task):\n"
+        "    NAME = 'custom-registry-task'\n"
+        "\n"
+        "    def evaluate(self, embedding):\n"
+        "        ...\n"
+    )
+    custom_registry = TaskRegistry()
+    load_tasks([tmp_path], custom_registry)
+
+    # WHEN
+    task_cls = custom_registry.get_task_cls("custom-registry-task")
+
+    # THEN
+    assert task_cls.__name__ == "CustomRegistryTask"
+    assert custom_registry.get_task_names() == ["custom-registry-task"]
+
+
+def test_should_reuse_task_manifest_for_unchanged_modules(tmp_path, mocker):
+    # GIVEN
+    location = tmp_path / "tasks"
+    location.mkdir()
+    module_path = location / "some_task.py"
+    module_path.write_text("class SomeTask(Task):\n    NAME = 'some-task'\n")
+    load_tasks([location], TaskRegistry())
+    scan_module_mock = mocker.patch("embedeval.taskregistry.scan_module")
+
+    # WHEN
+    registry = TaskRegistry()
+    load_tasks([location], registry)
+
+    # THEN
+    scan_module_mock.assert_not_called()
+    assert registry.get_task_names() == ["some-task"]
+
+
+def test_should_rescan_changed_module(tmp_path):
+    # GIVEN
+    location = tmp_path / "tasks"
+    location.mkdir()
+    module_path = location / "some_task.py"
+    module_path.write_text("class SomeTask(Task):\n    NAME = 'some-task'\n")
+    load_tasks([location], TaskRegistry())
+    module_path.write_text("class SomeTask(Task):\n    NAME = 'renamed-task'\n")
 
     # WHEN
-    loaded_locations = load_tasks([location])
+    registry = TaskRegistry()
+    load_tasks([location], registry)
 
     # THEN
-    load_module_mock.assert_called_once_with(module_mock)
-    assert loaded_locations == [module_mock]
+    assert registry.get_task_names() == ["renamed-task"]
 
 
 def test_should_fail_task_loading_when_import_fails(mocker):
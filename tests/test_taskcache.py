@@ -0,0 +1,129 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from embedeval import taskcache
+from embedeval.taskcache import TaskArtifactCache, get_cache_dir
+
+
+@pytest.fixture(name="dataset_path")
+def create_dataset(tmp_path):
+    """Create a dataset file for a Task"""
+    dataset_path = tmp_path / "dataset.txt"
+    dataset_path.write_text("some tweet\tOTHER\n")
+    yield dataset_path
+
+
+def test_should_use_cache_dir_from_environment(tmp_path, monkeypatch):
+    # GIVEN
+    monkeypatch.setenv("EMBEDEVAL_CACHE_DIR", str(tmp_path))
+
+    # THEN
+    assert get_cache_dir() == tmp_path
+
+
+def test_should_load_saved_task_artifacts(dataset_path):
+    # GIVEN
+    cache = TaskArtifactCache("some-task", [dataset_path], "v1")
+    artifacts = {
+        "sequences": np.array([[1, 2], [3, 0]]),
+        "sentence_length": 2,
+        "tokenizer": {"word_index": {"foo": 1}, "tuple": (1, 2)},
+    }
+
+    # WHEN
+    cache.save(artifacts)
+    loaded_artifacts = TaskArtifactCache("some-task", [dataset_path], "v1").load()
+
+    # THEN
+    assert np.array_equal(loaded_artifacts["sequences"], artifacts["sequences"])
+    assert loaded_artifacts["sentence_length"] == 2
+    assert loaded_artifacts["tokenizer"] == artifacts["tokenizer"]
+    assert (cache.path / "sequences.npy").exists()
+    assert (cache.path / "tokenizer.pickle").exists()
+
+
+@pytest.mark.parametrize(
+    "task_name, code_version, dataset_content",
+    [
+        pytest.param("other-task", "v1", None, id="different task"),
+        pytest.param("some-task", "v2", None, id="different code version"),
+        pytest.param("some-task", "v1", "other tweet\tOFFENSE\n", id="changed dataset"),
+    ],
+)
+def test_should_not_load_artifacts_for_different_key(
+    task_name, code_version, dataset_content, dataset_path
+):
+    # GIVEN
+    TaskArtifactCache("some-task", [dataset_path], "v1").save({"foo": 1})
+    if dataset_content is not None:
+        dataset_path.write_text(dataset_content)
+
+    # WHEN
+    artifacts = TaskArtifactCache(task_name, [dataset_path], code_version).load()
+
+    # THEN
+    assert artifacts is None
+
+
+def test_should_not_cache_artifacts_which_cannot_be_saved(dataset_path):
+    # GIVEN
+    cache = TaskArtifactCache("some-task", [dataset_path], "v1")
+
+    # WHEN
+    cache.save({"foo": 1, "lock": threading.Lock()})
+
+    # THEN
+    assert cache.load() is None
+    assert not cache.path.exists()
+
+
+class CachingTask:
+    NAME = "caching-task"
+
+
+def test_should_change_cache_of_task_when_embedeval_version_changes(
+    dataset_path, monkeypatch
+):
+    # GIVEN
+    cache_path = TaskArtifactCache.for_task(CachingTask(), [dataset_path]).path
+    monkeypatch.setattr("embedeval.__version__", "0.0.0-changed")
+
+    # WHEN
+    changed_cache_path = TaskArtifactCache.for_task(CachingTask(), [dataset_path]).path
+
+    # THEN
+    assert changed_cache_path != cache_path
+
+
+@pytest.mark.parametrize("changed_module", ["tokenizer.py", "encoder.py", "similarity.py"])
+def test_should_change_cache_of_task_when_artifact_module_changes(
+    changed_module, dataset_path, monkeypatch
+):
+    # GIVEN
+    cache_path = TaskArtifactCache.for_task(CachingTask(), [dataset_path]).path
+    calculate_checksum = taskcache.calculate_checksum
+
+    def calculate_changed_checksum(path):
+        checksum = calculate_checksum(path)
+        return checksum + "-changed" if Path(path).name == changed_module else checksum
+
+    monkeypatch.setattr(taskcache, "calculate_checksum", calculate_changed_checksum)
+
+    # WHEN
+    changed_cache_path = TaskArtifactCache.for_task(CachingTask(), [dataset_path]).path
+
+    # THEN
+    assert changed_cache_path != cache_path
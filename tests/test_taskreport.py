@@ -12,7 +12,7 @@ import pytest
 
 import colorful as cf
 
-from embedeval.taskreport import TaskReport
+from embedeval.taskreport import TaskReport, format_comparison_table, format_shift_table
 
 
 @pytest.fixture(autouse=True)
@@ -55,3 +55,58 @@ Details:
     body
     """.strip()
     )
+
+
+def test_taskreport_comparison_table_should_contain_outcomes_and_metrics():
+    # GIVEN
+    results = {
+        "first.vec": [
+            TaskReport("task1", outcome=True, metrics={"accuracy": 0.75}),
+            TaskReport("task2", outcome=False),
+        ],
+        "second.vec": [
+            TaskReport("task1", outcome=False, metrics={"accuracy": 0.5}),
+            Exception("Boom"),
+        ],
+    }
+
+    # WHEN
+    table = format_comparison_table(["task1", "task2"], results)
+
+    # THEN
+    assert table == (
+        """
+Task        first.vec  second.vec
+task1       passed     failed
+  accuracy  0.7500     0.5000
+task2       failed     error
+    """.strip()
+    )
+
+
+def test_taskreport_shift_table_should_contain_shift_of_metrics():
+    # GIVEN
+    reference_results = [
+        TaskReport("task1", outcome=True, metrics={"accuracy": 0.75}),
+        TaskReport("task2", outcome=True, metrics={"f1": 0.5}),
+    ]
+    results = [
+        TaskReport("task1", outcome=True, metrics={"accuracy": 0.7}),
+        Exception("Boom"),
+    ]
+
+    # WHEN
+    table = format_shift_table(
+        ["task1", "task2"], reference_results, results, "float32", "int8"
+    )
+
+    # THEN
+    assert table == (
+        """
+Task        float32  int8    shift
+task1       passed   passed
+  accuracy  0.7500   0.7000  -0.0500
+task2       passed   error   changed
+  f1        0.5000   -       -
+    """.strip()
+    )
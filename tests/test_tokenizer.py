@@ -0,0 +1,49 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import pytest
+
+from embedeval.tokenizer import build_word_index, tokenize, tokenize_corpus
+
+
+@pytest.mark.parametrize(
+    "sentence, expected_tokens",
+    [
+        pytest.param("Das ist gut!", ["das", "ist", "gut"], id="punctuation"),
+        pytest.param("Wär's  schön?\n#Frage", ["wär's", "schön", "frage"], id="unicode"),
+        pytest.param("U.S.-Wahl: 3,5%", ["u", "s", "wahl", "3", "5"], id="separators"),
+        pytest.param(" ... ", [], id="no words"),
+    ],
+)
+def test_should_tokenize_like_keras(sentence, expected_tokens):
+    # WHEN
+    tokens = tokenize(sentence)
+
+    # THEN
+    assert tokens == expected_tokens
+
+
+def test_should_tokenize_corpus_in_parallel_chunks_in_order():
+    # GIVEN
+    corpus = [f"Satz Nummer {i}" for i in range(10)]
+
+    # WHEN
+    tokenized_corpus = tokenize_corpus(corpus, workers=2, chunk_size=3)
+
+    # THEN
+    assert tokenized_corpus == [["satz", "nummer", str(i)] for i in range(10)]
+
+
+def test_should_index_words_by_frequency_and_first_occurrence():
+    # WHEN
+    word_index = build_word_index([["b", "a"], ["c", "a", "d"], ["c"]])
+
+    # THEN
+    assert word_index == {"a": 1, "c": 2, "b": 3, "d": 4}
@@ -0,0 +1,110 @@
+"""
+embedeval
+~~~~~~~~~
+
+NLP Embedding Evaluation Tool
+
+:copyright: (c) 2019 by Timo Furrer <tuxtimo@gmail.com>
+:license: MIT, see LICENSE for more details.
+"""
+
+import pickle
+
+import pytest
+
+from embedeval.vocabulary import Vocabulary
+
+WORDS = ["the", "wörd", "", "Straße", "42"] + [f"word{i}" for i in range(1000)]
+
+
+@pytest.fixture(name="vocabulary")
+def create_vocabulary():
+    """Create a vocabulary with non-ASCII and empty words"""
+    return Vocabulary.from_words(WORDS)
+
+
+def test_should_find_rows_of_all_words(vocabulary):
+    # WHEN
+    rows = vocabulary.get_rows(WORDS + ["unknown", "wörd1"])
+
+    # THEN
+    assert list(rows) == list(range(len(WORDS))) + [-1, -1]
+    assert "Straße" in vocabulary
+    assert "strasse" not in vocabulary
+
+
+def test_should_get_words_of_rows(vocabulary):
+    # THEN
+    assert len(vocabulary) == len(WORDS)
+    assert list(vocabulary) == WORDS
+    assert vocabulary[1] == "wörd"
+    assert vocabulary[-1] == "word999"
+    assert vocabulary[2:4] == ["", "Straße"]
+    assert vocabulary.get_words([3, 0]) == ["Straße", "the"]
+    with pytest.raises(IndexError):
+        vocabulary[len(WORDS)]
+
+
+def test_should_store_words_in_a_single_blob(vocabulary):
+    # THEN
+    assert vocabulary.blob == "".join(WORDS).encode("utf-8")
+    assert vocabulary.nbytes < len(vocabulary.blob) + 24 * len(WORDS)
+
+
+def test_should_find_last_row_of_duplicate_words():
+    # WHEN
+    vocabulary = Vocabulary.from_words(["a", "b", "a"])
+
+    # THEN
+    assert vocabulary.get_row("a") == 2
+
+
+def test_should_only_find_words_of_prefix(vocabulary):
+    # WHEN
+    prefix = vocabulary.prefix(3)
+
+    # THEN
+    assert list(prefix) == WORDS[:3]
+    assert list(prefix.get_rows(["the", "", "Straße"])) == [0, 2, -1]
+    assert prefix.table is vocabulary.table
+
+
+def test_should_find_last_row_of_duplicate_words_within_prefix():
+    # GIVEN
+    words = ["a", "b", "a", "c", "a", "b"]
+    vocabulary = Vocabulary.from_words(words)
+
+    # THEN
+    for size in range(len(words) + 1):
+        expected_rows = {word: row for row, word in enumerate(words[:size])}
+        rows = vocabulary.prefix(size).get_rows(["a", "b", "c"])
+        assert list(rows) == [expected_rows.get(word, -1) for word in "abc"]
+
+
+def test_should_create_vocabulary_from_lines():
+    # WHEN
+    vocabulary = Vocabulary.from_lines("\n".join(WORDS).encode("utf-8"))
+
+    # THEN
+    assert list(vocabulary) == WORDS
+    assert vocabulary.get_row("word7") == WORDS.index("word7")
+
+
+def test_should_find_words_of_unpickled_vocabulary(vocabulary):
+    # WHEN
+    unpickled_vocabulary = pickle.loads(pickle.dumps(vocabulary))
+
+    # THEN
+    assert list(unpickled_vocabulary.get_rows(WORDS)) == list(range(len(WORDS)))
+
+
+def test_should_checksum_only_words_of_prefix(vocabulary):
+    # WHEN
+    checksum = vocabulary.prefix(3).checksum()
+
+    # THEN
+    assert checksum == Vocabulary.from_words(WORDS[:3]).checksum()
+    assert checksum != vocabulary.checksum()
+    assert Vocabulary.from_words(["ab", "c"]).checksum() != (
+        Vocabulary.from_words(["a", "bc"]).checksum()
+    )